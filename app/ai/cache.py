@@ -0,0 +1,187 @@
+# app/ai/cache.py
+
+"""
+Persistent, content-addressed cache for LLM responses.
+
+A match or tailoring result only depends on the model, the prompts and the
+output schema. If none of those changed since the last run, there is no
+reason to pay for the same answer again. Entries live in a small SQLite
+file under data/, expire after a TTL and are evicted least-recently-used
+once the cache grows past its size cap.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Optional, Type
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+# Outcome of the latest get() in this context: graph branches (threads) and
+# pipeline tasks each have their own, so callers can tell a cached answer
+# from a real provider call without racing on a shared counter
+_last_hit: ContextVar[bool] = ContextVar("gigclaw_llm_cache_hit", default=False)
+
+
+def served_from_cache() -> bool:
+    """True when the last lookup in this context was answered by the cache"""
+    return _last_hit.get()
+
+
+class LLMCache:
+    """SQLite-backed response cache keyed on a hash of the full request."""
+
+    def __init__(self, path: Path, ttl_seconds: float, max_bytes: int):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Graph nodes may run in worker threads; all access goes through _lock
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                schema TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_responses_last_access
+                ON responses(last_access);
+            CREATE TABLE IF NOT EXISTS stats (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, user_prompt: str,
+                 schema: Type[BaseModel]) -> str:
+        """Hash everything that can change the response."""
+        payload = json.dumps(
+            {
+                "model": model,
+                "system": system_prompt,
+                "user": user_prompt,
+                "schema": schema.model_json_schema(),
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _bump(self, name: str) -> None:
+        self._conn.execute(
+            "INSERT INTO stats(name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def get(self, key: str, schema: Type[BaseModel]) -> Optional[BaseModel]:
+        """Return the cached response, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            _last_hit.set(False)
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._bump("misses")
+                self._conn.commit()
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._bump("hits")
+            self._conn.commit()
+
+        try:
+            value = schema.model_validate_json(row[0])
+        except Exception:
+            # Schema changed shape under the same key -- treat as a miss
+            return None
+        _last_hit.set(True)
+        return value
+
+    def put(self, key: str, value: BaseModel) -> None:
+        """Store a response and evict LRU entries past the size cap."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses(key, schema, value, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, type(value).__name__, value.model_dump_json(), now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least-recently-used ones until under max_bytes."""
+        self._conn.execute(
+            "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(value)), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            "SELECT key, LENGTH(value) FROM responses ORDER BY last_access ASC")
+        doomed = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def stats(self) -> dict:
+        """Entry count, payload size and lifetime hit/miss counters."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM responses"
+            ).fetchone()
+            counters = dict(self._conn.execute("SELECT name, value FROM stats"))
+
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        lookups = hits + misses
+        return {
+            "entries": entries,
+            "size_bytes": size,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": (hits / lookups * 100) if lookups else 0.0,
+        }
+
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Return the shared cache, or None when caching is disabled."""
+    global _cache
+    if not settings.llm_cache_enabled:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache(
+                path=settings.llm_cache_file,
+                ttl_seconds=settings.llm_cache_ttl_hours * 3600,
+                max_bytes=settings.llm_cache_max_mb * 1024 * 1024,
+            )
+        return _cache
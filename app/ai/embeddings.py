@@ -0,0 +1,170 @@
+# app/ai/embeddings.py
+
+"""
+Persistent vector index of stored jobs, for CV-to-job similarity.
+
+Each job is embedded once, when it enters the store, with a hashed n-gram
+vector: word unigrams and bigrams are hashed (blake2b, so stable across
+processes) into EMBEDDING_DIM buckets with a random sign, weighted
+log(1 + tf) and L2-normalised. No model download, no GPU, and about a
+millisecond per description. Vectors live in a float32 NumPy memmap under
+data/embeddings/, one row per job, with the row order in ids.txt. Ranking
+the whole store against the embedded CV is then one matrix-vector product,
+a few milliseconds for thousands of jobs.
+
+The pre-filter uses the similarities as a relevance signal in front of the
+match node, and `python run.py search` queries the index offline.
+"""
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.ai.prefilter import tokenize
+from app.core.config import settings
+from app.core.models import Job
+
+INITIAL_CAPACITY = 1024
+
+
+def _bucket(feature: str, dim: int) -> Tuple[int, float]:
+    digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+    value = int.from_bytes(digest, "little")
+    return value % dim, (1.0 if value >> 63 else -1.0)
+
+
+def embed(text: str, dim: Optional[int] = None) -> np.ndarray:
+    """Hashed unigram + bigram vector of `text`, unit length (zeros if empty)."""
+    dim = dim or settings.embedding_dim
+    tokens = tokenize(text)
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    counts: Dict[Tuple[int, float], int] = {}
+    for feature in features:
+        key = _bucket(feature, dim)
+        counts[key] = counts.get(key, 0) + 1
+
+    vector = np.zeros(dim, dtype=np.float32)
+    for (index, sign), count in counts.items():
+        vector[index] += sign * np.log1p(count)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+def job_text(job: Job) -> str:
+    return " ".join([job.title, " ".join(job.tags), job.description or ""])
+
+
+class JobIndex:
+    """Memmapped job vectors keyed by Job.id"""
+
+    def __init__(self, directory: Optional[Path] = None, dim: Optional[int] = None):
+        self.directory = Path(directory or settings.embeddings_dir)
+        self.dim = dim or settings.embedding_dim
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = self.directory / "vectors.f32"
+        self.ids_path = self.directory / "ids.txt"
+        self.meta_path = self.directory / "meta.json"
+        self._lock = threading.Lock()
+
+        self.ids: List[str] = []
+        if self.meta_path.exists() and self.ids_path.exists():
+            meta = json.loads(self.meta_path.read_text(encoding="utf-8"))
+            if meta.get("dim") == self.dim:
+                self.ids = self.ids_path.read_text(encoding="utf-8").splitlines()
+            else:
+                print(f"   Embedding size changed ({meta.get('dim')} -> {self.dim}); rebuilding the job index.")
+        self.rows: Dict[str, int] = {job_id: i for i, job_id in enumerate(self.ids)}
+        self._vectors: Optional[np.memmap] = None
+        self._open(max(INITIAL_CAPACITY, len(self.ids)))
+
+    def _open(self, capacity: int) -> None:
+        """(Re)map the vector file with room for `capacity` rows."""
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        size = capacity * self.dim * 4
+        with open(self.vectors_path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r+",
+                                  shape=(capacity, self.dim))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self.rows
+
+    def add(self, jobs: Iterable[Job]) -> int:
+        """Embed and append jobs not in the index yet; returns how many were added."""
+        with self._lock:
+            new = [job for job in jobs if job.id not in self.rows]
+            new = list({job.id: job for job in new}.values())
+            if not new:
+                return 0
+            needed = len(self.ids) + len(new)
+            if needed > self._vectors.shape[0]:
+                self._open(max(needed, self._vectors.shape[0] * 2))
+
+            start = len(self.ids)
+            for offset, job in enumerate(new):
+                self._vectors[start + offset] = embed(job_text(job), self.dim)
+                self.rows[job.id] = start + offset
+                self.ids.append(job.id)
+            # Vectors first, then the id list: rows past len(ids) are simply ignored
+            self._vectors.flush()
+            tmp = self.ids_path.with_suffix(".part")
+            tmp.write_text("\n".join(self.ids), encoding="utf-8")
+            tmp.replace(self.ids_path)
+            self.meta_path.write_text(json.dumps({"dim": self.dim}), encoding="utf-8")
+            return len(new)
+
+    def similarity(self, job_ids: Sequence[str], query: np.ndarray) -> np.ndarray:
+        """Cosine similarity of each job to `query` (0 for jobs not in the index)."""
+        scores = np.zeros(len(job_ids), dtype=np.float32)
+        with self._lock:
+            positions = [(i, self.rows[j]) for i, j in enumerate(job_ids) if j in self.rows]
+            if positions:
+                at, rows = zip(*positions)
+                scores[list(at)] = self._vectors[list(rows)] @ query
+        return scores
+
+    def search(self, query: np.ndarray, k: int = 20) -> List[Tuple[str, float]]:
+        """The k indexed jobs most similar to `query`, best first."""
+        with self._lock:
+            count = len(self.ids)
+            if not count:
+                return []
+            scores = self._vectors[:count] @ query
+        k = min(k, count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[i], float(scores[i])) for i in top]
+
+
+_index: Optional[JobIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_job_index() -> JobIndex:
+    """Return the shared index."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = JobIndex()
+        return _index
+
+
+def index_stored_jobs() -> int:
+    """Embed every stored job the index is missing (stores that predate it)."""
+    from app.core.storage import load_job_ids, load_jobs_by_id
+
+    index = get_job_index()
+    missing = [job_id for job_id in load_job_ids() if job_id not in index]
+    if not missing:
+        return 0
+    return index.add(load_jobs_by_id(missing))
@@ -4,7 +4,9 @@ from openai import OpenAI
 from typing import List, Optional
 
 from app.core.config import settings
-from app.core.models import Job, MatchResult, TailoredContent
+from app.core.models import Job, MatchResult, TailoredContent, ApplicationStatus
+from app.ai.cache import LLMCache, get_llm_cache, served_from_cache
+from app.ai.usage import get_usage_meter
 from app.ai.prompts import (
     MATCH_SYSTEM_PROMPT,
     TAILOR_SYSTEM_PROMPT,
@@ -18,7 +20,25 @@ class AIEngine:
         """Initialize the openAI's client from the settings"""
         self.client = OpenAI(api_key=settings.openai_api_key)
         self.model = settings.model
+        # Tailoring requests sent to the provider (cache hits excluded)
+        self.tailor_calls = 0
+        self.cache = get_llm_cache()
         print(f"The AI engine has being initialized (model:{self.model})")
+
+    def _cache_key(self, system_prompt: str, user_prompt: str, schema) -> Optional[str]:
+        """Content address of a request, or None when caching is off."""
+        if self.cache is None:
+            return None
+        return LLMCache.make_key(f"openai:{self.model}", system_prompt, user_prompt, schema)
+
+    def _record_usage(self, completion, stage: str, job: Job) -> None:
+        """Account the tokens an OpenAI completion reports to this job and stage."""
+        usage = completion.usage
+        if usage is not None:
+            details = usage.prompt_tokens_details
+            get_usage_meter().record(self.model, stage, job.id,
+                                     usage.prompt_tokens, usage.completion_tokens,
+                                     cached_input_tokens=(details.cached_tokens or 0) if details else 0)
         
     #Job matching
     def match_job(self, job: Job, cv_text: str) -> MatchResult:
@@ -41,6 +61,14 @@ class AIEngine:
             cv_text=cv_text,
         )
 
+        # Unchanged job + CV + prompt + model -> reuse the stored answer
+        key = self._cache_key(MATCH_SYSTEM_PROMPT, user_prompt, MatchResult)
+        if key:
+            cached = self.cache.get(key, MatchResult)
+            if cached is not None:
+                get_usage_meter().record(self.model, "match", job.id, 0, 0, cached=True)
+                return cached
+
         try:
             # The magic: parse() returns a Pydantic model directly
             completion = self.client.beta.chat.completions.parse(
@@ -51,6 +79,7 @@ class AIEngine:
                 ],
                 response_format=MatchResult,
             )
+            self._record_usage(completion, "match", job)
 
             result = completion.choices[0].message.parsed
 
@@ -65,6 +94,8 @@ class AIEngine:
                     missing_skills=[],
                 )
 
+            if key:
+                self.cache.put(key, result)
             return result
 
         except Exception as e:
@@ -74,6 +105,7 @@ class AIEngine:
                 reasoning=f"Analysis failed: {str(e)}",
                 key_requirements=[],
                 missing_skills=[],
+                failed=True,
             )
             
     # Content tailoring
@@ -104,7 +136,14 @@ class AIEngine:
             match_reasoning=match_result.reasoning,
         )
 
+        key = self._cache_key(TAILOR_SYSTEM_PROMPT, user_prompt, TailoredContent)
         try:
+            if key:
+                cached = self.cache.get(key, TailoredContent)
+                if cached is not None:
+                    get_usage_meter().record(self.model, "tailor", job.id, 0, 0, cached=True)
+                    return cached
+
             completion = self.client.beta.chat.completions.parse(
                 model=self.model,
                 messages=[
@@ -113,6 +152,7 @@ class AIEngine:
                 ],
                 response_format=TailoredContent,
             )
+            self._record_usage(completion, "tailor", job)
 
             result = completion.choices[0].message.parsed
 
@@ -125,6 +165,8 @@ class AIEngine:
                     why_good_fit=["Tailoring failed — using originals"],
                 )
 
+            if key:
+                self.cache.put(key, result)
             return result
 
         except Exception as e:
@@ -134,6 +176,10 @@ class AIEngine:
                 cover_letter=cover_letter_template,
                 why_good_fit=[f"Tailoring failed: {str(e)}"],
             )
+        finally:
+            # A cached answer is reused content, not a tailoring call
+            if not served_from_cache():
+                self.tailor_calls += 1
     
     #Batch processing
     def analyze_batch(
@@ -165,6 +211,11 @@ class AIEngine:
             # Step 1: Match
             match_result = self.match_job(job, cv_text)
             score = match_result.match_score
+            if match_result.failed:
+                print(" not scored (analysis failed).")
+                results.append({"job": job, "match_result": match_result,
+                                "tailored_content": None})
+                continue
 
             # Update the job model with AI analysis
             job.match_score = score
@@ -180,14 +231,14 @@ class AIEngine:
                 print(f" {score}% — MATCH! Tailoring content...")
 
                 # Step 2: Tailor (only for good matches)
-                job.status = "matched"
+                job.status = ApplicationStatus.MATCHED
                 tailored = self.tailor_content(
                     job, cv_text, cover_letter_template, match_result
                 )
                 entry["tailored_content"] = tailored
             else:
                 print(f" {score}% — Below threshold, skipping.")
-                job.status = "skipped"
+                job.status = ApplicationStatus.SKIPPED
 
             results.append(entry)
 
@@ -0,0 +1,184 @@
+# app/ai/prefilter.py
+
+"""
+Deterministic pre-ranking of scraped jobs before any LLM call.
+
+A large scrape is mostly obvious mismatches: other roles, salaries under
+the candidate's floor, descriptions sharing nothing with the CV. Scoring
+those with the LLM is the most expensive part of a run and tells us
+nothing. This stage ranks the whole batch locally with three signals:
+
+  * keyword overlap between profile.target_roles and each job's title + tags
+  * BM25 relevance of each description to the CV text
+  * the salary parsed from Job.salary, as a hard floor (profile.min_salary)
+
+and only the top PREFILTER_TOP_K jobs scoring at least PREFILTER_MIN_SCORE
+go on to the match stage. Jobs that fail the salary floor or the minimum
+score are dropped. Jobs that only miss the top-K cut are deferred: they
+stay DISCOVERED in storage and rejoin the next run's candidates, since the
+cap is a per-run limit, not a verdict. Tokenised batches become one
+(jobs x terms) count matrix so the BM25 scoring is a few numpy operations,
+not a Python loop per job and term.
+"""
+
+import html
+import re
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.models import Job, UserProfile
+
+TOKEN_RE = re.compile(r"[a-z][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+TAG_RE = re.compile(r"<[^>]+>")
+
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being but by can
+could do does for from had has have how i if in into is it its may more most
+my no not of on or our out over so such than that the their them then there
+these they this to under up us was we were what when where which while who
+will with within would you your
+""".split())
+
+# Seniority words say nothing about the role itself
+ROLE_NOISE = frozenset({"senior", "junior", "lead", "staff", "principal", "sr", "jr",
+                        "mid", "level", "remote", "i", "ii", "iii"})
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# How much each signal contributes to the pre-filter score (0-1)
+KEYWORD_WEIGHT = 0.6
+RELEVANCE_WEIGHT = 0.4
+
+SALARY_RE = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*([kK])?")
+
+
+class PrefilterResult(NamedTuple):
+    """Jobs that go on to LLM matching, those dropped with the reason,
+    and those deferred because they fell outside the top K"""
+    kept: List[Job]
+    dropped: List[Tuple[Job, str]]
+    deferred: List[Job]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with HTML tags and stopwords removed."""
+    text = TAG_RE.sub(" ", html.unescape(text or "")).lower()
+    return [t for t in TOKEN_RE.findall(text) if t not in STOPWORDS]
+
+
+def parse_salary(salary: Optional[str]) -> Optional[Tuple[float, float]]:
+    """(low, high) yearly amount from strings like "$80,000 - $120,000",
+    "$90k+" or "Up to $150,000"; None when no amount is given."""
+    if not salary:
+        return None
+    amounts = []
+    for number, thousands in SALARY_RE.findall(salary):
+        value = float(number.replace(",", ""))
+        if thousands:
+            value *= 1000
+        if value >= 1000:
+            amounts.append(value)
+    if not amounts:
+        return None
+    if salary.strip().lower().startswith("up to"):
+        return (0.0, amounts[0])
+    if salary.strip().endswith("+"):
+        return (amounts[0], float("inf"))
+    return (min(amounts), max(amounts))
+
+
+def keyword_scores(jobs: Sequence[Job], target_roles: Sequence[str]) -> np.ndarray:
+    """Best fraction of a target role's words found in each job's title and tags."""
+    roles = [set(tokenize(role)) - ROLE_NOISE for role in target_roles]
+    roles = [r for r in roles if r]
+    scores = np.zeros(len(jobs))
+    if not roles:
+        return scores
+    for i, job in enumerate(jobs):
+        words = set(tokenize(job.title))
+        for tag in job.tags:
+            words.update(tokenize(tag))
+        scores[i] = max(len(role & words) / len(role) for role in roles)
+    return scores
+
+
+def bm25_scores(documents: Sequence[str], query: str) -> np.ndarray:
+    """BM25 relevance of each document to `query`, scaled to 0-1 across the batch."""
+    query_terms = {}
+    for term in tokenize(query):
+        query_terms[term] = query_terms.get(term, 0) + 1
+    if not documents or not query_terms:
+        return np.zeros(len(documents))
+    vocabulary = {term: j for j, term in enumerate(query_terms)}
+    # Repeated CV terms weigh more, but sublinearly
+    query_weights = np.log1p(np.fromiter(query_terms.values(), dtype=float))
+
+    # Counts of query terms only; other words just add to document length
+    counts = np.zeros((len(documents), len(vocabulary)))
+    lengths = np.zeros(len(documents))
+    for i, document in enumerate(documents):
+        tokens = tokenize(document)
+        lengths[i] = len(tokens)
+        for token in tokens:
+            j = vocabulary.get(token)
+            if j is not None:
+                counts[i, j] += 1
+
+    n = len(documents)
+    df = np.count_nonzero(counts, axis=0)
+    idf = np.log1p((n - df + 0.5) / (df + 0.5))
+    avg_length = lengths.mean() or 1.0
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / avg_length)
+    tf = counts * (BM25_K1 + 1) / (counts + norm[:, None])
+    scores = tf @ (idf * query_weights)
+
+    top = scores.max()
+    return scores / top if top > 0 else scores
+
+
+def prefilter(jobs: List[Job], profile: UserProfile,
+              top_k: Optional[int] = None,
+              min_score: Optional[float] = None,
+              similarity: Optional[np.ndarray] = None) -> PrefilterResult:
+    """Rank `jobs` locally and keep the ones worth an LLM call.
+
+    Jobs under the salary floor are dropped outright, then the rest are
+    ranked by combined keyword/relevance score; those at or above
+    `min_score` are kept, best first, up to `top_k`, and the rest of those
+    are deferred, not dropped. `similarity` (CV-to-job cosine from the
+    embedding index) is averaged with BM25 as the relevance.
+    """
+    top_k = settings.prefilter_top_k if top_k is None else top_k
+    min_score = settings.prefilter_min_score if min_score is None else min_score
+    if not jobs:
+        return PrefilterResult([], [], [])
+
+    keyword = keyword_scores(jobs, profile.target_roles)
+    relevance = bm25_scores([job.description for job in jobs], profile.cv_text)
+    if similarity is not None:
+        # Signed hashing can give small negative cosines; those mean "unrelated", not less
+        similarity = np.clip(similarity, 0.0, None)
+        top = similarity.max()
+        relevance = (relevance + (similarity / top if top > 0 else similarity)) / 2
+    scores = KEYWORD_WEIGHT * keyword + RELEVANCE_WEIGHT * relevance
+
+    dropped: List[Tuple[Job, str]] = []
+    candidates = []
+    for job, score in zip(jobs, scores):
+        salary = parse_salary(job.salary)
+        if profile.min_salary and salary and salary[1] < profile.min_salary:
+            dropped.append((job, f"salary {job.salary} below minimum {profile.min_salary:,}"))
+        elif score < min_score:
+            dropped.append((job, f"pre-filter score {score:.2f} below {min_score:.2f}"))
+        else:
+            candidates.append((score, job))
+
+    candidates.sort(key=lambda pair: pair[0], reverse=True)
+    deferred: List[Job] = []
+    if top_k:
+        deferred = [job for _, job in candidates[top_k:]]
+        candidates = candidates[:top_k]
+    return PrefilterResult([job for _, job in candidates], dropped, deferred)
@@ -63,11 +63,20 @@ plus a list of concrete reasons why this candidate is a good fit."""
 
 
 # ==================== PROMPT BUILDERS ====================
+#
+# Providers cache the longest prompt prefix they have seen recently (OpenAI
+# does this automatically past 1024 tokens) and bill those tokens at a
+# discount. Everything that is the same for every job in a run (the system
+# prompt, the CV, the cover letter template) therefore comes first, and the
+# per-job content comes last, so only the job listing is new for each call.
 
 def build_match_prompt(job_title: str, job_company: str,
                        job_description: str, cv_text: str) -> str:
     """Build the user message for job matching."""
-    return f"""Analyze this job match:
+    return f"""Analyze how well this candidate matches the job listing below.
+
+--- CANDIDATE CV ---
+{cv_text}
 
 --- JOB LISTING ---
 Title: {job_title}
@@ -75,9 +84,6 @@ Company: {job_company}
 Description:
 {job_description}
 
---- CANDIDATE CV ---
-{cv_text}
-
 Provide your analysis as structured output."""
 
 
@@ -86,7 +92,13 @@ def build_tailor_prompt(job_title: str, job_company: str,
                         cover_letter_template: str,
                         match_reasoning: str) -> str:
     """Build the user message for content tailoring."""
-    return f"""Tailor these materials for this specific job:
+    return f"""Tailor these materials for the job listing below.
+
+--- CANDIDATE'S ORIGINAL CV ---
+{cv_text}
+
+--- COVER LETTER TEMPLATE ---
+{cover_letter_template}
 
 --- JOB LISTING ---
 Title: {job_title}
@@ -97,11 +109,5 @@ Description:
 --- MATCH ANALYSIS ---
 {match_reasoning}
 
---- CANDIDATE'S ORIGINAL CV ---
-{cv_text}
-
---- COVER LETTER TEMPLATE ---
-{cover_letter_template}
-
 Rewrite both the CV and cover letter, optimized for this role.
-Return the complete tailored documents plus specific reasons why this candidate fits."""
\ No newline at end of file
+Return the complete tailored documents plus specific reasons why this candidate fits."""
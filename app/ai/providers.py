@@ -1,15 +1,38 @@
 #app/ai/providers.py
 
+import asyncio
+import time
 from typing import Optional,List
 
 from app.core.config import settings
-from app.core.models import MatchResult,TailoredContent,Job
+from app.core.models import MatchResult,TailoredContent,Job,ApplicationStatus
 from app.ai.prompts import (
     MATCH_SYSTEM_PROMPT,
     build_tailor_prompt,
     build_match_prompt,
     TAILOR_SYSTEM_PROMPT
 )
+from app.ai.cache import LLMCache, get_llm_cache, served_from_cache
+from app.ai.usage import get_usage_meter
+from app.core.tracing import span
+from app.ai.ratelimit import (
+    get_rate_limiter,
+    estimate_tokens,
+    is_rate_limit_error,
+    backoff_delay,
+)
+
+# Rough completion sizes, used only to reserve tokens/min capacity up front
+EXPECTED_OUTPUT_TOKENS = {
+    MatchResult: 500,
+    TailoredContent: 2500,
+}
+
+# Pipeline stage each schema's calls are accounted to
+STAGES = {
+    MatchResult: "match",
+    TailoredContent: "tailor",
+}
 
 def get_chat_model(provider=settings.ai_provider,model=None):
     """
@@ -51,49 +74,155 @@ class LangChainAIEngine:
     def __init__(self, provider: str = settings.ai_provider, model: Optional[str] = None):
         self.llm = get_chat_model(provider, model)
         self.provider = provider
+        self.rate_limiter = get_rate_limiter(provider)
+        # Tailoring requests sent to the provider (cache hits excluded)
+        self.tailor_calls = 0
         model_name = model or self.llm.model_name if hasattr(
             self.llm, 'model_name') else "default"
+        self.model_name = model_name
+        self.cache = get_llm_cache()
         print(f"LangChain AI Engine initialized ({provider}: {model_name})")
 
-    def match_job(self, job: Job, cv_text: str) -> MatchResult:
-        """Analyze job match using the configured LLM provider."""
+    # Cached, rate limited invocation
+
+    def _cache_key(self, schema, messages) -> Optional[str]:
+        """Content address of a request, or None when caching is off."""
+        if self.cache is None:
+            return None
+        (_, system_prompt), (_, user_prompt) = messages
+        return LLMCache.make_key(
+            f"{self.provider}:{self.model_name}", system_prompt, user_prompt, schema)
+
+    def _parsed(self, output, trace, schema, job_id: Optional[str]):
+        """Unpack an include_raw=True result, recording its token usage."""
+        usage = getattr(output["raw"], "usage_metadata", None) or {}
+        # Input tokens the provider served from its prompt cache (OpenAI: prompt_tokens_details)
+        prompt_cached = (usage.get("input_token_details") or {}).get("cache_read") or 0
+        trace.set(input_tokens=usage.get("input_tokens"),
+                  cached_input_tokens=prompt_cached,
+                  output_tokens=usage.get("output_tokens"))
+        get_usage_meter().record(self.model_name, STAGES[schema], job_id,
+                                 usage.get("input_tokens") or 0, usage.get("output_tokens") or 0,
+                                 cached_input_tokens=prompt_cached)
+        if output.get("parsing_error") is not None:
+            raise output["parsing_error"]
+        return output["parsed"]
+
+    def _invoke_structured(self, schema, messages, job_id: Optional[str] = None):
+        """Invoke the LLM for a structured schema.
+
+        Cache hits return without touching the API; misses are paced by the
+        provider's rate limiter and retried on 429s.
+        """
         # with_structured_output wraps the LLM to return Pydantic models
-        structured_llm = self.llm.with_structured_output(MatchResult)
+        # (include_raw keeps the AIMessage, whose usage_metadata has the token counts)
+        structured_llm = self.llm.with_structured_output(schema, include_raw=True)
+        tokens = estimate_tokens(*(content for _, content in messages)) \
+            + EXPECTED_OUTPUT_TOKENS[schema]
+
+        with span("llm", schema.__name__, provider=self.provider, model=self.model_name) as trace:
+            key = self._cache_key(schema, messages)
+            if key:
+                cached = self.cache.get(key, schema)
+                if cached is not None:
+                    trace.set(cache="hit")
+                    get_usage_meter().record(self.model_name, STAGES[schema], job_id, 0, 0, cached=True)
+                    return cached
+
+            for attempt in range(settings.llm_max_retries + 1):
+                self.rate_limiter.acquire(tokens)
+                try:
+                    result = self._parsed(structured_llm.invoke(messages), trace, schema, job_id)
+                    trace.set(attempts=attempt + 1)
+                    if key and result is not None:
+                        self.cache.put(key, result)
+                    return result
+                except Exception as e:
+                    if attempt >= settings.llm_max_retries or not is_rate_limit_error(e):
+                        raise
+                    delay = backoff_delay(attempt)
+                    print(f" Rate limited ({self.provider}), retrying in {delay:.1f}s...")
+                    time.sleep(delay)
+
+    async def _ainvoke_structured(self, schema, messages, job_id: Optional[str] = None):
+        """Async version of _invoke_structured() built on ainvoke."""
+        structured_llm = self.llm.with_structured_output(schema, include_raw=True)
+        tokens = estimate_tokens(*(content for _, content in messages)) \
+            + EXPECTED_OUTPUT_TOKENS[schema]
+
+        with span("llm", schema.__name__, provider=self.provider, model=self.model_name) as trace:
+            key = self._cache_key(schema, messages)
+            if key:
+                cached = self.cache.get(key, schema)
+                if cached is not None:
+                    trace.set(cache="hit")
+                    get_usage_meter().record(self.model_name, STAGES[schema], job_id, 0, 0, cached=True)
+                    return cached
+
+            for attempt in range(settings.llm_max_retries + 1):
+                await self.rate_limiter.aacquire(tokens)
+                try:
+                    result = self._parsed(await structured_llm.ainvoke(messages), trace, schema, job_id)
+                    trace.set(attempts=attempt + 1)
+                    if key and result is not None:
+                        self.cache.put(key, result)
+                    return result
+                except Exception as e:
+                    if attempt >= settings.llm_max_retries or not is_rate_limit_error(e):
+                        raise
+                    delay = backoff_delay(attempt)
+                    print(f" Rate limited ({self.provider}), retrying in {delay:.1f}s...")
+                    await asyncio.sleep(delay)
 
+    # Job matching
+
+    def _match_messages(self, job: Job, cv_text: str) -> list:
         user_prompt = build_match_prompt(
             job_title=job.title,
             job_company=job.company,
             job_description=job.description,
             cv_text=cv_text,
         )
+        return [
+            ("system", MATCH_SYSTEM_PROMPT),
+            ("human", user_prompt),
+        ]
+
+    def _match_failed(self, error: Exception) -> MatchResult:
+        print(f" Match failed ({self.provider}): {error}")
+        return MatchResult(
+            match_score=0.0,
+            reasoning=f"Analysis failed: {str(error)}",
+            key_requirements=[],
+            missing_skills=[],
+            failed=True,
+        )
 
+    def match_job(self, job: Job, cv_text: str) -> MatchResult:
+        """Analyze job match using the configured LLM provider."""
         try:
-            messages = [
-                ("system", MATCH_SYSTEM_PROMPT),
-                ("human", user_prompt),
-            ]
-            result = structured_llm.invoke(messages)
-            return result
+            return self._invoke_structured(
+                MatchResult, self._match_messages(job, cv_text), job.id)
+        except Exception as e:
+            return self._match_failed(e)
 
+    async def amatch_job(self, job: Job, cv_text: str) -> MatchResult:
+        """Async version of match_job()."""
+        try:
+            return await self._ainvoke_structured(
+                MatchResult, self._match_messages(job, cv_text), job.id)
         except Exception as e:
-            print(f" Match failed ({self.provider}): {e}")
-            return MatchResult(
-                match_score=0.0,
-                reasoning=f"Analysis failed: {str(e)}",
-                key_requirements=[],
-                missing_skills=[],
-            )
+            return self._match_failed(e)
 
-    def tailor_content(
+    # Content tailoring
+
+    def _tailor_messages(
         self,
         job: Job,
         cv_text: str,
         cover_letter_template: str,
         match_result: MatchResult,
-    ) -> TailoredContent:
-        """Generate tailored content using the configured LLM provider."""
-        structured_llm = self.llm.with_structured_output(TailoredContent)
-
+    ) -> list:
         user_prompt = build_tailor_prompt(
             job_title=job.title,
             job_company=job.company,
@@ -102,22 +231,57 @@ class LangChainAIEngine:
             cover_letter_template=cover_letter_template,
             match_reasoning=match_result.reasoning,
         )
+        return [
+            ("system", TAILOR_SYSTEM_PROMPT),
+            ("human", user_prompt),
+        ]
+
+    def _tailor_failed(self, error: Exception, cv_text: str,
+                       cover_letter_template: str) -> TailoredContent:
+        print(f" Tailoring failed ({self.provider}): {error}")
+        return TailoredContent(
+            tailored_cv=cv_text,
+            cover_letter=cover_letter_template,
+            why_good_fit=[f"Tailoring failed: {str(error)}"],
+        )
 
+    def tailor_content(
+        self,
+        job: Job,
+        cv_text: str,
+        cover_letter_template: str,
+        match_result: MatchResult,
+    ) -> TailoredContent:
+        """Generate tailored content using the configured LLM provider."""
+        messages = self._tailor_messages(
+            job, cv_text, cover_letter_template, match_result)
         try:
-            messages = [
-                ("system", TAILOR_SYSTEM_PROMPT),
-                ("human", user_prompt),
-            ]
-            result = structured_llm.invoke(messages)
-            return result
+            return self._invoke_structured(TailoredContent, messages, job.id)
+        except Exception as e:
+            return self._tailor_failed(e, cv_text, cover_letter_template)
+        finally:
+            if not served_from_cache():
+                self.tailor_calls += 1
 
+    async def atailor_content(
+        self,
+        job: Job,
+        cv_text: str,
+        cover_letter_template: str,
+        match_result: MatchResult,
+    ) -> TailoredContent:
+        """Async version of tailor_content()."""
+        messages = self._tailor_messages(
+            job, cv_text, cover_letter_template, match_result)
+        try:
+            return await self._ainvoke_structured(TailoredContent, messages, job.id)
         except Exception as e:
-            print(f" Tailoring failed ({self.provider}): {e}")
-            return TailoredContent(
-                tailored_cv=cv_text,
-                cover_letter=cover_letter_template,
-                why_good_fit=[f"Tailoring failed: {str(e)}"],
-            )
+            return self._tailor_failed(e, cv_text, cover_letter_template)
+        finally:
+            if not served_from_cache():
+                self.tailor_calls += 1
+
+    # Batch processing
 
     def analyze_batch(
         self,
@@ -125,42 +289,51 @@ class LangChainAIEngine:
         cv_text: str,
         cover_letter_template: str,
         min_score: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
     ) -> List[dict]:
-        """Process multiple jobs with the configured provider."""
-        threshold = min_score or settings.min_match_score
-        results = []
+        """Match (and tailor, above the threshold) a batch of jobs concurrently.
 
-        print(
-            f"\nAnalyzing {len(jobs)} jobs via {self.provider} (threshold: {threshold}%)...\n")
+        Outside the graph, e.g. from scripts. Results are in input order.
+        """
+        return asyncio.run(self.analyze_batch_async(
+            jobs, cv_text, cover_letter_template, min_score, max_concurrency))
 
-        for i, job in enumerate(jobs, 1):
-            print(f"[{i}/{len(jobs)}] {job.title} @ {job.company}...", end=" ")
+    async def analyze_batch_async(
+        self,
+        jobs: List[Job],
+        cv_text: str,
+        cover_letter_template: str,
+        min_score: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> List[dict]:
+        """Async analyze_batch(): up to llm_max_concurrency calls in flight.
 
-            match_result = self.match_job(job, cv_text)
-            score = match_result.match_score
+        A semaphore bounds in-flight LLM calls, the provider's RateLimiter
+        paces them, and asyncio.gather keeps results in input order.
+        """
+        threshold = min_score or settings.min_match_score
+        slots = asyncio.Semaphore(max_concurrency or settings.llm_max_concurrency)
 
-            job.match_score = score
+        async def process(job: Job) -> dict:
+            async with slots:
+                match_result = await self.amatch_job(job, cv_text)
+            entry = {"job": job, "match_result": match_result, "tailored_content": None}
+            if match_result.failed:
+                # Not scored: the job keeps its status
+                return entry
+            job.match_score = match_result.match_score
             job.match_reasoning = match_result.reasoning
 
-            entry = {
-                "job": job,
-                "match_result": match_result,
-                "tailored_content": None,
-            }
-
-            if score >= threshold:
-                print(f" {score}% — MATCH! Tailoring...")
-                job.status = "matched"
-                tailored = self.tailor_content(
-                    job, cv_text, cover_letter_template, match_result
-                )
-                entry["tailored_content"] = tailored
+            if match_result.match_score >= threshold:
+                job.status = ApplicationStatus.MATCHED
+                async with slots:
+                    entry["tailored_content"] = await self.atailor_content(
+                        job, cv_text, cover_letter_template, match_result)
             else:
-                print(f" {score}% — Below threshold.")
-                job.status = "skipped"
-
-            results.append(entry)
+                job.status = ApplicationStatus.SKIPPED
+            return entry
 
+        results = await asyncio.gather(*(process(job) for job in jobs))
         matched = sum(1 for r in results if r["tailored_content"] is not None)
         print(f"\n Results: {matched}/{len(jobs)} matched (≥{threshold}%)")
-        return results
\ No newline at end of file
+        return list(results)
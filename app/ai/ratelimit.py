@@ -0,0 +1,111 @@
+# app/ai/ratelimit.py
+
+"""
+Client-side rate limiting for LLM providers.
+
+Every provider caps us on requests/min AND tokens/min. When we fire
+requests concurrently we have to pace ourselves, otherwise half the batch
+comes back as HTTP 429 and we pay for the retries in wall-clock time.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+
+class RateLimiter:
+    """Token-bucket limiter for requests/min and tokens/min.
+
+    Thread-safe, so the same limiter can pace sync calls (graph nodes run in
+    worker threads) and async calls (the PIPELINE_MODE stream) for one provider.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.rpm = max(1, requests_per_minute)
+        self.tpm = max(1, tokens_per_minute)
+        self._request_allowance = float(self.rpm)
+        self._token_allowance = float(self.tpm)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._request_allowance = min(
+            self.rpm, self._request_allowance + elapsed * self.rpm / 60.0)
+        self._token_allowance = min(
+            self.tpm, self._token_allowance + elapsed * self.tpm / 60.0)
+
+    def _reserve(self, tokens: int) -> float:
+        """Reserve capacity for one request. Returns seconds to wait (0 = go)."""
+        # A single request larger than the whole bucket would wait forever
+        tokens = min(tokens, self.tpm)
+        with self._lock:
+            self._refill()
+            if self._request_allowance >= 1 and self._token_allowance >= tokens:
+                self._request_allowance -= 1
+                self._token_allowance -= tokens
+                return 0.0
+
+            request_wait = max(0.0, (1 - self._request_allowance) * 60.0 / self.rpm)
+            token_wait = max(0.0, (tokens - self._token_allowance) * 60.0 / self.tpm)
+            return max(request_wait, token_wait)
+
+    def acquire(self, tokens: int = 0) -> None:
+        """Block until the request fits in both budgets."""
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int = 0) -> None:
+        """Async version of acquire() -- yields to the event loop while waiting."""
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+
+# One limiter per provider, shared by every engine instance in the process
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    """Return the shared limiter for a provider, creating it on first use."""
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = RateLimiter(
+                requests_per_minute=settings.llm_requests_per_minute,
+                tokens_per_minute=settings.llm_tokens_per_minute,
+            )
+        return _limiters[provider]
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Rough token estimate (~4 characters per token) used for pacing only."""
+    return sum(len(t) for t in texts) // 4
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Detect a 429 across providers without importing their SDKs."""
+    status: Optional[int] = getattr(error, "status_code", None)
+    if status is None:
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+    if status == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "rate_limit" in message
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Exponential backoff with full jitter: uniform(0, min(cap, base * 2^attempt))."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
@@ -0,0 +1,204 @@
+# app/ai/usage.py
+
+"""
+Token and cost accounting for LLM calls.
+
+Every provider response reports how many prompt and completion tokens it
+used. The engines hand those numbers to one UsageMeter per process. The
+meter keeps running totals for the run, for each stage ("match", "tailor")
+and for each job, and prices them from MODEL_PRICES or the LLM_PRICE_*
+settings. Totals are saved as data/usage/<run id>.json next to the run's
+trace, and loaded back when a run is resumed.
+
+Input tokens the provider served from its prompt cache (the shared system
+prompt + CV prefix, see app/ai/prompts.py) are counted separately as
+cached_input_tokens and priced at the model's cached-input rate, so
+`report --usage` can show how much of each stage's input was cached.
+
+LLM_BUDGET_TOKENS / LLM_BUDGET_USD turn the totals into a hard stop: once
+either is reached, the match and tailor stages stop starting new calls.
+The budget is checked just before each call starts (in PIPELINE_MODE, after
+the call has its LLM_MAX_CONCURRENCY slot), and calls already in flight
+still finish. A run therefore overshoots by at most the calls in flight at
+once: LLM_MAX_CONCURRENCY with PIPELINE_MODE, GRAPH_MAX_CONCURRENCY (one per
+fan-out branch) in graph mode. A model with no known price costs 0, so
+begin() warns that LLM_BUDGET_USD cannot trigger until LLM_PRICE_* is set.
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+# USD per million (input, output, cached input) tokens; LLM_PRICE_* settings take precedence
+MODEL_PRICES = {
+    "gpt-5-nano": (0.05, 0.40, 0.005),
+    "gpt-5-mini": (0.25, 2.00, 0.025),
+    "gpt-5": (1.25, 10.00, 0.125),
+    "gpt-4o-mini": (0.15, 0.60, 0.075),
+    "gpt-4o": (2.50, 10.00, 1.25),
+    "gpt-4.1-nano": (0.10, 0.40, 0.025),
+    "gpt-4.1-mini": (0.40, 1.60, 0.10),
+    "llama-3.3-70b-versatile": (0.59, 0.79, 0.59),
+}
+
+
+def model_price(model: str) -> Optional[tuple]:
+    """(input, output, cached input) USD per million tokens, or None when the model is unknown."""
+    if settings.llm_price_input_per_mtok is not None or settings.llm_price_output_per_mtok is not None:
+        # No cached-input override: assume no discount rather than guess one
+        input_price = settings.llm_price_input_per_mtok or 0.0
+        return (input_price, settings.llm_price_output_per_mtok or 0.0, input_price)
+    # Longest prefix wins, so dated snapshots ("gpt-4o-mini-2024-07-18") match their family
+    for name in sorted(MODEL_PRICES, key=len, reverse=True):
+        if model and model.startswith(name):
+            return MODEL_PRICES[name]
+    return None
+
+
+def _empty() -> Dict[str, float]:
+    return {"calls": 0, "cached_calls": 0, "input_tokens": 0, "cached_input_tokens": 0,
+            "output_tokens": 0, "cost_usd": 0.0}
+
+
+def _loaded(bucket: Dict[str, float]) -> Dict[str, float]:
+    # Usage files saved before a counter existed simply lack it
+    return {**_empty(), **bucket}
+
+
+def load_usage(path: Path) -> dict:
+    """A saved usage summary, with counters added since it was written filled in as 0."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["total"] = _loaded(data.get("total", {}))
+    for key in ("by_stage", "by_job"):
+        data[key] = {k: _loaded(v) for k, v in data.get(key, {}).items()}
+    return data
+
+
+def prompt_cache_rate(bucket: Dict[str, float]) -> float:
+    """Fraction of a bucket's input tokens served from the provider's prompt cache."""
+    return bucket["cached_input_tokens"] / bucket["input_tokens"] if bucket["input_tokens"] else 0.0
+
+
+class UsageMeter:
+    """Thread-safe running totals of LLM usage for one run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.session: Optional[str] = None
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.total = _empty()
+            self.by_stage: Dict[str, Dict[str, float]] = {}
+            self.by_job: Dict[str, Dict[str, float]] = {}
+            self._warned = False
+
+    # ---------- recording ----------
+
+    def record(self, model: str, stage: str, job_id: Optional[str],
+               input_tokens: int, output_tokens: int, cached: bool = False,
+               cached_input_tokens: int = 0) -> None:
+        """Add one call. Cache hits count as calls with no tokens and no cost.
+
+        `cached_input_tokens` is the part of `input_tokens` the provider read
+        from its prompt cache; it is billed at the cached-input rate.
+        """
+        price = model_price(model)
+        cost = 0.0
+        if price and not cached:
+            cost = ((input_tokens - cached_input_tokens) * price[0] + output_tokens * price[1]
+                    + cached_input_tokens * price[2]) / 1_000_000
+
+        with self._lock:
+            buckets = [self.total, self.by_stage.setdefault(stage, _empty())]
+            if job_id:
+                buckets.append(self.by_job.setdefault(job_id, _empty()))
+            for bucket in buckets:
+                bucket["calls"] += 1
+                bucket["cached_calls"] += int(cached)
+                bucket["input_tokens"] += input_tokens
+                bucket["cached_input_tokens"] += cached_input_tokens
+                bucket["output_tokens"] += output_tokens
+                bucket["cost_usd"] += cost
+
+    # ---------- budget ----------
+
+    def exhausted(self) -> Optional[str]:
+        """Why the run's LLM budget is used up, or None while there is budget left."""
+        tokens = self.total["input_tokens"] + self.total["output_tokens"]
+        reason = None
+        if settings.llm_budget_tokens is not None and tokens >= settings.llm_budget_tokens:
+            reason = f"token budget reached ({tokens:,} / {settings.llm_budget_tokens:,})"
+        elif settings.llm_budget_usd is not None and self.total["cost_usd"] >= settings.llm_budget_usd:
+            reason = f"cost budget reached (${self.total['cost_usd']:.4f} / ${settings.llm_budget_usd:.4f})"
+        if reason:
+            with self._lock:
+                if not self._warned:
+                    self._warned = True
+                    print(f"   LLM budget exhausted: {reason}. Stopping match/tailor.")
+        return reason
+
+    # ---------- persistence ----------
+
+    def path_for(self, session: str) -> Path:
+        return settings.usage_dir / f"{session}.json"
+
+    def begin(self, session: str) -> None:
+        """Start metering run `session`, continuing its totals if it was saved before."""
+        self.reset()
+        self.session = session
+        if settings.llm_budget_usd is not None and model_price(settings.model) is None:
+            print(f"   No price known for model {settings.model}: LLM_BUDGET_USD will not be enforced. "
+                  "Set LLM_PRICE_INPUT_PER_MTOK / LLM_PRICE_OUTPUT_PER_MTOK.")
+        path = self.path_for(session)
+        if path.exists():
+            data = load_usage(path)
+            with self._lock:
+                self.total = data["total"]
+                self.by_stage = data["by_stage"]
+                self.by_job = data["by_job"]
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "session": self.session,
+                "total": dict(self.total),
+                "by_stage": {k: dict(v) for k, v in self.by_stage.items()},
+                "by_job": {k: dict(v) for k, v in self.by_job.items()},
+                "budget": {"tokens": settings.llm_budget_tokens, "usd": settings.llm_budget_usd},
+            }
+
+    def save(self) -> Optional[Path]:
+        """Write the totals to data/usage/<session>.json (no-op outside a run)."""
+        if not self.session:
+            return None
+        path = self.path_for(self.session)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".part")
+        tmp.write_text(json.dumps(self.summary(), indent=2), encoding="utf-8")
+        tmp.replace(path)
+        return path
+
+    def describe(self) -> str:
+        t = self.total
+        return (f"{t['calls']} calls ({t['cached_calls']} cached), "
+                f"{t['input_tokens']:,} in ({prompt_cache_rate(t):.0%} prompt-cached) / "
+                f"{t['output_tokens']:,} out tokens, "
+                f"${t['cost_usd']:.4f}")
+
+
+_meter: Optional[UsageMeter] = None
+_meter_lock = threading.Lock()
+
+
+def get_usage_meter() -> UsageMeter:
+    """Return the shared meter."""
+    global _meter
+    with _meter_lock:
+        if _meter is None:
+            _meter = UsageMeter()
+        return _meter
@@ -1,9 +1,64 @@
 from .browser import BrowserManager
+from .form_analyzer import ANALYZE_JS, FIELD_HINTS, NAME_KEYS, PROBE_JS, FormPlan, plan_form
+from .form_cache import domain_of, get_form_cache
+from .artifacts import get_artifact_store
 from app.core.models import UserProfile
-from typing import Optional
+from app.core.config import settings
+from app.core.tracing import record_span
+from typing import Dict, List, Optional, Tuple
 import time
 import os
 
+# ==================== READINESS & CONFIRMATION SIGNALS ====================
+# Instead of sleeping a fixed time we wait for something concrete to happen,
+# bounded by the *_timeout_ms settings.
+
+# Any visible, fillable form control means the form has hydrated
+FORM_FIELD_SELECTOR = (
+    "input:not([type='hidden']):not([type='submit']):not([type='button']), "
+    "textarea, select"
+)
+
+# Text that shows up on typical "application received" pages
+SUCCESS_TEXT_PATTERN = (
+    r"submitted successfully|application (has been |was )?(submitted|received|sent)"
+    r"|thank(s| you) for (applying|your application)|we('ve| have) received"
+)
+
+# Resolves once the page shows a post-submit signal: it navigated away, the
+# form was hidden/removed, or visible text matches SUCCESS_TEXT_PATTERN.
+CONFIRMATION_JS = """
+([startUrl, pattern]) => {
+    if (location.href !== startUrl) return "navigation";
+    const forms = Array.from(document.querySelectorAll("form"));
+    if (window.__gigclawHadForm && !forms.some(f => f.offsetParent !== null)) return "form-hidden";
+    const text = document.body ? document.body.innerText : "";
+    if (new RegExp(pattern, "i").test(text)) return "success-text";
+    return false;
+}
+"""
+MARK_FORM_JS = "() => { window.__gigclawHadForm = !!document.querySelector('form'); }"
+
+
+class PhaseTimer:
+    """Collects wall time per phase of one application"""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._start = self._last = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.timings[phase] = round(now - self._last, 3)
+        record_span("browser", phase, now - self._last)
+        self._last = now
+
+    def finish(self) -> Dict[str, float]:
+        self.timings["total"] = round(time.perf_counter() - self._start, 3)
+        parts = " | ".join(f"{k} {v:.2f}s" for k, v in self.timings.items())
+        print(f"   Timing: {parts}")
+        return self.timings
+
 
 class GenericFormFiller:
     """
@@ -12,104 +67,139 @@ class GenericFormFiller:
     then either submits (live mode) or holds (draft mode).
     """
 
-    def __init__(self, browser_manager: BrowserManager):
+    def __init__(self, browser_manager: Optional[BrowserManager] = None):
+        # Only fill() needs a manager; afill() works on a page it is handed
         self.manager = browser_manager
 
-    def _try_fill(self, page, label: str, value: str) -> bool:
-        """
-        Attempt to fill a field by label. Returns True if successful.
-        Uses Playwright's get_by_label for accessible, human-like selection.
-        """
-        try:
-            field = page.get_by_label(label, exact=False).first
-            if field.is_visible():
-                field.fill(value)
-                print(f"   Filled '{label}': {value}")
-                return True
-        except Exception:
-            pass
+    def _profile_values(self, profile: UserProfile,
+                        cover_letter: Optional[str]) -> Dict[str, str]:
+        """Profile values keyed like FIELD_HINTS; empty ones are left out."""
+        cover_letter = cover_letter or getattr(profile, "cover_letter_template", None)
+        first, _, last = (profile.name or "").strip().partition(" ")
+        values = {
+            "first_name": first,
+            "last_name": last.strip(),
+            "name": profile.name,
+            "email": profile.email,
+            "phone": getattr(profile, "phone", None),
+            "linkedin": getattr(profile, "linkedin", None),
+            "cover_letter": cover_letter[:500] if cover_letter else None,
+        }
+        return {key: value for key, value in values.items() if value}
 
-        # Fallback: try placeholder text
-        try:
-            field = page.get_by_placeholder(label, exact=False).first
-            if field.is_visible():
-                field.fill(value)
-                print(f"   Filled '{label}' (via placeholder): {value}")
-                return True
-        except Exception:
-            pass
+    def _report_plan(self, plan: FormPlan, values: Dict[str, str]) -> None:
+        name_filled = any(key in plan.fields for key in NAME_KEYS)
+        for key in values:
+            if key in NAME_KEYS and name_filled:
+                continue
+            if key not in plan.fields:
+                print(f"   '{key}' field not found.")
+        if plan.upload is None:
+            print("   File upload input not found.")
 
-        print(f"   '{label}' field not found.")
-        return False
+    def _cached_selectors(self, job_url: str) -> Optional[List[str]]:
+        """Selectors to probe for, or None when there is nothing cached for the domain."""
+        cache = get_form_cache()
+        candidates = cache.candidates(job_url) if cache else []
+        if not candidates:
+            return None
+        return sorted({s for plan in candidates for s in plan.selectors()})
 
-    def _try_upload_file(self, page, file_path: str) -> bool:
-        """Attempt to upload a file via input[type='file']."""
-        try:
-            file_input = page.locator("input[type='file']").first
-            if file_input.count() > 0:
-                file_input.set_input_files(file_path)
-                print(f"   Uploaded file: {file_path}")
-                return True
-        except Exception:
-            pass
+    def _resolve_plan(self, job_url: str, probe: Optional[dict],
+                      snapshot: Optional[dict]) -> Tuple[Optional[FormPlan], bool]:
+        """Turn a PROBE_JS / ANALYZE_JS result into a plan. Returns (plan, from_cache)."""
+        cache = get_form_cache()
+        if probe is not None:
+            plan = cache.lookup(job_url, probe)
+            if plan is not None:
+                print(f"   Using cached form mapping for {domain_of(job_url)}")
+                return plan, True
+        if snapshot is None:
+            return None, False
+        # Map every known field, not just the ones this profile fills, so a
+        # cached plan still serves a profile that later gains a phone number
+        plan = plan_form(snapshot, list(FIELD_HINTS))
+        if cache:
+            cache.store(job_url, plan)
+        return plan, False
 
-        print("   File upload input not found.")
-        return False
+    def _plan(self, page, job_url: str) -> Tuple[FormPlan, bool]:
+        """Cached mapping if it still fits the page, else one-pass discovery."""
+        selectors = self._cached_selectors(job_url)
+        if selectors is not None:
+            plan, cached = self._resolve_plan(job_url, page.evaluate(PROBE_JS, selectors), None)
+            if plan is not None:
+                return plan, cached
+        return self._resolve_plan(job_url, None, page.evaluate(ANALYZE_JS))
 
-    def _try_submit(self, page) -> bool:
-        """
-        Attempt to click a submit/apply button using heuristics.
-        Searches for common button text patterns found on job application forms.
-        """
-        submit_patterns = [
-            "Submit Application",
-            "Submit",
-            "Apply Now",
-            "Apply",
-            "Send Application",
-            "Send",
-        ]
-
-        # Strategy 1: Find by button role + text
-        for pattern in submit_patterns:
-            try:
-                btn = page.get_by_role(
-                    "button", name=pattern, exact=False).first
-                if btn.is_visible():
-                    print(f"   Found submit button: '{pattern}'")
-                    btn.click()
-                    print(f"   CLICKED '{pattern}' button.")
-                    return True
-            except Exception:
+    def _fill_plan(self, page, plan: FormPlan, values: Dict[str, str], cv_path: str) -> List[str]:
+        """Fill every mapped field by its selector, then upload the CV.
+        Returns the selectors that failed."""
+        failed = []
+        for key, selector in plan.fields.items():
+            if key not in values:
                 continue
+            try:
+                page.fill(selector, values[key])
+                print(f"   Filled '{key}': {values[key]}")
+            except Exception as e:
+                print(f"   Could not fill '{key}' ({selector}): {e}")
+                failed.append(selector)
+        if plan.upload and cv_path and os.path.exists(cv_path):
+            try:
+                page.set_input_files(plan.upload, cv_path)
+                print(f"   Uploaded file: {cv_path}")
+            except Exception as e:
+                print(f"   Could not upload CV ({plan.upload}): {e}")
+                failed.append(plan.upload)
+        self._report_plan(plan, values)
+        return failed
 
-        # Strategy 2: Find by button type="submit"
-        try:
-            btn = page.locator("button[type='submit']").first
-            if btn.is_visible():
-                text = btn.inner_text() or "submit"
-                print(f"   Found type='submit' button: '{text}'")
-                btn.click()
-                print(f"   CLICKED submit button.")
-                return True
-        except Exception:
-            pass
+    def _forget_plan(self, job_url: str, plan: FormPlan, from_cache: bool,
+                     failed: List[str]) -> None:
+        """A cached selector that failed to fill means the site changed its form."""
+        cache = get_form_cache()
+        if cache and from_cache and failed:
+            print("   Cached form mapping is stale; it will be rediscovered next time.")
+            cache.invalidate(job_url, plan)
+
+    def _submit(self, page, plan: FormPlan) -> bool:
+        """Click the submit button the analyzer picked."""
+        if not plan.submit:
+            print("   No submit button found.")
+            return False
+        print(f"   Found submit button: '{plan.submit_text}'")
+        page.click(plan.submit)
+        print(f"   CLICKED '{plan.submit_text}' button.")
+        return True
 
-        # Strategy 3: Find by input type="submit"
+    def _wait_ready(self, page) -> bool:
+        """Wait until a form control is visible (bounded by form_ready_timeout_ms)."""
         try:
-            btn = page.locator("input[type='submit']").first
-            if btn.is_visible():
-                print(f"   Found input[type='submit']")
-                btn.click()
-                print(f"   CLICKED submit input.")
-                return True
+            page.wait_for_selector(FORM_FIELD_SELECTOR, state="visible",
+                                   timeout=settings.form_ready_timeout_ms)
+            return True
         except Exception:
-            pass
+            print("   No visible form field appeared; filling what is there.")
+            return False
 
-        print("   No submit button found.")
-        return False
+    def _wait_confirmation(self, page, start_url: str) -> Optional[str]:
+        """Wait for a post-submit signal. Returns which one fired, or None on timeout."""
+        try:
+            handle = page.wait_for_function(
+                CONFIRMATION_JS, arg=[start_url, SUCCESS_TEXT_PATTERN],
+                timeout=settings.submit_confirm_timeout_ms)
+            return handle.json_value()
+        except Exception as e:
+            # A full navigation tears down the context we were polling in
+            if "context was destroyed" in str(e) or "navigat" in str(e).lower():
+                page.wait_for_load_state("domcontentloaded")
+                return "navigation"
+            return None
 
-    def fill(self, job_url: str, profile: UserProfile, cv_path: str, draft_mode: bool = True):
+    def fill(self, job_url: str, profile: UserProfile, cv_path: str, draft_mode: bool = True,
+             cover_letter: Optional[str] = None,
+             artifacts: Optional[List[str]] = None) -> Dict[str, float]:
         """
         Navigates to URL and attempts to fill the application form.
 
@@ -119,77 +209,211 @@ class GenericFormFiller:
             cv_path: Path to the CV/resume file
             draft_mode: If True, fills form but does NOT submit.
                         If False, fills form AND clicks submit.
-        """
-        # Ensure screenshots directory exists
-        os.makedirs("data/screenshots", exist_ok=True)
+            cover_letter: Tailored cover letter for this job. Falls back to
+                          the profile's generic template when not given.
+            artifacts: If given, names of the screenshots taken (including the
+                       error screenshot on failure) are appended to it.
 
+        Returns:
+            Seconds spent per phase (navigate, ready, fill, submit, screenshot, total)
+        """
         # Start a fresh context (Incognito)
         context, page = self.manager.new_context()
 
         try:
+            timer = PhaseTimer()
             print(f"   Navigating to {job_url}")
-            page.goto(str(job_url), timeout=30000)
+            page.goto(str(job_url), timeout=30000, wait_until="domcontentloaded")
+            timer.lap("navigate")
 
-            # Allow time for hydration (SPA sites)
-            page.wait_for_load_state("networkidle")
+            # Hydration (SPA sites): wait for the form itself, not for network silence
+            self._wait_ready(page)
+            timer.lap("ready")
 
             # --- FILL FIELDS USING HEURISTICS ---
-            # Each _try_fill call attempts label match, then placeholder fallback
+            # A cached mapping for this domain is checked first; otherwise one
+            # evaluate() discovers every field and button, matching to the
+            # profile happens locally, then each field is filled directly
+            values = self._profile_values(profile, cover_letter)
+            plan, from_cache = self._plan(page, job_url)
+            failed = self._fill_plan(page, plan, values, cv_path)
+            self._forget_plan(job_url, plan, from_cache, failed)
+            timer.lap("fill")
 
-            # 1. Name
-            self._try_fill(page, "Name", profile.name)
+            # --- SUBMIT OR HOLD ---
+            if draft_mode:
+                print("   DRAFT MODE: Form filled but NOT submitted.")
+                if settings.draft_hold_ms:
+                    print(f"   Holding browser open for {settings.draft_hold_ms}ms to verify...")
+                    page.wait_for_timeout(settings.draft_hold_ms)
+            else:
+                print("   LIVE MODE: Attempting to submit application...")
+                start_url = page.url
+                page.evaluate(MARK_FORM_JS)
+                submitted = self._submit(page, plan)
+                if submitted:
+                    # Wait for a confirmation signal instead of a fixed sleep
+                    signal = self._wait_confirmation(page, start_url)
+                    if signal:
+                        print(f"   Application submitted! (confirmed by {signal})")
+                    else:
+                        print("   Submitted, but no confirmation seen before timeout.")
+                else:
+                    print(
+                        "   WARNING: Could not find submit button. Form filled but not submitted.")
+            timer.lap("submit")
+
+            # Take a screenshot for evidence/audit (content-hash named)
+            names = get_artifact_store().capture(page, "draft" if draft_mode else "applied")
+            if artifacts is not None:
+                artifacts.extend(names)
+            print(f"   Screenshot saved: {', '.join(names)}")
+            timer.lap("screenshot")
+            return timer.finish()
+
+        except Exception as e:
+            print(f"   Automation Error: {e}")
+            try:
+                names = get_artifact_store().capture(page, "error")
+                if artifacts is not None:
+                    artifacts.extend(names)
+            except Exception:
+                pass
+            raise e
 
-            # 2. Email
-            self._try_fill(page, "Email", profile.email)
+        finally:
+            context.close()
 
-            # 3. Phone (if profile has it)
-            if hasattr(profile, "phone") and profile.phone:
-                self._try_fill(page, "Phone", profile.phone)
+    # ==================== ASYNC (used by ApplicationEngine) ====================
+    # Same flow as above, on playwright.async_api pages, so many
+    # applications can be in flight on one event loop.
 
-            # 4. LinkedIn (if profile has it)
-            if hasattr(profile, "linkedin") and profile.linkedin:
-                self._try_fill(page, "LinkedIn", profile.linkedin)
+    async def _aplan(self, page, job_url: str) -> Tuple[FormPlan, bool]:
+        """Async version of _plan()."""
+        selectors = self._cached_selectors(job_url)
+        if selectors is not None:
+            probe = await page.evaluate(PROBE_JS, selectors)
+            plan, cached = self._resolve_plan(job_url, probe, None)
+            if plan is not None:
+                return plan, cached
+        return self._resolve_plan(job_url, None, await page.evaluate(ANALYZE_JS))
 
-            # 5. Cover Letter text (try to paste into a textarea)
-            if hasattr(profile, "cover_letter_template") and profile.cover_letter_template:
-                self._try_fill(page, "Cover Letter",
-                               profile.cover_letter_template[:500])
+    async def _afill_plan(self, page, plan: FormPlan, values: Dict[str, str],
+                          cv_path: str) -> List[str]:
+        """Async version of _fill_plan()."""
+        failed = []
+        for key, selector in plan.fields.items():
+            if key not in values:
+                continue
+            try:
+                await page.fill(selector, values[key])
+                print(f"   Filled '{key}': {values[key]}")
+            except Exception as e:
+                print(f"   Could not fill '{key}' ({selector}): {e}")
+                failed.append(selector)
+        if plan.upload and cv_path and os.path.exists(cv_path):
+            try:
+                await page.set_input_files(plan.upload, cv_path)
+                print(f"   Uploaded file: {cv_path}")
+            except Exception as e:
+                print(f"   Could not upload CV ({plan.upload}): {e}")
+                failed.append(plan.upload)
+        self._report_plan(plan, values)
+        return failed
 
-            # 6. Upload CV
-            if cv_path and os.path.exists(cv_path):
-                self._try_upload_file(page, cv_path)
+    async def _asubmit(self, page, plan: FormPlan) -> bool:
+        """Async version of _submit()."""
+        if not plan.submit:
+            print("   No submit button found.")
+            return False
+        print(f"   Found submit button: '{plan.submit_text}'")
+        await page.click(plan.submit)
+        print(f"   CLICKED '{plan.submit_text}' button.")
+        return True
+
+    async def _await_ready(self, page) -> bool:
+        """Async version of _wait_ready()."""
+        try:
+            await page.wait_for_selector(FORM_FIELD_SELECTOR, state="visible",
+                                         timeout=settings.form_ready_timeout_ms)
+            return True
+        except Exception:
+            print("   No visible form field appeared; filling what is there.")
+            return False
+
+    async def _await_confirmation(self, page, start_url: str) -> Optional[str]:
+        """Async version of _wait_confirmation()."""
+        try:
+            handle = await page.wait_for_function(
+                CONFIRMATION_JS, arg=[start_url, SUCCESS_TEXT_PATTERN],
+                timeout=settings.submit_confirm_timeout_ms)
+            return await handle.json_value()
+        except Exception as e:
+            if "context was destroyed" in str(e) or "navigat" in str(e).lower():
+                await page.wait_for_load_state("domcontentloaded")
+                return "navigation"
+            return None
+
+    async def afill(self, page, job_url: str, profile: UserProfile, cv_path: str,
+                    draft_mode: bool = True, cover_letter: Optional[str] = None,
+                    artifacts: Optional[List[str]] = None) -> Dict[str, float]:
+        """
+        Async version of fill() that works on a page it is handed.
+        The caller owns the browser context (see ApplicationEngine),
+        so contexts can be pooled and reused across applications.
+        """
+
+        try:
+            timer = PhaseTimer()
+            print(f"   Navigating to {job_url}")
+            await page.goto(str(job_url), timeout=30000, wait_until="domcontentloaded")
+            timer.lap("navigate")
+
+            await self._await_ready(page)
+            timer.lap("ready")
+
+            # --- FILL FIELDS USING HEURISTICS ---
+            values = self._profile_values(profile, cover_letter)
+            plan, from_cache = await self._aplan(page, job_url)
+            failed = await self._afill_plan(page, plan, values, cv_path)
+            self._forget_plan(job_url, plan, from_cache, failed)
+            timer.lap("fill")
 
             # --- SUBMIT OR HOLD ---
             if draft_mode:
                 print("   DRAFT MODE: Form filled but NOT submitted.")
-                print("   Holding browser open for 5 seconds to verify...")
-                page.wait_for_timeout(5000)
+                if settings.draft_hold_ms:
+                    await page.wait_for_timeout(settings.draft_hold_ms)
             else:
                 print("   LIVE MODE: Attempting to submit application...")
-                submitted = self._try_submit(page)
+                start_url = page.url
+                await page.evaluate(MARK_FORM_JS)
+                submitted = await self._asubmit(page, plan)
                 if submitted:
-                    # Wait for confirmation page to load
-                    page.wait_for_timeout(3000)
-                    print("   Application submitted!")
+                    signal = await self._await_confirmation(page, start_url)
+                    if signal:
+                        print(f"   Application submitted! (confirmed by {signal})")
+                    else:
+                        print("   Submitted, but no confirmation seen before timeout.")
                 else:
                     print(
                         "   WARNING: Could not find submit button. Form filled but not submitted.")
+            timer.lap("submit")
 
-            # Take a screenshot for evidence/audit
-            timestamp = int(time.time())
-            mode_tag = "draft" if draft_mode else "applied"
-            screenshot_path = f"data/screenshots/{mode_tag}_{timestamp}.png"
-            page.screenshot(path=screenshot_path)
-            print(f"   Screenshot saved: {screenshot_path}")
+            # Take a screenshot for evidence/audit (content-hash named)
+            names = await get_artifact_store().acapture(page, "draft" if draft_mode else "applied")
+            if artifacts is not None:
+                artifacts.extend(names)
+            print(f"   Screenshot saved: {', '.join(names)}")
+            timer.lap("screenshot")
+            return timer.finish()
 
         except Exception as e:
             print(f"   Automation Error: {e}")
             try:
-                page.screenshot(
-                    path=f"data/screenshots/error_{int(time.time())}.png")
+                names = await get_artifact_store().acapture(page, "error")
+                if artifacts is not None:
+                    artifacts.extend(names)
             except Exception:
                 pass
             raise e
-
-        finally:
-            context.close()
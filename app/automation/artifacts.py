@@ -0,0 +1,215 @@
+# app/automation/artifacts.py
+
+"""
+Content-addressed store for application screenshots.
+
+Screenshots used to land in data/screenshots/{mode}_{unix_seconds}.png:
+concurrent applications finishing in the same second overwrote each other,
+and nothing was ever deleted. Here every image is named by the hash of its
+bytes (identical screenshots are stored once), saved as JPEG by default,
+and indexed in a small SQLite file so old or excess artifacts can be pruned
+against a retention period and a size cap (checked every
+ARTIFACTS_PRUNE_EVERY saves, not on each one). A compressed viewport thumbnail
+is always kept; the full-page image only when SCREENSHOT_FULL_PAGE is on or
+the caller asks for it (errors always get one).
+
+Playwright can only encode PNG and JPEG. WebP output and downscaled
+thumbnails need Pillow; without it the store falls back to JPEG at
+viewport size.
+"""
+
+import asyncio
+import hashlib
+import io
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+try:
+    from PIL import Image
+except ImportError:  # optional: only needed for WebP and resized thumbnails
+    Image = None
+
+THUMBNAIL_WIDTH = 480
+
+
+class ArtifactStore:
+    """Screenshots on disk under data/artifacts/<hh>/<hash>.<ext>, indexed in SQLite."""
+
+    def __init__(self, directory: Optional[Path] = None):
+        self.directory = Path(directory or settings.artifacts_dir)
+        self.max_bytes = settings.artifacts_max_mb * 1024 * 1024
+        self.retention_seconds = settings.artifacts_retention_days * 86400
+        self.prune_every = max(1, settings.artifacts_prune_every)
+        self._saves = 0
+        self.format = settings.screenshot_format.lower()
+        if self.format == "webp" and Image is None:
+            print("   Pillow is not installed; storing screenshots as JPEG instead of WebP.")
+            self.format = "jpeg"
+        self._lock = threading.Lock()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.directory / "index.sqlite"),
+                                     check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS artifacts (
+                name TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                variant TEXT NOT NULL,
+                bytes INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_artifacts_last_used ON artifacts(last_used);
+            """
+        )
+        self._conn.commit()
+
+    # ---------- encoding ----------
+
+    def screenshot_options(self, full: bool) -> Dict:
+        """Arguments for page.screenshot() for a thumbnail or a full image."""
+        quality = settings.screenshot_quality if full else settings.screenshot_thumb_quality
+        options = {"full_page": full, "scale": "css"}
+        if self.format == "png" or (Image is not None and self.format == "webp"):
+            # Lossless capture; Pillow re-encodes WebP afterwards
+            options["type"] = "png"
+        else:
+            options.update(type="jpeg", quality=quality)
+        return options
+
+    def _encode(self, data: bytes, full: bool) -> Tuple[bytes, str]:
+        """Final bytes and file extension for a raw page.screenshot() result."""
+        if Image is None:
+            return data, "png" if self.format == "png" else "jpg"
+        if self.format == "png" and full:
+            return data, "png"
+
+        image = Image.open(io.BytesIO(data))
+        if not full and image.width > THUMBNAIL_WIDTH:
+            height = round(image.height * THUMBNAIL_WIDTH / image.width)
+            image = image.resize((THUMBNAIL_WIDTH, height))
+        quality = settings.screenshot_quality if full else settings.screenshot_thumb_quality
+        out = io.BytesIO()
+        if self.format == "webp":
+            image.save(out, "WEBP", quality=quality)
+            return out.getvalue(), "webp"
+        if self.format == "png":
+            image.save(out, "PNG", optimize=True)
+            return out.getvalue(), "png"
+        image.convert("RGB").save(out, "JPEG", quality=quality, optimize=True)
+        return out.getvalue(), "jpg"
+
+    # ---------- storage ----------
+
+    def path_for(self, name: str) -> Path:
+        return self.directory / name[:2] / name
+
+    def save(self, data: bytes, kind: str, full: bool) -> str:
+        """Store one screenshot; returns its artifact name (hash + extension)."""
+        data, ext = self._encode(data, full)
+        name = f"{hashlib.sha256(data).hexdigest()[:32]}.{ext}"
+        path = self.path_for(name)
+        now = time.time()
+        with self._lock:
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(".part")
+                tmp.write_bytes(data)
+                tmp.replace(path)
+            self._conn.execute(
+                "INSERT INTO artifacts(name, kind, variant, bytes, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET last_used = excluded.last_used",
+                (name, kind, "full" if full else "thumb", len(data), now, now),
+            )
+            self._conn.commit()
+            # A full prune scans the index: amortise it over several saves
+            self._saves += 1
+            if self._saves % self.prune_every == 0:
+                self._prune()
+        return name
+
+    def _plan_captures(self, kind: str, full: Optional[bool]) -> List[bool]:
+        """Thumbnail always; full image on request, by setting, or for errors."""
+        if full is None:
+            full = settings.screenshot_full_page or kind == "error"
+        return [False, True] if full else [False]
+
+    def capture(self, page, kind: str, full: Optional[bool] = None) -> List[str]:
+        """Screenshot a sync Playwright page into the store."""
+        return [self.save(page.screenshot(**self.screenshot_options(variant)), kind, variant)
+                for variant in self._plan_captures(kind, full)]
+
+    async def acapture(self, page, kind: str, full: Optional[bool] = None) -> List[str]:
+        """Async version of capture().
+
+        Encoding, the file write and the index commit run in a worker thread,
+        so the other apply workers on the event loop are not held up.
+        """
+        names = []
+        for variant in self._plan_captures(kind, full):
+            data = await page.screenshot(**self.screenshot_options(variant))
+            names.append(await asyncio.to_thread(self.save, data, kind, variant))
+        return names
+
+    # ---------- retention ----------
+
+    def _delete(self, names: List[str]) -> None:
+        for name in names:
+            self.path_for(name).unlink(missing_ok=True)
+        self._conn.executemany("DELETE FROM artifacts WHERE name = ?", [(n,) for n in names])
+
+    def _prune(self) -> int:
+        """Drop artifacts past retention, then least recently used ones over the size cap."""
+        removed = 0
+        if self.retention_seconds:
+            cutoff = time.time() - self.retention_seconds
+            expired = [n for (n,) in self._conn.execute(
+                "SELECT name FROM artifacts WHERE last_used < ?", (cutoff,))]
+            self._delete(expired)
+            removed += len(expired)
+
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM artifacts").fetchone()
+        if self.max_bytes and total > self.max_bytes:
+            victims = []
+            for name, size in self._conn.execute(
+                    "SELECT name, bytes FROM artifacts ORDER BY last_used"):
+                if total <= self.max_bytes:
+                    break
+                victims.append(name)
+                total -= size
+            self._delete(victims)
+            removed += len(victims)
+
+        if removed:
+            self._conn.commit()
+        return removed
+
+    def prune(self) -> int:
+        with self._lock:
+            return self._prune()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            count, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM artifacts").fetchone()
+        return {"artifacts": count, "size_bytes": size}
+
+
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Return the shared store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore()
+        return _store
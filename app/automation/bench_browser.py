@@ -0,0 +1,174 @@
+# app/automation/bench_browser.py
+
+"""
+Benchmark: default vs lean browser contexts on local fixtures.
+
+Serves app/tests/fixtures over a local HTTP server that adds latency to
+every asset (heavy_job.html pulls ~6MB of images, fonts and video plus four
+tracker scripts), maps the tracker hosts to that same server, and loads each
+fixture repeatedly in a default and a lean context. Reports time to
+DOMContentLoaded, to the load event and to the first visible form field,
+bytes served, JS heap from the DevTools Performance domain and Chromium RSS.
+
+Usage:
+    python -m app.automation.bench_browser              # 5 runs per mode
+    python -m app.automation.bench_browser 10           # custom run count
+"""
+
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from playwright.sync_api import sync_playwright
+
+from app.automation.applicator import FORM_FIELD_SELECTOR
+from app.automation.browser import (
+    CONTEXT_OPTIONS, LAUNCH_ARGS, LEAN_CONTEXT_OPTIONS, TRACKER_DOMAINS, _lean_route,
+)
+
+FIXTURES_DIR = Path(__file__).resolve().parents[1] / "tests" / "fixtures"
+FIXTURES = ["mock_job.html", "heavy_job.html"]
+
+CONTENT_TYPES = {
+    ".css": "text/css", ".js": "application/javascript", ".woff2": "font/woff2",
+    ".jpg": "image/jpeg", ".png": "image/png", ".mp4": "video/mp4",
+}
+
+
+class _FixtureHandler(SimpleHTTPRequestHandler):
+    """Fixtures from disk; /asset/<name>?kb=N&ms=M returns N KB after M ms;
+    anything requested on a tracker host returns a tiny script after 200ms."""
+
+    bytes_served = 0
+    lock = threading.Lock()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=str(FIXTURES_DIR), **kwargs)
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body: bytes, content_type: str, delay_ms: int) -> None:
+        time.sleep(delay_ms / 1000)
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+        with self.lock:
+            _FixtureHandler.bytes_served += len(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        host = (self.headers.get("Host") or "").split(":")[0]
+        if any(host == d or host.endswith("." + d) for d in TRACKER_DOMAINS):
+            return self._send(b"/* tracker */", "application/javascript", 200)
+        if url.path.startswith("/asset/"):
+            query = parse_qs(url.query)
+            kb = int(query.get("kb", ["10"])[0])
+            ms = int(query.get("ms", ["50"])[0])
+            content_type = CONTENT_TYPES.get(Path(url.path).suffix, "application/octet-stream")
+            return self._send(b"\0" * kb * 1024, content_type, ms)
+        with self.lock:
+            target = FIXTURES_DIR / url.path.lstrip("/")
+            if target.is_file():
+                _FixtureHandler.bytes_served += target.stat().st_size
+        return super().do_GET()
+
+
+def _chromium_rss_mb() -> Optional[float]:
+    """Resident memory of all Chromium processes (Linux only)."""
+    if not Path("/proc").exists():
+        return None
+    total_kb = 0
+    for pid in filter(str.isdigit, os.listdir("/proc")):
+        try:
+            exe = Path(f"/proc/{pid}/cmdline").read_bytes().split(b"\0")[0]
+            name = os.path.basename(exe).lower()
+            if b"chrom" not in name and b"headless_shell" not in name:
+                continue
+            for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    total_kb += int(line.split()[1])
+        except OSError:
+            continue
+    return total_kb / 1024
+
+
+def measure(browser, url: str, lean: bool) -> Dict[str, float]:
+    """Load `url` once in a fresh context and collect timings and memory."""
+    context = browser.new_context(**(LEAN_CONTEXT_OPTIONS if lean else CONTEXT_OPTIONS))
+    if lean:
+        context.route("**/*", _lean_route)
+    page = context.new_page()
+    blocked = []
+    page.on("requestfailed", lambda request: blocked.append(request.url))
+    before = _FixtureHandler.bytes_served
+
+    start = time.perf_counter()
+    page.goto(url, wait_until="commit")
+    page.wait_for_load_state("domcontentloaded")
+    dcl = time.perf_counter() - start
+    page.wait_for_selector(FORM_FIELD_SELECTOR, state="visible")
+    ready = time.perf_counter() - start
+    page.wait_for_load_state("load")
+    load = time.perf_counter() - start
+
+    cdp = context.new_cdp_session(page)
+    cdp.send("Performance.enable")
+    metrics = {m["name"]: m["value"] for m in cdp.send("Performance.getMetrics")["metrics"]}
+    rss = _chromium_rss_mb()
+    context.close()
+
+    return {
+        "dcl_ms": dcl * 1000,
+        "ready_ms": ready * 1000,
+        "load_ms": load * 1000,
+        "kb_served": (_FixtureHandler.bytes_served - before) / 1024,
+        "blocked": len(blocked),
+        "js_heap_mb": metrics.get("JSHeapUsedSize", 0) / 1024 / 1024,
+        "rss_mb": rss if rss is not None else float("nan"),
+    }
+
+
+def run(runs: int = 5) -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FixtureHandler)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # Send tracker hosts to the local server so the default mode pays their
+    # latency without touching the network
+    rules = ",".join(f"MAP *{d} 127.0.0.1:{port},MAP {d} 127.0.0.1:{port}"
+                     for d in TRACKER_DOMAINS)
+    args = LAUNCH_ARGS + [f"--host-resolver-rules={rules}"]
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True, args=args)
+        try:
+            print(f"{'fixture':<16} {'mode':<8} {'DCL ms':>8} {'ready ms':>9} {'load ms':>8} "
+                  f"{'KB served':>10} {'blocked':>8} {'heap MB':>8} {'RSS MB':>8}")
+            for fixture in FIXTURES:
+                url = f"http://127.0.0.1:{port}/{fixture}"
+                for lean in (False, True):
+                    # One warm-up load so both modes start from the same state
+                    measure(browser, url, lean)
+                    samples: List[Dict[str, float]] = [measure(browser, url, lean) for _ in range(runs)]
+                    med = {k: statistics.median(s[k] for s in samples) for k in samples[0]}
+                    print(f"{fixture:<16} {'lean' if lean else 'default':<8} "
+                          f"{med['dcl_ms']:>8.0f} {med['ready_ms']:>9.0f} {med['load_ms']:>8.0f} "
+                          f"{med['kb_served']:>10.0f} {med['blocked']:>8.0f} "
+                          f"{med['js_heap_mb']:>8.1f} {med['rss_mb']:>8.0f}")
+        finally:
+            browser.close()
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
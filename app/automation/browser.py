@@ -1,23 +1,92 @@
 from playwright.sync_api import sync_playwright, Browser, BrowserContext, Page, Playwright
 from typing import Optional
+from urllib.parse import urlparse
+
+from app.core.config import settings
+
+LAUNCH_ARGS = [
+    "--start-maximized",
+    "--disable-blink-features=AutomationControlled",
+    "--no-sandbox"
+]
+CONTEXT_OPTIONS = {
+    "viewport": {"width": 1920, "height": 1080},
+    # Spoof specific User Agent to look human
+    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+}
+
+# ==================== LEAN MODE ====================
+# Filling a form needs the DOM and its scripts, not pictures, web fonts,
+# video or analytics. Lean contexts abort those requests and render into a
+# smaller viewport, which cuts page-load time and renderer memory.
+
+LEAN_CONTEXT_OPTIONS = {
+    **CONTEXT_OPTIONS,
+    "viewport": {"width": 1280, "height": 800},
+}
+
+# Analytics, ads and session-recording hosts (matched as domain suffixes)
+TRACKER_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "facebook.net",
+    "hotjar.com",
+    "segment.io",
+    "segment.com",
+    "mixpanel.com",
+    "amplitude.com",
+    "fullstory.com",
+    "intercom.io",
+    "hs-analytics.net",
+    "clarity.ms",
+    "px.ads.linkedin.com",
+    "bat.bing.com",
+)
+
+
+def is_blocked_request(resource_type: str, url: str) -> bool:
+    """True if a lean context should not load this request"""
+    if resource_type in settings.browser_lean_block_types:
+        return True
+    host = urlparse(url).hostname or ""
+    return any(host == d or host.endswith("." + d) for d in TRACKER_DOMAINS)
+
+
+def _lean_route(route):
+    request = route.request
+    if is_blocked_request(request.resource_type, request.url):
+        route.abort()
+    else:
+        route.continue_()
+
+
+async def _alean_route(route):
+    request = route.request
+    if is_blocked_request(request.resource_type, request.url):
+        await route.abort()
+    else:
+        await route.continue_()
 
 
 class BrowserManager:
     """
-    Singleton to manage the Playwright instance.
-    Prevents spinning up 1000 Chrome instances.
+    Owns one Playwright instance and one browser for synchronous callers
+    (scripts, fill()). Playwright's sync API is bound to the thread that
+    started it, so create one manager per thread; concurrent and
+    multi-process applying goes through BrowserPool instead.
     """
-    _instance = None
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(BrowserManager, cls).__new__(cls)
-            cls._instance.playwright = None
-            cls._instance.browser = None
-        return cls._instance
+    def __init__(self):
+        self.playwright: Optional[Playwright] = None
+        self.browser: Optional[Browser] = None
+        self.lean = False
 
-    def start(self, headless: bool = False):
-        """Launches the browser (Headed by default for debugging)"""
+    def start(self, headless: bool = False, lean: bool = False):
+        """Launches the browser (Headed by default for debugging).
+        lean=True makes every new context block non-essential requests."""
+        self.lean = lean
         if not self.playwright:
             print("Launching Playwright...")
             self.playwright = sync_playwright().start()
@@ -27,23 +96,18 @@ class BrowserManager:
             # We use stealth args to avoid basic bot detection
             self.browser = self.playwright.chromium.launch(
                 headless=headless,
-                args=[
-                    "--start-maximized",
-                    "--disable-blink-features=AutomationControlled",
-                    "--no-sandbox"
-                ]
+                args=LAUNCH_ARGS
             )
 
-    def new_context(self) -> tuple[BrowserContext, Page]:
+    def new_context(self, lean: Optional[bool] = None) -> tuple[BrowserContext, Page]:
         """Creates a fresh Incognito session"""
         if not self.browser:
             self.start()
 
-        context = self.browser.new_context(
-            viewport={"width": 1920, "height": 1080},
-            # Spoof specific User Agent to look human
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        )
+        lean = self.lean if lean is None else lean
+        context = self.browser.new_context(**(LEAN_CONTEXT_OPTIONS if lean else CONTEXT_OPTIONS))
+        if lean:
+            context.route("**/*", _lean_route)
         page = context.new_page()
         return context, page
 
@@ -0,0 +1,204 @@
+# app/automation/engine.py
+
+"""
+Parallel application engine.
+
+Filling a form is mostly waiting: for navigation, for hydration, for the
+confirmation page. Instead of applying to jobs one after another, the engine
+keeps N applications in flight on one event loop, each on a page leased from
+a BrowserPool. A failure only affects its own job; the context it used is
+discarded and the other workers keep going. run_processes() splits a large
+batch across worker processes, each with its own event loop and pool.
+"""
+
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+from app.automation.applicator import GenericFormFiller
+from app.automation.pool import BrowserPool
+from app.core.config import settings
+from app.core.models import UserProfile
+from app.core.tracing import current_session, span, start_session
+
+
+class ApplicationTask(BaseModel):
+    """One form to fill"""
+    job_id: str
+    url: str
+    cv_path: Optional[str] = None
+    cover_letter: Optional[str] = None
+
+
+class ApplicationOutcome(BaseModel):
+    """What happened to one ApplicationTask"""
+    job_id: str
+    success: bool
+    seconds: float
+    error: Optional[str] = None
+    timings: Dict[str, float] = {}
+    artifacts: List[str] = []
+
+
+class EngineStats(BaseModel):
+    """Throughput of one engine run"""
+    workers: int = 0
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    wall_seconds: float = 0.0
+    busy_seconds: float = 0.0
+
+    @property
+    def jobs_per_minute(self) -> float:
+        """Completed applications per minute; failures don't count as throughput"""
+        return self.succeeded / self.wall_seconds * 60 if self.wall_seconds else 0.0
+
+    @property
+    def avg_seconds(self) -> float:
+        return self.busy_seconds / self.total if self.total else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.succeeded}/{self.total} applications in {self.wall_seconds:.1f}s "
+                f"({self.jobs_per_minute:.1f} jobs/min, avg {self.avg_seconds:.1f}s/job, "
+                f"{self.workers} workers, {self.failed} failed)")
+
+
+class ApplicationEngine:
+    """Fill many application forms concurrently from a pool of browser contexts.
+
+    Usage:
+        engine = ApplicationEngine(workers=4)
+        outcomes = engine.run_sync(tasks, profile, draft_mode=True)
+        print(engine.stats.summary())
+    """
+
+    def __init__(self, pool: Optional[BrowserPool] = None,
+                 workers: Optional[int] = None,
+                 filler: Optional[GenericFormFiller] = None):
+        self.pool = pool
+        self.workers = max(1, workers or settings.apply_workers)
+        self.filler = filler or GenericFormFiller()
+        self.stats = EngineStats()
+
+    def finish_stats(self, outcomes: List[ApplicationOutcome], start: float) -> None:
+        """Fill in self.stats for a run that began at perf_counter() `start`."""
+        self.stats.wall_seconds = time.perf_counter() - start
+        self.stats.busy_seconds = sum(o.seconds for o in outcomes)
+        self.stats.succeeded = sum(1 for o in outcomes if o.success)
+        self.stats.failed = self.stats.total - self.stats.succeeded
+        print(f"   Engine: {self.stats.summary()}")
+
+    async def apply(self, pool: BrowserPool, task: ApplicationTask, profile: UserProfile,
+                    draft_mode: bool = True) -> ApplicationOutcome:
+        """Fill one form on a page leased from `pool`. Never raises."""
+        task_start = time.perf_counter()
+        artifacts: List[str] = []
+        try:
+            # Browser phases recorded by the filler nest under this span
+            with span("browser", "apply", job_id=task.job_id, url=task.url):
+                async with pool.page() as page:
+                    timings = await self.filler.afill(
+                        page, task.url, profile, task.cv_path,
+                        draft_mode=draft_mode, cover_letter=task.cover_letter,
+                        artifacts=artifacts)
+            return ApplicationOutcome(
+                job_id=task.job_id, success=True, artifacts=artifacts,
+                seconds=time.perf_counter() - task_start, timings=timings or {})
+        except Exception as e:
+            # The pool has already thrown away the context this job used
+            print(f"   Failed to apply to {task.url}: {e}")
+            return ApplicationOutcome(
+                job_id=task.job_id, success=False, error=str(e), artifacts=artifacts,
+                seconds=time.perf_counter() - task_start)
+
+    async def run(self, tasks: List[ApplicationTask], profile: UserProfile,
+                  draft_mode: bool = True) -> List[ApplicationOutcome]:
+        """Apply to every task; outcomes come back in input order."""
+        self.stats = EngineStats(workers=min(self.workers, len(tasks)), total=len(tasks))
+        if not tasks:
+            return []
+
+        # A pool we create is ours to close; a pool we were handed is not
+        owned = self.pool is None
+        pool = BrowserPool.for_workers(self.stats.workers) if owned else self.pool
+        await pool.start()
+        # At most `workers` pages in flight, even if the pool is larger
+        slots = asyncio.Semaphore(self.stats.workers)
+        start = time.perf_counter()
+
+        async def apply(task: ApplicationTask) -> ApplicationOutcome:
+            async with slots:
+                return await self.apply(pool, task, profile, draft_mode)
+
+        try:
+            outcomes = list(await asyncio.gather(*(apply(task) for task in tasks)))
+        finally:
+            if owned:
+                await pool.close()
+
+        self.finish_stats(outcomes, start)
+        return outcomes
+
+    def run_sync(self, tasks: List[ApplicationTask], profile: UserProfile,
+                 draft_mode: bool = True) -> List[ApplicationOutcome]:
+        """Blocking wrapper for graph nodes and scripts."""
+        return asyncio.run(self.run(tasks, profile, draft_mode))
+
+    def run_processes(self, tasks: List[ApplicationTask], profile: UserProfile,
+                      draft_mode: bool = True,
+                      processes: Optional[int] = None) -> List[ApplicationOutcome]:
+        """Split tasks across worker processes, each with its own engine and pool.
+
+        `workers` is the total concurrency and is divided between processes.
+        With a single process this is just run_sync().
+        """
+        processes = max(1, min(processes or settings.apply_processes, len(tasks) or 1))
+        if processes == 1:
+            return self.run_sync(tasks, profile, draft_mode)
+
+        self.stats = EngineStats(workers=min(self.workers, len(tasks)), total=len(tasks))
+        per_process = max(1, self.workers // processes)
+        # Round-robin so one slow domain doesn't pile up in a single process
+        chunks = [tasks[i::processes] for i in range(processes)]
+        start = time.perf_counter()
+
+        # spawn, not fork: Playwright's driver connection must not be inherited
+        by_id: Dict[str, ApplicationOutcome] = {}
+        with ProcessPoolExecutor(max_workers=processes,
+                                 mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = [executor.submit(_run_chunk, [t.model_dump() for t in chunk],
+                                       profile.model_dump(), draft_mode, per_process,
+                                       current_session())
+                       for chunk in chunks]
+            for chunk, future in zip(chunks, futures):
+                try:
+                    for data in future.result():
+                        outcome = ApplicationOutcome(**data)
+                        by_id[outcome.job_id] = outcome
+                except Exception as e:
+                    # The worker died: every job in its chunk counts as failed
+                    print(f"   Worker process failed: {e}")
+                    for task in chunk:
+                        by_id[task.job_id] = ApplicationOutcome(
+                            job_id=task.job_id, success=False, seconds=0.0, error=str(e))
+
+        outcomes = [by_id[task.job_id] for task in tasks]
+        self.finish_stats(outcomes, start)
+        return outcomes
+
+
+def _run_chunk(tasks: List[dict], profile: dict, draft_mode: bool,
+               workers: int, session: Optional[str] = None) -> List[dict]:
+    """Worker-process entry point for ApplicationEngine.run_processes()."""
+    # Spans from this process go to the parent's trace file (if it is tracing)
+    if session:
+        start_session(session)
+    engine = ApplicationEngine(workers=workers)
+    outcomes = engine.run_sync([ApplicationTask(**t) for t in tasks],
+                               UserProfile(**profile), draft_mode)
+    return [o.model_dump() for o in outcomes]
@@ -0,0 +1,245 @@
+#app/automation/form_analyzer.py
+
+"""
+Single-pass form discovery.
+
+Probing the page label by label costs two or three browser round trips per
+field (locator, is_visible, fill) and another one per submit pattern. Here one
+page.evaluate() call snapshots every visible control with its label, aria
+attributes, placeholder, name and a selector that addresses it directly, plus
+every clickable button. Matching those against the profile happens locally in
+Python, so a form is filled with one call per field that actually exists.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+# Button texts commonly found on job application forms, most specific first
+SUBMIT_PATTERNS = [
+    "Submit Application",
+    "Submit",
+    "Apply Now",
+    "Apply",
+    "Send Application",
+    "Send",
+]
+
+# Profile field -> words that identify its form control, most specific first.
+# Matched against label / aria-label / placeholder / name / id / autocomplete.
+# Split name fields come first so they claim First/Last Name controls before
+# "name" is considered (see plan_form()).
+FIELD_HINTS: Dict[str, List[str]] = {
+    "first_name": ["first name", "given name", "firstname", "forename", "fname"],
+    "last_name": ["last name", "family name", "surname", "lastname", "lname"],
+    "name": ["full name", "your name", "name"],
+    "email": ["email", "e-mail"],
+    "phone": ["phone", "mobile", "telephone", "tel"],
+    "linkedin": ["linkedin"],
+    "cover_letter": ["cover letter", "covering letter", "motivation", "cover"],
+}
+
+# Labels that contain a hint word but are about something else
+FIELD_EXCLUDES: Dict[str, List[str]] = {
+    "first_name": ["company", "last", "middle", "school"],
+    "last_name": ["company", "first", "middle", "school"],
+    "name": ["company", "user", "first", "last", "middle", "file", "reference", "school"],
+    "email": ["confirm"],
+}
+
+# Keys that all receive the candidate's name; a form gets either the split
+# pair or the single field
+NAME_KEYS = ("first_name", "last_name", "name")
+
+# Input types that settle the match on their own
+FIELD_TYPES: Dict[str, str] = {"email": "email", "phone": "tel"}
+
+UPLOAD_HINTS = ["cv", "resume", "résumé"]
+
+# Shape of the form: tag, type and name/id of every control, sorted. Two visits
+# to the same ATS template produce the same string (see form_cache.py).
+SIGNATURE_FN = """
+    const formSignature = () => Array.from(document.querySelectorAll("input, textarea, select"))
+        .map(el => `${el.tagName.toLowerCase()}:${(el.getAttribute("type") || "").toLowerCase()}:${el.getAttribute("name") || el.id}`)
+        .filter(s => !s.includes(":hidden:"))
+        .sort().join("|");
+"""
+
+# Collects every visible control and button in one round trip. Each entry
+# gets a selector that addresses it directly: #id, tag[name=...] or
+# tag[type=...] when that is unique on the page, otherwise a data attribute
+# stamped on the element (only valid for this page load).
+ANALYZE_JS = """
+() => {""" + SIGNATURE_FN + """
+    const visible = el => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+    const unique = sel => { try { return document.querySelectorAll(sel).length === 1; } catch (e) { return false; } };
+    let n = 0;
+    const selectorFor = el => {
+        if (el.id && unique("#" + CSS.escape(el.id))) return "#" + CSS.escape(el.id);
+        const tag = el.tagName.toLowerCase();
+        const name = el.getAttribute("name");
+        if (name) {
+            const sel = `${tag}[name="${CSS.escape(name)}"]`;
+            if (unique(sel)) return sel;
+        }
+        const type = el.getAttribute("type");
+        if (type && unique(`${tag}[type="${type}"]`)) return `${tag}[type="${type}"]`;
+        const mark = el.getAttribute("data-gigclaw") || String(n++);
+        el.setAttribute("data-gigclaw", mark);
+        return `[data-gigclaw="${mark}"]`;
+    };
+    const labelFor = el => {
+        const parts = [];
+        if (el.labels) for (const l of el.labels) parts.push(l.innerText);
+        const by = el.getAttribute("aria-labelledby");
+        if (by) for (const id of by.split(/\\s+/)) {
+            const ref = document.getElementById(id);
+            if (ref) parts.push(ref.innerText);
+        }
+        return parts.join(" ").trim();
+    };
+    const fields = [];
+    for (const el of document.querySelectorAll("input, textarea, select")) {
+        const type = (el.getAttribute("type") || el.tagName).toLowerCase();
+        if (["hidden", "submit", "button", "reset", "image"].includes(type)) continue;
+        // File inputs are often visually hidden behind a styled button
+        if (type !== "file" && !visible(el)) continue;
+        if (el.disabled || el.readOnly) continue;
+        fields.push({
+            selector: selectorFor(el),
+            tag: el.tagName.toLowerCase(),
+            type: type,
+            label: labelFor(el),
+            aria_label: el.getAttribute("aria-label") || "",
+            placeholder: el.getAttribute("placeholder") || "",
+            name: el.getAttribute("name") || "",
+            id: el.id || "",
+            autocomplete: el.getAttribute("autocomplete") || "",
+        });
+    }
+    const buttons = [];
+    for (const el of document.querySelectorAll("button, input[type=submit], [role=button]")) {
+        if (!visible(el) || el.disabled) continue;
+        buttons.push({
+            selector: selectorFor(el),
+            text: (el.innerText || el.value || el.getAttribute("aria-label") || "").trim(),
+            type: (el.getAttribute("type") || "").toLowerCase(),
+        });
+    }
+    return {fields, buttons, signature: formSignature()};
+}
+"""
+
+# Cheap check for cached selectors: the page's signature plus which of the
+# given selectors resolve to an element. Used instead of ANALYZE_JS on a
+# cache hit.
+PROBE_JS = """
+(selectors) => {""" + SIGNATURE_FN + """
+    const found = selectors.filter(sel => {
+        try { return !!document.querySelector(sel); } catch (e) { return false; }
+    });
+    return {signature: formSignature(), found};
+}
+"""
+
+
+class FormField(BaseModel):
+    """A fillable control as seen by ANALYZE_JS"""
+    selector: str
+    tag: str
+    type: str
+    label: str = ""
+    aria_label: str = ""
+    placeholder: str = ""
+    name: str = ""
+    id: str = ""
+    autocomplete: str = ""
+
+    def text(self) -> str:
+        """Everything that describes the field, lowercased, for keyword matching"""
+        raw = " ".join([self.label, self.aria_label, self.placeholder,
+                        self.name, self.id, self.autocomplete])
+        # cover_letter / coverLetter / cover-letter -> "cover letter"; the raw
+        # text is kept too so words like "LinkedIn" survive the camelCase split
+        split = re.sub(r"([a-z])([A-Z])", r"\1 \2", raw)
+        return re.sub(r"[_\-\[\]]+", " ", f"{raw} {split}").lower()
+
+
+class FormButton(BaseModel):
+    """A clickable button as seen by ANALYZE_JS"""
+    selector: str
+    text: str = ""
+    type: str = ""
+
+
+class FormPlan(BaseModel):
+    """Which selector receives which profile value, plus upload and submit targets"""
+    fields: Dict[str, str] = {}
+    upload: Optional[str] = None
+    submit: Optional[str] = None
+    submit_text: Optional[str] = None
+    signature: str = ""
+
+    def selectors(self) -> List[str]:
+        """Every selector the plan would touch"""
+        extra = [s for s in (self.upload, self.submit) if s]
+        return list(self.fields.values()) + extra
+
+    def is_stable(self) -> bool:
+        """False if any selector is a per-page-load data-gigclaw mark"""
+        return not any(s.startswith("[data-gigclaw") for s in self.selectors())
+
+
+def _match_score(field: FormField, key: str) -> int:
+    """How well a field matches a profile key; 0 means not at all"""
+    text = field.text()
+    if any(word in text for word in FIELD_EXCLUDES.get(key, [])):
+        return 0
+    if FIELD_TYPES.get(key) == field.type:
+        return 100
+    hints = FIELD_HINTS[key]
+    for rank, hint in enumerate(hints):
+        if re.search(rf"\b{re.escape(hint)}\b", text):
+            # The visible label beats name/id attributes
+            in_label = hint in f"{field.label} {field.aria_label}".lower()
+            return (len(hints) - rank) * 10 + (5 if in_label else 0)
+    return 0
+
+
+def plan_form(snapshot: dict, wanted: List[str]) -> FormPlan:
+    """Map an ANALYZE_JS snapshot onto the profile keys in `wanted`."""
+    fields = [FormField(**f) for f in snapshot.get("fields", [])]
+    buttons = [FormButton(**b) for b in snapshot.get("buttons", [])]
+    plan = FormPlan(signature=snapshot.get("signature", ""))
+
+    taken = set()
+    for key in wanted:
+        candidates = [f for f in fields if f.type != "file" and f.selector not in taken]
+        if key == "cover_letter":
+            # Prefer a textarea; a one-line input can't hold a letter
+            candidates.sort(key=lambda f: f.tag != "textarea")
+        best = max(candidates, key=lambda f: _match_score(f, key), default=None)
+        if best is not None and _match_score(best, key) > 0:
+            plan.fields[key] = best.selector
+            taken.add(best.selector)
+
+    # First/Last Name fields win over a lone "name" match (e.g. "Preferred name")
+    if "first_name" in plan.fields or "last_name" in plan.fields:
+        plan.fields.pop("name", None)
+
+    uploads = [f for f in fields if f.type == "file"]
+    if uploads:
+        preferred = [f for f in uploads if any(h in f.text() for h in UPLOAD_HINTS)]
+        plan.upload = (preferred or uploads)[0].selector
+
+    for pattern in SUBMIT_PATTERNS:
+        button = next((b for b in buttons if pattern.lower() in b.text.lower()), None)
+        if button:
+            break
+    else:
+        button = next((b for b in buttons if b.type == "submit"), None)
+    if button:
+        plan.submit, plan.submit_text = button.selector, button.text or "submit"
+
+    return plan
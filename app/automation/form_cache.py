@@ -0,0 +1,137 @@
+#app/automation/form_cache.py
+
+"""
+Per-domain cache of resolved form mappings.
+
+Most jobs route to a handful of ATS domains whose application pages share
+one template. Once a form on such a domain has been analyzed, the selectors
+it resolved to are stored under (domain, form signature) in a small SQLite
+file. The next visit checks the page's signature and the cached selectors
+in one evaluate() and skips discovery entirely when both still match. A
+selector that no longer resolves, or fails while filling, drops the entry so
+the next visit rediscovers the form.
+
+APPLY_PROCESSES spawns several workers that each open this cache, so every
+store, hit and invalidation is a single-row statement against the shared
+file rather than a rewrite of a per-process copy.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+from urllib.parse import urlparse
+
+from app.automation.form_analyzer import FormPlan
+from app.core.config import settings
+
+
+def domain_of(url: str) -> str:
+    """Cache key part for a URL; file:// fixtures all share one bucket"""
+    parsed = urlparse(str(url))
+    return (parsed.hostname or parsed.scheme or "").lower()
+
+
+def signature_key(signature: str) -> str:
+    return hashlib.sha1(signature.encode("utf-8")).hexdigest()[:16]
+
+
+class FormMappingCache:
+    """SQLite table of (domain, signature_key) -> FormPlan"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        # Several APPLY_PROCESSES workers share the file
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS form_plans (
+                domain TEXT NOT NULL,
+                signature_key TEXT NOT NULL,
+                plan TEXT NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                stored_at TEXT NOT NULL,
+                last_hit_at TEXT,
+                PRIMARY KEY (domain, signature_key)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def candidates(self, url: str) -> List[FormPlan]:
+        """Cached plans for the URL's domain (usually one or two)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT plan FROM form_plans WHERE domain = ?", (domain_of(url),)
+            ).fetchall()
+        return [FormPlan(**json.loads(plan)) for (plan,) in rows]
+
+    def lookup(self, url: str, probe: dict) -> Optional[FormPlan]:
+        """Pick the cached plan whose signature and selectors match a PROBE_JS result.
+
+        A plan with the right signature but a selector that no longer
+        resolves is invalidated.
+        """
+        signature = probe.get("signature", "")
+        found = set(probe.get("found", []))
+        for plan in self.candidates(url):
+            if plan.signature != signature:
+                continue
+            if all(selector in found for selector in plan.selectors()):
+                self._touch(url, plan)
+                return plan
+            print("   Cached form mapping no longer matches the page; rediscovering.")
+            self.invalidate(url, plan)
+        return None
+
+    def _touch(self, url: str, plan: FormPlan) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE form_plans SET hits = hits + 1, last_hit_at = ? "
+                "WHERE domain = ? AND signature_key = ?",
+                (datetime.now().isoformat(timespec="seconds"),
+                 domain_of(url), signature_key(plan.signature)),
+            )
+            self._conn.commit()
+
+    def store(self, url: str, plan: FormPlan) -> None:
+        """Remember a freshly analyzed plan, if its selectors survive a reload."""
+        if not plan.signature or not plan.is_stable() or not plan.selectors():
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO form_plans (domain, signature_key, plan, hits, stored_at) "
+                "VALUES (?, ?, ?, 0, ?)",
+                (domain_of(url), signature_key(plan.signature),
+                 json.dumps(plan.model_dump()), datetime.now().isoformat(timespec="seconds")),
+            )
+            self._conn.commit()
+
+    def invalidate(self, url: str, plan: FormPlan) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM form_plans WHERE domain = ? AND signature_key = ?",
+                (domain_of(url), signature_key(plan.signature)),
+            )
+            self._conn.commit()
+
+
+_cache: Optional[FormMappingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_form_cache() -> Optional[FormMappingCache]:
+    """Return the shared cache, or None when it is disabled."""
+    global _cache
+    if not settings.form_cache_enabled:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = FormMappingCache(settings.form_cache_file)
+        return _cache
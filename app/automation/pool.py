@@ -0,0 +1,212 @@
+# app/automation/pool.py
+
+"""
+Pool of Chromium instances handing out leased browser contexts.
+
+One event loop owns one BrowserPool. The pool launches up to `browsers`
+Chromium processes and spreads leases across them; each lease gets a context
+that is health-checked before use and either returned for reuse (cookies
+cleared) or thrown away if the job using it failed. A browser that has
+served `max_pages` pages is retired once its last lease comes back and a
+fresh one takes its place, which bounds the memory a long run can pile up.
+For more throughput than one process can drive, ApplicationEngine can run
+several pools in worker processes (see run_processes()).
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+from playwright.async_api import Browser, BrowserContext, Page, Playwright, async_playwright
+
+from app.automation.browser import CONTEXT_OPTIONS, LAUNCH_ARGS, LEAN_CONTEXT_OPTIONS, _alean_route
+from app.core.config import settings
+
+
+class _PooledBrowser:
+    """One Chromium process plus its idle contexts and usage counters"""
+
+    def __init__(self, browser: Browser, index: int):
+        self.browser = browser
+        self.index = index
+        self.idle: List[BrowserContext] = []
+        self.active = 0
+        self.pages_served = 0
+        self.retiring = False
+
+
+class BrowserPool:
+    """Leases health-checked contexts from a set of recycled Chromium instances.
+
+    Usage:
+        async with BrowserPool(browsers=2, contexts_per_browser=3) as pool:
+            async with pool.page() as page:
+                await page.goto(url)
+    """
+
+    def __init__(self, browsers: Optional[int] = None,
+                 contexts_per_browser: Optional[int] = None,
+                 max_pages: Optional[int] = None,
+                 headless: Optional[bool] = None,
+                 lean: Optional[bool] = None):
+        self.size = max(1, browsers or settings.browser_pool_size)
+        per_browser = contexts_per_browser or -(-settings.apply_workers // self.size)
+        self.contexts_per_browser = max(1, per_browser)
+        self.max_pages = max_pages if max_pages is not None else settings.browser_max_pages
+        self.headless = settings.browser_headless if headless is None else headless
+        self.lean = settings.browser_lean if lean is None else lean
+
+        self.playwright: Optional[Playwright] = None
+        self.browsers: List[_PooledBrowser] = []
+        self.launched = 0
+        self.recycled = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._closed = False
+
+    @classmethod
+    def for_workers(cls, workers: int) -> "BrowserPool":
+        """A pool sized for `workers` concurrent pages over BROWSER_POOL_SIZE browsers."""
+        browsers = max(1, min(settings.browser_pool_size, workers))
+        return cls(browsers=browsers, contexts_per_browser=-(-workers // browsers))
+
+    @property
+    def capacity(self) -> int:
+        """Pages that can be open at once"""
+        return self.size * self.contexts_per_browser
+
+    async def start(self) -> "BrowserPool":
+        if self.playwright is None:
+            print(f"Launching browser pool ({self.size} browsers x "
+                  f"{self.contexts_per_browser} contexts, headless={self.headless}, lean={self.lean})...")
+            self.playwright = await async_playwright().start()
+            self._slots = asyncio.Semaphore(self.capacity)
+            self._lock = asyncio.Lock()
+            self._closed = False
+        return self
+
+    async def __aenter__(self) -> "BrowserPool":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def _launch(self) -> _PooledBrowser:
+        browser = await self.playwright.chromium.launch(headless=self.headless, args=LAUNCH_ARGS)
+        pooled = _PooledBrowser(browser, self.launched)
+        self.launched += 1
+        return pooled
+
+    async def _new_context(self, pooled: _PooledBrowser) -> BrowserContext:
+        if not self.lean:
+            return await pooled.browser.new_context(**CONTEXT_OPTIONS)
+        context = await pooled.browser.new_context(**LEAN_CONTEXT_OPTIONS)
+        await context.route("**/*", _alean_route)
+        return context
+
+    async def _pick(self) -> _PooledBrowser:
+        """Least-busy healthy browser, launching or replacing one as needed."""
+        # Drop browsers that crashed or were closed under us
+        for pooled in [b for b in self.browsers if not b.browser.is_connected()]:
+            print(f"   Browser #{pooled.index} disconnected; replacing it.")
+            self.browsers.remove(pooled)
+            await self._close_browser(pooled)
+
+        usable = [b for b in self.browsers if not b.retiring]
+        if len(usable) < self.size:
+            pooled = await self._launch()
+            self.browsers.append(pooled)
+            return pooled
+        return min(usable, key=lambda b: b.active)
+
+    async def _checkout(self) -> tuple:
+        async with self._lock:
+            pooled = await self._pick()
+            pooled.active += 1
+            pooled.pages_served += 1
+            if self.max_pages and pooled.pages_served >= self.max_pages:
+                # Finish the leases it already has, take no new ones
+                pooled.retiring = True
+
+        # Health check: an idle context is only reused if it can still open a page
+        while pooled.idle:
+            context = pooled.idle.pop()
+            try:
+                return pooled, context, await context.new_page()
+            except Exception:
+                await _close_quietly(context)
+        context = None
+        try:
+            context = await self._new_context(pooled)
+            return pooled, context, await context.new_page()
+        except BaseException:
+            await self._checkin(pooled, context, None, healthy=False)
+            raise
+
+    async def _checkin(self, pooled: _PooledBrowser, context: Optional[BrowserContext],
+                       page: Optional[Page], healthy: bool) -> None:
+        if page is not None:
+            await _close_quietly(page)
+        if context is not None:
+            if healthy and not pooled.retiring and pooled.browser.is_connected():
+                try:
+                    # Next job must not inherit this site's session
+                    await context.clear_cookies()
+                    pooled.idle.append(context)
+                    context = None
+                except Exception:
+                    pass
+            if context is not None:
+                await _close_quietly(context)
+
+        async with self._lock:
+            pooled.active -= 1
+            if pooled.retiring and pooled.active == 0 and pooled in self.browsers:
+                self.browsers.remove(pooled)
+                self.recycled += 1
+                print(f"   Recycling browser #{pooled.index} after {pooled.pages_served} pages.")
+                await self._close_browser(pooled)
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """Lease a fresh page in a pooled context.
+
+        If the body raises, the context is discarded instead of being reused.
+        """
+        if self.playwright is None:
+            await self.start()
+        async with self._slots:
+            pooled, context, page = None, None, None
+            healthy = False
+            try:
+                pooled, context, page = await self._checkout()
+                yield page
+                healthy = True
+            finally:
+                if pooled is not None:
+                    await self._checkin(pooled, context, page, healthy)
+
+    async def _close_browser(self, pooled: _PooledBrowser) -> None:
+        for context in pooled.idle:
+            await _close_quietly(context)
+        pooled.idle.clear()
+        await _close_quietly(pooled.browser)
+
+    async def close(self) -> None:
+        """Close every context and browser, then Playwright. Safe to call twice."""
+        if self._closed or self.playwright is None:
+            return
+        self._closed = True
+        print(f"Closing browser pool ({self.launched} launched, {self.recycled} recycled)...")
+        for pooled in self.browsers:
+            await self._close_browser(pooled)
+        self.browsers.clear()
+        await self.playwright.stop()
+        self.playwright = None
+
+
+async def _close_quietly(closable) -> None:
+    try:
+        await closable.close()
+    except Exception:
+        pass
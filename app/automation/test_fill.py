@@ -69,5 +69,48 @@ def test_fill():
             os.remove(dummy_cv)
 
 
+def test_parallel_fill(copies: int = 6, workers: int = 3):
+    """Run the ApplicationEngine against several copies of the mock form."""
+    from app.automation.engine import ApplicationEngine, ApplicationTask
+
+    print(f"\n STARTING PARALLEL SIMULATION... [{copies} forms, {workers} workers]")
+
+    profile = UserProfile(
+        name="Test User",
+        email="test@example.com",
+        target_roles=[],
+        cv_text="Test CV Content",
+        cover_letter_template="Test Letter"
+    )
+
+    BASE_DIR = Path(__file__).resolve().parents[1]
+    mock_url = (BASE_DIR / "tests" / "fixtures" / "mock_job.html").as_uri()
+
+    dummy_cv = "app/tests/fixtures/dummy_cv.txt"
+    with open(dummy_cv, "w") as f:
+        f.write("This is a dummy CV for testing purposes.")
+
+    # One deliberately broken URL shows that failures stay isolated
+    tasks = [ApplicationTask(job_id=f"mock-{i}", url=mock_url, cv_path=dummy_cv)
+             for i in range(copies)]
+    tasks.append(ApplicationTask(job_id="broken", url="file:///does/not/exist.html"))
+
+    try:
+        engine = ApplicationEngine(workers=workers)
+        outcomes = engine.run_sync(tasks, profile, draft_mode=not LIVE_MODE)
+        for outcome in outcomes:
+            state = "OK  " if outcome.success else "FAIL"
+            print(f"   {state} {outcome.job_id:<8} {outcome.seconds:5.1f}s {outcome.error or ''}")
+        print(f" {engine.stats.summary()}")
+    finally:
+        if os.path.exists(dummy_cv):
+            os.remove(dummy_cv)
+
+
 if __name__ == "__main__":
-    test_fill()
+    import sys
+
+    if "--parallel" in sys.argv:
+        test_parallel_fill()
+    else:
+        test_fill()
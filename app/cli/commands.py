@@ -5,6 +5,7 @@ from rich.table import Table
 from rich.panel import Panel
 from rich.markdown import Markdown
 from pathlib import Path
+from typing import Optional
 
 app = typer.Typer(
     name="gigclaw",
@@ -94,10 +95,17 @@ def setup():
 #  COMMAND: RUN 
 
 @app.command()
-def run():
+def run(
+    resume: Optional[str] = typer.Option(
+        None, "--resume", help="Continue an interrupted run from its last checkpoint (thread id)"),
+):
     """Run the full agent pipeline: Scrape -> Match -> Tailor -> Apply -> Report."""
-    from app.graph.workflow import app as workflow_app
+    from app.graph.workflow import create_workflow, get_checkpointer, new_thread_id, run_config
+    from app.core.config import settings
+    from app.core.tracing import current_session, end_session, new_session_id, start_session
+    from app.ai.usage import get_usage_meter
     from app.core.storage import load_user_profile
+    from app.core.journal import compact_journal
 
     console.print(
         Panel(
@@ -107,6 +115,9 @@ def run():
         )
     )
 
+    # 0. Replay status changes left in the journal by an interrupted run
+    compact_journal()
+
     # 1. Load User Profile
     profile = load_user_profile()
     if not profile:
@@ -121,22 +132,55 @@ def run():
     console.print(
         f"[green]Target roles:[/green] {', '.join(profile.target_roles)}")
 
-    # 2. Inject Profile into State
-    inputs = {
+    workflow_app = create_workflow(checkpointer=get_checkpointer())
+
+    # 2. Inject Profile into State (a resumed run takes its state from the checkpoint)
+    thread_id = resume or (new_thread_id() if settings.checkpoint_enabled else None)
+    config = run_config(thread_id)
+    if resume:
+        if not settings.checkpoint_enabled:
+            console.print("[bold red]Checkpointing is disabled (CHECKPOINT_ENABLED=false).[/bold red]")
+            raise typer.Exit(code=1)
+        snapshot = workflow_app.get_state(config)
+        if not snapshot.values:
+            console.print(f"[bold red]No checkpoint found for run {resume}.[/bold red]")
+            raise typer.Exit(code=1)
+        if not snapshot.next:
+            console.print(f"[yellow]Run {resume} already finished; nothing to resume.[/yellow]")
+            return
+        console.print(f"[green]Resuming run {resume} at:[/green] {', '.join(snapshot.next)}")
+    elif thread_id:
+        console.print(f"[green]Run id:[/green] {thread_id}")
+
+    # Spans go to data/traces/<run id>.jsonl (a resumed run appends to its own file)
+    tracer = start_session(thread_id)
+    if tracer:
+        console.print(f"[green]Trace:[/green] {tracer.path}")
+
+    # LLM tokens/cost count against this run's budget (continued on resume)
+    meter = get_usage_meter()
+    meter.begin(thread_id or current_session() or new_session_id())
+
+    inputs = None if resume else {
         "user_profile": profile,
         "jobs": [],
         "jobs_scraped_count": 0,
         "jobs_applied_count": 0,
+        "tailor_calls_count": 0,
+        "tailored": [],
         "applications": [],
     }
 
     # 3. Run the graph
     try:
         if workflow_app:
-            for output in workflow_app.stream(inputs):
+            for output in workflow_app.stream(inputs, config=config):
                 for key, value in output.items():
+                    # Fan-out branches report the single job they handled
+                    jobs = (value or {}).get("jobs") or []
+                    detail = f" ({jobs[0].title})" if key in ("match", "tailor") and len(jobs) == 1 else ""
                     console.print(
-                        f"[bold cyan]Node '{key}' completed.[/bold cyan]")
+                        f"[bold cyan]Node '{key}' completed{detail}.[/bold cyan]")
 
             console.print(
                 Panel(
@@ -150,26 +194,31 @@ def run():
 
     except Exception as e:
         console.print(f"[bold red]Workflow error: {e}[/bold red]")
+        if thread_id:
+            console.print(
+                f"Resume with [cyan]python run.py run --resume {thread_id}[/cyan]")
         raise typer.Exit(code=1)
+    finally:
+        meter.save()
+        end_session()
 
 
 #  COMMAND: SCRAPE 
 
 @app.command()
 def scrape():
-    """Run only the scraper to refresh job data from RemoteOK."""
+    """Run only the scrapers to refresh job data from every registered source."""
     from app.scrapers.runners import run_scraper
 
     console.print(
         Panel(
             "[bold cyan]GigClaw Scraper[/bold cyan]\n"
-            "Fetching latest remote jobs from RemoteOK...",
+            "Fetching latest remote jobs from all registered sources...",
             border_style="cyan",
         )
     )
 
-    runner = run_scraper()
-    new_jobs = runner.run()
+    new_jobs = run_scraper()
 
     if not new_jobs:
         console.print("[yellow]No new jobs found (all duplicates).[/yellow]")
@@ -202,12 +251,72 @@ def scrape():
         f"\n[green]Saved {len(new_jobs)} new jobs to storage.[/green]")
 
 
+#  COMMAND: SEARCH 
+
+@app.command()
+def search(
+    query: Optional[str] = typer.Argument(
+        None, help="Text to search for (default: the CV in your profile)"),
+    top: int = typer.Option(15, "--top", "-k", help="How many jobs to show"),
+):
+    """Rank stored jobs by similarity to your CV (or a query), offline."""
+    import time
+    from app.ai.embeddings import embed, get_job_index, index_stored_jobs
+    from app.core.storage import load_jobs_by_id, load_user_profile
+
+    if query is None:
+        profile = load_user_profile()
+        if not profile:
+            console.print("[bold red]No query given and no user profile found.[/bold red]")
+            raise typer.Exit(code=1)
+        query = profile.cv_text
+
+    # Stores that predate the index are embedded once, here
+    backfilled = index_stored_jobs()
+    if backfilled:
+        console.print(f"[green]Indexed {backfilled} stored jobs.[/green]")
+
+    index = get_job_index()
+    start = time.perf_counter()
+    results = index.search(embed(query), k=top)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if not results:
+        console.print("[yellow]No jobs in the index yet.[/yellow] Run [cyan]python run.py scrape[/cyan] first.")
+        return
+
+    jobs = {job.id: job for job in load_jobs_by_id(job_id for job_id, _ in results)}
+    table = Table(
+        title=f"Top {len(results)} of {len(index)} jobs ({elapsed_ms:.1f} ms)",
+        show_header=True, border_style="green")
+    table.add_column("#", style="dim", width=4)
+    table.add_column("Similarity", justify="right")
+    table.add_column("Title", style="bold")
+    table.add_column("Company", style="cyan")
+    table.add_column("Status")
+    table.add_column("Match", justify="right")
+
+    for i, (job_id, score) in enumerate(results, 1):
+        job = jobs.get(job_id)
+        if job is None:
+            continue
+        table.add_row(
+            str(i),
+            f"{score:.3f}",
+            job.title[:40],
+            job.company[:20],
+            job.status.value,
+            f"{job.match_score:.0f}" if job.match_score is not None else "-",
+        )
+    console.print(table)
+
+
 #  COMMAND: STATUS 
 
 @app.command()
 def status():
     """Show current project status: jobs, reports, and configuration."""
-    from app.core.storage import load_jobs
+    from app.core.storage import load_job_summary
+    from app.core.journal import replay_journal
     from app.core.config import settings
     from app.core.models import ApplicationStatus
 
@@ -219,20 +328,17 @@ def status():
     )
 
     # --- Jobs Stats ---
-    jobs = load_jobs()
 
     jobs_table = Table(title="Job Inventory",
                        show_header=True, border_style="blue")
     jobs_table.add_column("Status", style="bold")
     jobs_table.add_column("Count", justify="right")
 
-    status_counts = {}
-    for job in jobs:
-        s = job.status.value if hasattr(
-            job.status, 'value') else str(job.status)
-        status_counts[s] = status_counts.get(s, 0) + 1
+    # Pre-aggregated summary index -- O(1) however big the store is.
+    # Journaled transitions are shown, not compacted: a run may be appending
+    summary = load_job_summary(pending=replay_journal())
 
-    for s, count in sorted(status_counts.items()):
+    for s, count in sorted(summary.by_status.items()):
         color = {
             "discovered": "white",
             "matched": "cyan",
@@ -243,9 +349,54 @@ def status():
         }.get(s, "white")
         jobs_table.add_row(f"[{color}]{s}[/{color}]", str(count))
 
-    jobs_table.add_row("[bold]TOTAL[/bold]", f"[bold]{len(jobs)}[/bold]")
+    jobs_table.add_row("[bold]TOTAL[/bold]", f"[bold]{summary.total}[/bold]")
     console.print(jobs_table)
 
+    if summary.by_source:
+        sources = ", ".join(
+            f"{source}: {count}" for source, count in sorted(summary.by_source.items()))
+        console.print(f"[bold]Sources:[/bold] {sources}")
+    if summary.last_scrape_at:
+        console.print(
+            f"[bold]Last scrape:[/bold] {summary.last_scrape_at} "
+            f"({summary.last_scrape_new} new jobs)")
+
+    # --- Match Score Histogram ---
+    scored = {k: v for k, v in summary.score_buckets.items() if k != "unscored"}
+    if scored:
+        hist_table = Table(title="Match Scores",
+                           show_header=True, border_style="blue")
+        hist_table.add_column("Score", style="bold")
+        hist_table.add_column("Jobs", justify="right")
+        hist_table.add_column("")
+        peak = max(scored.values())
+        for bucket in range(0, 100, 10):
+            count = scored.get(str(bucket), 0)
+            upper = 100 if bucket == 90 else bucket + 9
+            bar = "#" * max(1 if count else 0, round(count / peak * 30))
+            hist_table.add_row(f"{bucket}-{upper}", str(count), f"[cyan]{bar}[/cyan]")
+        unscored = summary.score_buckets.get("unscored", 0)
+        hist_table.add_row("[dim]unscored[/dim]", f"[dim]{unscored}[/dim]", "")
+        console.print(hist_table)
+
+    # --- LLM Cache ---
+    if settings.llm_cache_enabled and settings.llm_cache_file.exists():
+        from app.ai.cache import get_llm_cache
+
+        stats = get_llm_cache().stats()
+        cache_table = Table(title="LLM Response Cache",
+                            show_header=True, border_style="magenta")
+        cache_table.add_column("Metric", style="bold")
+        cache_table.add_column("Value", justify="right")
+        cache_table.add_row("Entries", str(stats["entries"]))
+        cache_table.add_row("Size", f"{stats['size_bytes'] / 1024:.1f} KB")
+        cache_table.add_row("[green]Hits[/green]", str(stats["hits"]))
+        cache_table.add_row("[yellow]Misses[/yellow]", str(stats["misses"]))
+        cache_table.add_row("Hit Rate", f"{stats['hit_rate']:.1f}%")
+        console.print(cache_table)
+    else:
+        console.print("\n[dim]LLM cache is empty or disabled.[/dim]")
+
     # --- Reports ---
     reports_dir = Path("data/reports")
     if reports_dir.exists():
@@ -284,8 +435,21 @@ def status():
 def report(
     latest: bool = typer.Option(
         True, "--latest", help="Show the most recent report"),
+    latency: bool = typer.Option(
+        False, "--latency", help="Show where the session's time went instead"),
+    usage: bool = typer.Option(
+        False, "--usage", help="Show the session's LLM tokens, prompt-cached vs uncached"),
+    session: Optional[str] = typer.Option(
+        None, "--session", help="Run id to break down (default: latest)"),
 ):
     """Display a session report in the terminal."""
+    if latency:
+        _latency_report(session)
+        return
+    if usage:
+        _usage_report(session)
+        return
+
     reports_dir = Path("data/reports")
 
     if not reports_dir.exists():
@@ -321,3 +485,94 @@ def report(
             border_style="green",
         )
     )
+
+
+def _latency_report(session: Optional[str]) -> None:
+    """Latency breakdown of one traced session, slowest span groups first."""
+    from app.core.config import settings
+    from app.core.tracing import latency_breakdown, load_spans, trace_files
+
+    if session:
+        target = settings.traces_dir / f"{session}.jsonl"
+        if not target.exists():
+            console.print(f"[red]No trace found for session {session}.[/red]")
+            raise typer.Exit(code=1)
+    else:
+        traces = trace_files()
+        if not traces:
+            console.print("[yellow]No traces found in data/traces/[/yellow]")
+            console.print(
+                "Run [cyan]python run.py run[/cyan] with TRACING_ENABLED=true first.")
+            raise typer.Exit(code=1)
+        target = traces[0]
+
+    spans = load_spans(target)
+    rows = latency_breakdown(spans)
+    wall = max((s["start"] * 1000 + s["duration_ms"] for s in spans), default=0) \
+        - min((s["start"] * 1000 for s in spans), default=0)
+
+    table = Table(title=f"Latency: {target.stem} ({len(spans)} spans, {wall / 1000:.1f}s wall)")
+    table.add_column("Kind", style="cyan")
+    table.add_column("Name")
+    table.add_column("Calls", justify="right")
+    table.add_column("Total s", justify="right")
+    table.add_column("Mean ms", justify="right")
+    table.add_column("p50 ms", justify="right")
+    table.add_column("p95 ms", justify="right")
+    table.add_column("Max ms", justify="right")
+    table.add_column("Errors", justify="right")
+    table.add_column("Tokens in/out", justify="right")
+
+    for row in rows:
+        tokens = f"{row['input_tokens']}/{row['output_tokens']}" if row["kind"] == "llm" else ""
+        table.add_row(
+            row["kind"], row["name"], str(row["count"]),
+            f"{row['total_ms'] / 1000:.2f}", f"{row['mean_ms']:.0f}",
+            f"{row['p50_ms']:.0f}", f"{row['p95_ms']:.0f}", f"{row['max_ms']:.0f}",
+            str(row["errors"]) if row["errors"] else "", tokens,
+        )
+    console.print(table)
+
+
+def _usage_report(session: Optional[str]) -> None:
+    """Per-stage LLM tokens of one run, split into prompt-cached and uncached input."""
+    from app.core.config import settings
+    from app.ai.usage import load_usage, prompt_cache_rate
+
+    if session:
+        target = settings.usage_dir / f"{session}.json"
+        if not target.exists():
+            console.print(f"[red]No usage found for session {session}.[/red]")
+            raise typer.Exit(code=1)
+    else:
+        files = sorted(settings.usage_dir.glob("*.json"),
+                       key=lambda p: p.stat().st_mtime, reverse=True) \
+            if settings.usage_dir.exists() else []
+        if not files:
+            console.print("[yellow]No usage found in data/usage/[/yellow]")
+            console.print("Run [cyan]python run.py run[/cyan] first.")
+            raise typer.Exit(code=1)
+        target = files[0]
+
+    data = load_usage(target)
+    rows = list(data["by_stage"].items()) + [("total", data["total"])]
+
+    table = Table(title=f"LLM usage: {target.stem}")
+    table.add_column("Stage", style="cyan")
+    table.add_column("Calls", justify="right")
+    table.add_column("Response-cached", justify="right")
+    table.add_column("Input uncached", justify="right")
+    table.add_column("Input prompt-cached", justify="right")
+    table.add_column("Prompt cache %", justify="right")
+    table.add_column("Output", justify="right")
+    table.add_column("Cost $", justify="right")
+
+    for stage, t in rows:
+        table.add_row(
+            stage, str(t["calls"]), str(t["cached_calls"]),
+            f"{t['input_tokens'] - t['cached_input_tokens']:,}",
+            f"{t['cached_input_tokens']:,}", f"{prompt_cache_rate(t):.0%}",
+            f"{t['output_tokens']:,}", f"{t['cost_usd']:.4f}",
+            style="bold" if stage == "total" else None,
+        )
+    console.print(table)
@@ -0,0 +1,97 @@
+# app/core/bench_storage.py
+
+"""
+Benchmark: answering `status` from a large job store.
+
+Compares the old approach (load_jobs() + count in Python) against streaming
+with iter_jobs(), both full models and JobSummary projections. Each store is
+built in a throwaway directory, so your real data/ is never touched.
+
+Usage:
+    python -m app.core.bench_storage                     # 10k, 100k, 1M jobs
+    python -m app.core.bench_storage 10000 100000        # custom sizes
+"""
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+from app.core import storage
+from app.core.config import settings
+from app.core.models import Job, JobSource
+
+STATUSES = ["discovered", "matched", "applied", "failed", "skipped"]
+
+
+def build_store(data_dir: Path, size: int) -> None:
+    """Point storage at data_dir and fill it with `size` synthetic jobs."""
+    settings.data_dir = data_dir
+    storage._conn = None
+
+    template = Job(
+        id="0",
+        source=JobSource.REMOTE_OK,
+        url="https://remoteok.com/remote-jobs/example",
+        title="Senior Python Developer",
+        company="Example Co",
+        description="Build and run Python services. " * 40,
+        tags=["python", "django", "aws"],
+        posted_date="2026-01-01",
+    )
+    base_row = storage._job_row(template)
+    conn = storage._db()
+
+    batch = []
+    for i in range(size):
+        status = STATUSES[i % len(STATUSES)]
+        data = base_row[5].replace('"id":"0"', f'"id":"{i}"', 1) \
+                          .replace('"status":"discovered"', f'"status":"{status}"', 1)
+        batch.append((str(i), base_row[1], status, float(i % 100), base_row[4], data))
+        if len(batch) == 10_000:
+            conn.executemany(storage._UPSERT_JOB, batch)
+            batch.clear()
+    if batch:
+        conn.executemany(storage._UPSERT_JOB, batch)
+    conn.commit()
+
+
+def measure(label: str, fn) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    counts = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"   {label:<28} {elapsed:8.2f}s   peak {peak / 1024 / 1024:9.1f} MB   "
+          f"total={sum(counts.values())}")
+
+
+def count_load_jobs() -> Counter:
+    return Counter(job.status.value for job in storage.load_jobs())
+
+
+def count_iter_models() -> Counter:
+    return Counter(job.status.value for job in storage.iter_jobs())
+
+
+def count_iter_projections() -> Counter:
+    return Counter(job.status for job in storage.iter_jobs(project=True))
+
+
+def main(sizes) -> None:
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            print(f"\n{size:,} jobs")
+            build_store(Path(tmp), size)
+            measure("load_jobs() + count", count_load_jobs)
+            measure("iter_jobs() models", count_iter_models)
+            measure("iter_jobs(project=True)", count_iter_projections)
+            storage._conn.close()
+            storage._conn = None
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
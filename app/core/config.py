@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 class Settings(BaseSettings):
     """Application configuration loaded from the .env file"""
@@ -17,17 +17,136 @@ class Settings(BaseSettings):
     max_jobs_per_run : int = 50
     min_match_score:int = 75
     auto_apply:bool = False
-    
+
+    #LLM concurrency (per provider)
+    llm_max_concurrency:int = 5
+    llm_requests_per_minute:int = 60
+    llm_tokens_per_minute:int = 150_000
+    llm_max_retries:int = 5
+
+    #LLM response cache
+    llm_cache_enabled:bool = True
+    llm_cache_ttl_hours:int = 24 * 7
+    llm_cache_max_mb:int = 100
+
+    #Local pre-filter in front of LLM matching
+    prefilter_enabled:bool = True
+    prefilter_top_k:int = 20
+    prefilter_min_score:float = 0.15
+    embedding_index_enabled:bool = True
+    embedding_dim:int = 1024
+
+    #LLM budget per run (unset = unlimited) and pricing override (USD per 1M tokens)
+    llm_budget_tokens:Optional[int] = None
+    llm_budget_usd:Optional[float] = None
+    llm_price_input_per_mtok:Optional[float] = None
+    llm_price_output_per_mtok:Optional[float] = None
+
+    #Scrapers
+    scraper_timeout:float = 30.0
+    scraper_max_connections:int = 20
+    scraper_conditional_requests:bool = True
+
+    #Workflow
+    pipeline_mode:bool = False
+    graph_max_concurrency:int = 5
+    checkpoint_enabled:bool = True
+
+    #Browser automation
+    apply_workers:int = 3
+    apply_processes:int = 1
+    browser_pool_size:int = 1
+    browser_max_pages:int = 50
+    browser_headless:bool = True
+    browser_lean:bool = True
+    browser_lean_block_types:List[str] = ["image", "media", "font"]
+    form_ready_timeout_ms:int = 10_000
+    submit_confirm_timeout_ms:int = 15_000
+    draft_hold_ms:int = 0
+    form_cache_enabled:bool = True
+
+    #Screenshot artifacts
+    screenshot_format:str = "jpeg"
+    screenshot_quality:int = 70
+    screenshot_thumb_quality:int = 40
+    screenshot_full_page:bool = False
+    artifacts_max_mb:int = 200
+    artifacts_retention_days:int = 30
+    artifacts_prune_every:int = 20
+
+    #Status journal
+    journal_compact_every:int = 500
+
+    #Tracing
+    tracing_enabled:bool = False
+    trace_otlp_endpoint:Optional[str] = None
+
     #storage files
     @property
+    def db_file(self) ->Path:
+        "Path to the SQLite jobs/applications database"
+        return self.data_dir/"gigclaw.db"
+    @property
+    def http_cache_dir(self) ->Path:
+        "Directory for scraper ETag/Last-Modified validators and cached bodies"
+        return self.data_dir/"http_cache"
+    @property
+    def journal_file(self) ->Path:
+        "Path to the append-only job status journal"
+        return self.data_dir/"journal.jsonl"
+    @property
+    def journal_lock_file(self) ->Path:
+        "Sidecar file processes lock to append to or compact the journal"
+        return self.data_dir/"journal.lock"
+    @property
     def jobs_file(self) ->Path:
-        "Path to jobs.json"
+        "Path to legacy jobs.json (migrated into db_file)"
         return self.data_dir/"jobs.json"
     @property
     def applications_file(self) ->Path:
-        "Path to applications.json"
+        "Path to legacy applications.json (migrated into db_file)"
         return self.data_dir/"applications.json"
     
+    @property
+    def llm_cache_file(self) ->Path:
+        "Path to the LLM response cache"
+        return self.data_dir/"llm_cache.sqlite"
+    
+    @property
+    def form_cache_file(self) ->Path:
+        """Resolved form selectors per ATS domain"""
+        return self.data_dir/"form_cache.sqlite"
+
+    @property
+    def artifacts_dir(self) ->Path:
+        """Content-addressed screenshots and their index"""
+        return self.data_dir/"artifacts"
+
+    @property
+    def traces_dir(self) ->Path:
+        """Per-session JSONL span files"""
+        return self.data_dir/"traces"
+
+    @property
+    def embeddings_dir(self) ->Path:
+        """Hashed n-gram vectors of stored jobs (memmap + id list)"""
+        return self.data_dir/"embeddings"
+
+    @property
+    def usage_dir(self) ->Path:
+        """Per-run LLM token and cost totals"""
+        return self.data_dir/"usage"
+
+    @property
+    def checkpoint_file(self) ->Path:
+        """LangGraph checkpoints of workflow runs (for run --resume)"""
+        return self.data_dir/"checkpoints.sqlite"
+
+    @property
+    def tailored_dir(self) ->Path:
+        """Tailored CVs written for the application forms, one per job"""
+        return self.data_dir/"tailored"
+
     @property
     def user_profile(self) ->Path:
         "Path to user profile"
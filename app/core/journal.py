@@ -0,0 +1,151 @@
+# app/core/journal.py
+
+"""
+Append-only journal of job status transitions.
+
+Graph nodes change job.status in memory as the pipeline runs. Instead of
+rewriting the job store on every change, each transition is appended as
+one JSON line (job_id, old_status, new_status, timestamp, node). Appends
+are O(1) and survive a crash; the journal is periodically compacted into
+the job store, and replayed on startup so an interrupted run can resume.
+
+Several processes (a run, `status`, apply workers) may share the journal.
+An advisory lock on a sidecar file serialises them: appends hold it shared,
+compaction holds it exclusive from its replay to its truncate, so no event
+is appended in between and lost. The journal is opened in append mode, so
+an append that follows a truncate lands at the new end of the file.
+"""
+
+import json
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional, TextIO
+
+from app.core.config import settings
+from app.core.models import ApplicationStatus, Job
+
+try:
+    import fcntl
+except ImportError:  # not on Windows: only the in-process lock applies there
+    fcntl = None
+
+_handle: Optional[TextIO] = None
+_pending = 0
+_lock = threading.RLock()
+
+
+def _value(status) -> str:
+    return status.value if hasattr(status, "value") else str(status)
+
+
+@contextmanager
+def _file_lock(exclusive: bool):
+    """Hold the cross-process journal lock (shared for appends, exclusive to compact)"""
+    if fcntl is None:
+        yield
+        return
+    settings.data_dir.mkdir(parents=True, exist_ok=True)
+    with open(settings.journal_lock_file, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _open() -> TextIO:
+    global _handle
+    if _handle is None:
+        settings.data_dir.mkdir(parents=True, exist_ok=True)
+        _handle = open(settings.journal_file, "a", encoding="utf-8")
+        if _handle.tell() and not _ends_with_newline():
+            # Start after a torn last line instead of gluing the next event onto it
+            _handle.write("\n")
+    return _handle
+
+
+def _ends_with_newline() -> bool:
+    with open(settings.journal_file, "rb") as f:
+        f.seek(-1, 2)
+        return f.read(1) == b"\n"
+
+
+def record_transition(job_id: str, old_status, new_status, node: str) -> None:
+    """Append one status transition to the journal"""
+    global _pending
+    event = {
+        "job_id": job_id,
+        "old_status": _value(old_status),
+        "new_status": _value(new_status),
+        "timestamp": datetime.now().isoformat(),
+        "node": node,
+    }
+    with _lock:
+        with _file_lock(exclusive=False):
+            handle = _open()
+            handle.write(json.dumps(event) + "\n")
+            handle.flush()
+        _pending += 1
+        # Outside the shared lock: compaction takes it exclusively
+        if _pending >= settings.journal_compact_every:
+            compact_journal()
+
+
+def set_status(job: Job, new_status: ApplicationStatus, node: str) -> None:
+    """Change a job's status and journal it (no-op if unchanged)"""
+    old_status = job.status
+    job.status = ApplicationStatus(_value(new_status))
+    if _value(old_status) != _value(new_status):
+        record_transition(job.id, old_status, new_status, node)
+
+
+def _read_journal() -> Dict[str, str]:
+    latest: Dict[str, str] = {}
+    if _handle is not None:
+        _handle.flush()
+    if not settings.journal_file.exists():
+        return latest
+
+    with open(settings.journal_file, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash mid-write can leave a torn last line
+                continue
+            latest[event["job_id"]] = event["new_status"]
+    return latest
+
+
+def replay_journal() -> Dict[str, str]:
+    """Return the latest journaled status for every job id (read-only)"""
+    with _lock, _file_lock(exclusive=False):
+        return _read_journal()
+
+
+def compact_journal() -> int:
+    """Fold the journal into the job store and truncate it.
+
+    Holds the journal lock exclusively throughout, so appends from other
+    processes wait and land in the truncated journal instead of being lost.
+    Returns the number of jobs whose status was written to the store.
+    """
+    global _handle, _pending
+    from app.core.storage import update_job_statuses
+
+    with _lock, _file_lock(exclusive=True):
+        latest = _read_journal()
+        if latest:
+            update_job_statuses(latest)
+
+        if _handle is not None:
+            _handle.close()
+            _handle = None
+        if settings.journal_file.exists():
+            settings.journal_file.write_text("", encoding="utf-8")
+        _pending = 0
+
+    if latest:
+        print(f" Compacted {len(latest)} job status changes into the job store")
+    return len(latest)
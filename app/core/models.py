@@ -1,9 +1,11 @@
 # app/core/models.py
 
 from pydantic import BaseModel, Field ,HttpUrl
-from typing import Optional , List
+from pydantic.json_schema import SkipJsonSchema
+from typing import Annotated, Callable, Optional , List
 from datetime import datetime
 from enum import Enum
+import operator
 
 
 #ENUMS
@@ -71,6 +73,9 @@ class MatchResult(BaseModel) :
     reasoning:str =Field(..., description="why was this score given")
     key_requirements:List[str]
     missing_skills:List[str]
+    # Set by the engines when the call itself failed (not part of the LLM schema,
+    # never serialized): the job was not scored and must stay in the backlog
+    failed:SkipJsonSchema[bool] = Field(default=False, exclude=True)
     
 class TailoredContent(BaseModel):
     """Structured output for content generation"""
@@ -86,6 +91,7 @@ class TailoredMaterials(BaseModel):
     job_id: str
     tailored_cv: str
     tailored_cover_letter: str
+    why_good_fit: List[str] = Field(default_factory=list)
 
 
 class ApplicationRecord(BaseModel):
@@ -96,21 +102,62 @@ class ApplicationRecord(BaseModel):
     applied_at: datetime = Field(default_factory=datetime.now)
     error_message: Optional[str] = None
     notes: Optional[str] = None
+    # Screenshot names in the ArtifactStore (thumbnail first)
+    artifacts: List[str] = []
+
+
+def merge_on(key: str) -> Callable[[list, list], list]:
+    """State reducer: upsert items from `right` into `left` by `key`, keeping order.
+
+    Lets parallel fan-out branches each return just the items they touched
+    (one job, one TailoredMaterials) while a node that returns the whole
+    list still leaves it unchanged.
+    """
+    def merge(left: list, right: list) -> list:
+        merged = {getattr(item, key): item for item in left}
+        for item in right:
+            merged[getattr(item, key)] = item
+        return list(merged.values())
+    return merge
 
 
 class AgentState(BaseModel):
     """
     The global state of our agent workflow.
     Simple. Typed. Effective.
+    Annotated fields carry the reducer LangGraph uses to combine updates
+    from parallel branches.
     """
     user_profile: UserProfile
 
-    # The list of all jobs (Inventory)
-    jobs: List[Job] = Field(default_factory=list)
+    # The list of all jobs (Inventory), merged by Job.id
+    jobs: Annotated[List[Job], merge_on("id")] = Field(default_factory=list)
+
+    # Tailored CV + cover letter per matched job (generated once, reused downstream)
+    tailored: Annotated[List[TailoredMaterials], merge_on("job_id")] = Field(default_factory=list)
 
-    # Counters / Stats for Dashboard
+    # Jobs the pre-filter ranked outside PREFILTER_TOP_K: not matched this run,
+    # left DISCOVERED so a later run picks them up
+    deferred_job_ids: List[str] = Field(default_factory=list)
+
+    # Counters / Stats for Dashboard (nodes return increments)
     jobs_scraped_count: int = 0
-    jobs_applied_count: int = 0
+    jobs_applied_count: Annotated[int, operator.add] = 0
+    tailor_calls_count: Annotated[int, operator.add] = 0
+
+    # Application Logs (Section 7), merged by ApplicationRecord.id
+    applications: Annotated[List[ApplicationRecord], merge_on("id")] = Field(default_factory=list)
+
+    def tailored_for(self, job_id: str) -> Optional[TailoredMaterials]:
+        """Return the tailored materials generated for a job, if any."""
+        for materials in self.tailored:
+            if materials.job_id == job_id:
+                return materials
+        return None
 
-    # Application Logs (Section 7)
-    applications: List[ApplicationRecord] = Field(default_factory=list)
+
+class JobBranch(BaseModel):
+    """Input of one fan-out branch (LangGraph Send): a single job and what it needs"""
+    user_profile: UserProfile
+    job: Job
+    tailored: Optional[TailoredMaterials] = None
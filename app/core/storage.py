@@ -1,50 +1,376 @@
 # app/core/storage.py
 import json
+import sqlite3
+import threading
+from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
-from app.core.models import Job, UserProfile, ApplicationRecord
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Union
+from app.core.models import Job, JobSource, ApplicationStatus, UserProfile, ApplicationRecord
 from app.core.config import settings
 
+# ==================== DATABASE ====================
+# Jobs and applications live in SQLite (WAL mode) so a scrape only writes
+# the rows it touched instead of re-serializing the whole inventory.
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    status TEXT NOT NULL,
+    match_score REAL,
+    discovered_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+CREATE INDEX IF NOT EXISTS idx_jobs_source ON jobs(source);
+CREATE INDEX IF NOT EXISTS idx_jobs_match_score ON jobs(match_score);
+
+CREATE TABLE IF NOT EXISTS applications (
+    id TEXT PRIMARY KEY,
+    job_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    applied_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_applications_job_id ON applications(job_id);
+
+CREATE TABLE IF NOT EXISTS job_counts (
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (dimension, key)
+);
+CREATE TABLE IF NOT EXISTS store_meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Summary index: counters per status / source / score bucket, kept current by
+# triggers on every write, so `status` reads a few rows instead of every job.
+_SUMMARY_DIMENSIONS = {
+    "total": "'all'",
+    "status": "{row}.status",
+    "source": "{row}.source",
+    "score": ("CASE WHEN {row}.match_score IS NULL THEN 'unscored' "
+              "ELSE CAST(MIN(CAST({row}.match_score / 10 AS INTEGER) * 10, 90) AS TEXT) END"),
+}
+
+
+def _count_sql(row: str, delta: int) -> str:
+    return "\n".join(
+        f"    INSERT INTO job_counts(dimension, key, count) "
+        f"VALUES ('{dimension}', {expr.format(row=row)}, {delta}) "
+        f"ON CONFLICT(dimension, key) DO UPDATE SET count = count + ({delta});"
+        for dimension, expr in _SUMMARY_DIMENSIONS.items()
+    )
+
+
+_SUMMARY_TRIGGERS = f"""
+CREATE TRIGGER IF NOT EXISTS trg_jobs_summary_insert AFTER INSERT ON jobs BEGIN
+{_count_sql("NEW", 1)}
+END;
+CREATE TRIGGER IF NOT EXISTS trg_jobs_summary_delete AFTER DELETE ON jobs BEGIN
+{_count_sql("OLD", -1)}
+END;
+CREATE TRIGGER IF NOT EXISTS trg_jobs_summary_update
+AFTER UPDATE OF status, source, match_score ON jobs BEGIN
+{_count_sql("OLD", -1)}
+{_count_sql("NEW", 1)}
+END;
+"""
+
+_conn: Optional[sqlite3.Connection] = None
+_db_lock = threading.RLock()
+
+
+def _db() -> sqlite3.Connection:
+    """Open (once) the jobs database, creating the schema and migrating JSON files"""
+    global _conn
+    with _db_lock:
+        if _conn is None:
+            settings.data_dir.mkdir(parents=True, exist_ok=True)
+            # Nodes may run in worker threads; every access goes through _db_lock
+            _conn = sqlite3.connect(str(settings.db_file), check_same_thread=False)
+            _conn.execute("PRAGMA journal_mode=WAL")
+            _conn.execute("PRAGMA synchronous=NORMAL")
+            _conn.executescript(_SCHEMA)
+            _conn.executescript(_SUMMARY_TRIGGERS)
+            _conn.commit()
+            if _conn.execute("SELECT COUNT(*) FROM job_counts").fetchone()[0] == 0:
+                # Stores created before the summary index existed
+                rebuild_job_summary()
+            migrate_json_store()
+        return _conn
+
+
+def rebuild_job_summary() -> None:
+    """Recompute the summary index from the jobs table (one full scan)"""
+    conn = _db()
+    with _db_lock:
+        conn.execute("DELETE FROM job_counts")
+        for dimension, expr in _SUMMARY_DIMENSIONS.items():
+            conn.execute(
+                f"INSERT INTO job_counts(dimension, key, count) "
+                f"SELECT '{dimension}', {expr.format(row='jobs')}, COUNT(*) FROM jobs "
+                f"GROUP BY 2"
+            )
+        conn.commit()
+
+
+def _status_value(status) -> str:
+    return status.value if hasattr(status, "value") else str(status)
+
+
+def _job_row(job: Job) -> tuple:
+    return (
+        job.id,
+        _status_value(job.source),
+        _status_value(job.status),
+        job.match_score,
+        job.discovered_at.isoformat(),
+        job.model_dump_json(),
+    )
+
+
+def _application_row(app: ApplicationRecord) -> tuple:
+    return (
+        app.id,
+        app.job_id,
+        _status_value(app.status),
+        app.applied_at.isoformat(),
+        app.model_dump_json(),
+    )
+
+
+def migrate_json_store() -> None:
+    """One-shot import of the legacy jobs.json / applications.json files.
+
+    Each file is renamed to *.migrated afterwards so it is never imported twice.
+    """
+    conn = _db()
+    for path, model, row, insert in (
+        (settings.jobs_file, Job, _job_row, _UPSERT_JOB),
+        (settings.applications_file, ApplicationRecord, _application_row, _UPSERT_APPLICATION),
+    ):
+        if not path.exists():
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+            rows = [row(model(**record)) for record in records]
+        except Exception as e:
+            print(f" Could not migrate {path}: {e}")
+            continue
+
+        with _db_lock:
+            conn.executemany(insert, rows)
+            conn.commit()
+        path.rename(path.with_name(path.name + ".migrated"))
+        print(f" Migrated {len(rows)} records from {path} into {settings.db_file}")
+
+
 # ==================== JOBS ====================
 
+_UPSERT_JOB = """
+INSERT INTO jobs (id, source, status, match_score, discovered_at, data)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    source = excluded.source,
+    status = excluded.status,
+    match_score = excluded.match_score,
+    discovered_at = excluded.discovered_at,
+    data = excluded.data
+"""
+
+
 def save_jobs(jobs: List[Job]) -> None:
-    """Save jobs list to JSON file"""
-    # Ensure directory exists
-    settings.data_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Convert Pydantic models to dicts
-    jobs_data = [job.model_dump() for job in jobs]
+    """Insert or update the given jobs (only these rows are written)"""
+    conn = _db()
+    with _db_lock:
+        conn.executemany(_UPSERT_JOB, [_job_row(job) for job in jobs])
+        conn.commit()
     
-    # Write to file with pretty-printing
-    with open(settings.jobs_file, 'w', encoding='utf-8') as f:
-        json.dump(jobs_data, f, indent=2, default=str)
-    
-    print(f" Saved {len(jobs)} jobs to {settings.jobs_file}")
+    print(f" Saved {len(jobs)} jobs to {settings.db_file}")
+
+
+class JobSummary(NamedTuple):
+    """Lightweight projection of a stored job (no JSON parsing, no validation)"""
+    id: str
+    source: str
+    status: str
+    match_score: Optional[float]
+
+
+def iter_jobs(
+    status: Union[None, str, ApplicationStatus, Iterable] = None,
+    source: Union[None, str, JobSource] = None,
+    min_score: Optional[float] = None,
+    project: bool = False,
+    batch_size: int = 500,
+) -> Iterator[Union[Job, JobSummary]]:
+    """Stream stored jobs one at a time, in insertion order.
+
+    Filters run in SQL against the indexed columns, and rows are fetched
+    batch_size at a time on a dedicated read connection, so memory stays
+    constant no matter how large the store is.
+
+    Args:
+        status: A status (or iterable of statuses) to keep
+        source: Only jobs from this source
+        min_score: Only jobs with match_score >= min_score
+        project: Yield JobSummary tuples instead of validated Job models
+        batch_size: Rows fetched per round trip
+    """
+    _db()  # make sure the schema exists and legacy JSON is migrated
+
+    clauses, params = [], []
+    if status is not None:
+        statuses = [status] if isinstance(status, (str, ApplicationStatus)) else list(status)
+        clauses.append(f"status IN ({', '.join('?' * len(statuses))})")
+        params.extend(_status_value(s) for s in statuses)
+    if source is not None:
+        clauses.append("source = ?")
+        params.append(_status_value(source))
+    if min_score is not None:
+        clauses.append("match_score >= ?")
+        params.append(min_score)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    if project:
+        columns = "id, source, status, match_score"
+    else:
+        columns = "data"
+
+    # WAL lets this reader run alongside writers without holding _db_lock
+    conn = sqlite3.connect(str(settings.db_file))
+    try:
+        cursor = conn.execute(
+            f"SELECT {columns} FROM jobs{where} ORDER BY rowid", params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                if project:
+                    yield JobSummary(*row)
+                else:
+                    yield Job.model_validate_json(row[0])
+    finally:
+        conn.close()
 
 
 def load_jobs() -> List[Job]:
-    """Load and validate jobs from JSON file"""
-    if not settings.jobs_file.exists():
-        print(f"  No jobs file found at {settings.jobs_file}")
-        return []
-    
+    """Load and validate jobs from the database"""
     try:
-        with open(settings.jobs_file, 'r', encoding='utf-8') as f:
-            jobs_data = json.load(f)
-        
-        # Validate each job with Pydantic
-        jobs = [Job(**job_dict) for job_dict in jobs_data]
-        print(f" Loaded {len(jobs)} jobs from {settings.jobs_file}")
+        # Rows were validated on the way in; JSON validation in pydantic-core is cheap
+        jobs = list(iter_jobs())
+        print(f" Loaded {len(jobs)} jobs from {settings.db_file}")
         return jobs
     
-    except json.JSONDecodeError as e:
-        print(f" Corrupt JSON in {settings.jobs_file}: {e}")
-        return []
     except Exception as e:
         print(f" Error loading jobs: {e}")
         return []
 
 
+class StoreSummary(NamedTuple):
+    """Pre-aggregated view of the job store for the status dashboard"""
+    total: int
+    by_status: Dict[str, int]
+    by_source: Dict[str, int]
+    score_buckets: Dict[str, int]
+    last_scrape_at: Optional[str]
+    last_scrape_new: int
+
+
+def load_job_summary(pending: Optional[Dict[str, str]] = None,
+                     batch_size: int = 500) -> StoreSummary:
+    """Read the summary index -- cost is independent of the number of jobs
+
+    Args:
+        pending: Job id -> status not yet folded into the store (a journal
+            replay); the status counts are shown as if it had been
+        batch_size: Ids looked up per query when applying `pending`
+    """
+    conn = _db()
+    pending = pending or {}
+    job_ids = list(pending)
+    with _db_lock:
+        counts = conn.execute(
+            "SELECT dimension, key, count FROM job_counts WHERE count > 0").fetchall()
+        meta = dict(conn.execute("SELECT name, value FROM store_meta"))
+        stored = []
+        for i in range(0, len(job_ids), batch_size):
+            batch = job_ids[i:i + batch_size]
+            stored.extend(conn.execute(
+                f"SELECT id, status FROM jobs WHERE id IN ({', '.join('?' * len(batch))})",
+                batch).fetchall())
+
+    grouped: Dict[str, Dict[str, int]] = {}
+    for dimension, key, count in counts:
+        grouped.setdefault(dimension, {})[key] = count
+    by_status = grouped.setdefault("status", {})
+    for job_id, status in stored:
+        by_status[status] -= 1
+        by_status[pending[job_id]] = by_status.get(pending[job_id], 0) + 1
+    grouped["status"] = {key: count for key, count in by_status.items() if count > 0}
+
+    return StoreSummary(
+        total=grouped.get("total", {}).get("all", 0),
+        by_status=grouped.get("status", {}),
+        by_source=grouped.get("source", {}),
+        score_buckets=grouped.get("score", {}),
+        last_scrape_at=meta.get("last_scrape_at"),
+        last_scrape_new=int(meta.get("last_scrape_new", 0)),
+    )
+
+
+def record_scrape(new_jobs: int) -> None:
+    """Remember when the last scrape ran and how many new jobs it stored"""
+    conn = _db()
+    with _db_lock:
+        conn.executemany(
+            "INSERT OR REPLACE INTO store_meta(name, value) VALUES (?, ?)",
+            [("last_scrape_at", datetime.now().isoformat(timespec="seconds")),
+             ("last_scrape_new", str(new_jobs))],
+        )
+        conn.commit()
+
+
+def update_job_statuses(statuses: Dict[str, str]) -> None:
+    """Set the status of stored jobs in place (used by journal compaction)"""
+    conn = _db()
+    with _db_lock:
+        conn.executemany(
+            "UPDATE jobs SET status = ?, data = json_set(data, '$.status', ?) WHERE id = ?",
+            [(status, status, job_id) for job_id, status in statuses.items()],
+        )
+        conn.commit()
+
+
+def load_job_ids() -> Set[str]:
+    """Return the ids of every stored job (for deduplication)"""
+    conn = _db()
+    with _db_lock:
+        return {job_id for (job_id,) in conn.execute("SELECT id FROM jobs")}
+
+
+def load_jobs_by_id(job_ids: Iterable[str], batch_size: int = 500) -> List[Job]:
+    """Load the given jobs, in the order of `job_ids` (unknown ids are skipped)"""
+    job_ids = list(job_ids)
+    conn = _db()
+    found: Dict[str, Job] = {}
+    for i in range(0, len(job_ids), batch_size):
+        batch = job_ids[i:i + batch_size]
+        with _db_lock:
+            rows = conn.execute(
+                f"SELECT id, data FROM jobs WHERE id IN ({', '.join('?' * len(batch))})",
+                batch).fetchall()
+        for job_id, data in rows:
+            found[job_id] = Job.model_validate_json(data)
+    return [found[job_id] for job_id in job_ids if job_id in found]
+
+
 # ==================== USER PROFILE ====================
 
 def save_user_profile(profile: UserProfile) -> None:
@@ -80,29 +406,36 @@ def load_user_profile() -> Optional[UserProfile]:
 
 # ==================== APPLICATIONS ====================
 
+_UPSERT_APPLICATION = """
+INSERT INTO applications (id, job_id, status, applied_at, data)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    job_id = excluded.job_id,
+    status = excluded.status,
+    applied_at = excluded.applied_at,
+    data = excluded.data
+"""
+
+
 def save_applications(applications: List[ApplicationRecord]) -> None:
-    """Save application history to JSON file"""
-    settings.data_dir.mkdir(parents=True, exist_ok=True)
+    """Insert or update application records"""
+    conn = _db()
+    with _db_lock:
+        conn.executemany(_UPSERT_APPLICATION, [_application_row(app) for app in applications])
+        conn.commit()
     
-    apps_data = [app.model_dump() for app in applications]
-    
-    with open(settings.applications_file, 'w', encoding='utf-8') as f:
-        json.dump(apps_data, f, indent=2, default=str)
-    
-    print(f"Saved {len(applications)} applications to {settings.applications_file}")
+    print(f"Saved {len(applications)} applications to {settings.db_file}")
 
 
 def load_applications() -> List[ApplicationRecord]:
-    """Load application history from JSON file"""
-    if not settings.applications_file.exists():
-        print(f"No applications file found")
-        return []
-    
+    """Load application history from the database"""
     try:
-        with open(settings.applications_file, 'r', encoding='utf-8') as f:
-            apps_data = json.load(f)
+        conn = _db()
+        with _db_lock:
+            rows = conn.execute(
+                "SELECT data FROM applications ORDER BY rowid").fetchall()
         
-        applications = [ApplicationRecord(**app_dict) for app_dict in apps_data]
+        applications = [ApplicationRecord.model_validate_json(data) for (data,) in rows]
         print(f"Loaded {len(applications)} applications")
         return applications
     
@@ -0,0 +1,319 @@
+# app/core/tracing.py
+
+"""
+Lightweight tracing of where a run spends its time.
+
+Every graph node, LLM call, HTTP fetch and browser step is recorded as a
+span: kind, name, start, duration, attributes (token counts, status codes,
+job ids) and its parent span. Spans are appended as one JSON line each to
+data/traces/<session>.jsonl, which is what `report --latency` reads back. When TRACE_OTLP_ENDPOINT is set, spans are
+also batched and POSTed as OTLP/JSON to <endpoint>/v1/traces, so any
+OpenTelemetry collector (Jaeger, Tempo, Honeycomb...) can display them
+without pulling the OpenTelemetry SDK into the project.
+
+Tracing is opt-in (TRACING_ENABLED) and only records inside a session.
+A session is one `run`; its id is the run's checkpoint thread id, so a
+resumed run keeps writing to the same trace file. Worker processes join
+the session they are handed (see ApplicationEngine.run_processes()).
+Outside a session (tests, scripts, other commands) spans are no-ops and
+nothing is written; the trace file is created with the first span.
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import httpx
+
+from app.core.config import settings
+
+EXPORT_BATCH = 256
+
+# OTLP SpanKind: INTERNAL for graph nodes and browser steps, CLIENT for remote calls
+_OTLP_KIND = {"llm": 3, "http": 3}
+
+
+class Span:
+    """One timed operation; attributes can be added while it is open"""
+
+    __slots__ = ("kind", "name", "span_id", "parent_id", "start", "attrs", "error")
+
+    def __init__(self, kind: str, name: str, parent_id: Optional[str], attrs: Dict[str, Any]):
+        self.kind = kind
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start = time.time()
+        self.attrs = attrs
+        self.error: Optional[str] = None
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+
+class _NullSpan:
+    """Stand-in yielded when tracing is off"""
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("gigclaw_span", default=None)
+
+
+class Tracer:
+    """Appends finished spans of one session to its JSONL file (and the OTLP exporter)"""
+
+    def __init__(self, session: str, directory: Optional[Path] = None,
+                 endpoint: Optional[str] = None):
+        self.session = session
+        self.trace_id = hashlib.sha256(session.encode()).hexdigest()[:32]
+        self.directory = Path(directory or settings.traces_dir)
+        self.path = self.directory / f"{session}.jsonl"
+        self.endpoint = endpoint.rstrip("/") if endpoint else None
+        self._pending: List[Dict[str, Any]] = []
+        self._export_failed = False
+        self._lock = threading.Lock()
+
+    def record(self, span: Span, duration: float) -> None:
+        event = {
+            "session": self.session,
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            "kind": span.kind,
+            "name": span.name,
+            "start": round(span.start, 6),
+            "duration_ms": round(duration * 1000, 3),
+            "attrs": span.attrs,
+        }
+        if span.error:
+            event["error"] = span.error
+        line = json.dumps(event, default=str) + "\n"
+        with self._lock:
+            # Created with the first span, so a session that records nothing leaves no file
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # One write per line in append mode: safe across worker processes
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+            if self.endpoint:
+                self._pending.append(event)
+                if len(self._pending) >= EXPORT_BATCH:
+                    self._export()
+
+    # ---------- OTLP/JSON export ----------
+
+    def _otlp_span(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        start_ns = int(event["start"] * 1e9)
+        attrs = {"gigclaw.kind": event["kind"], **event["attrs"]}
+        span = {
+            "traceId": self.trace_id,
+            "spanId": event["span_id"],
+            "name": f"{event['kind']}.{event['name']}",
+            "kind": _OTLP_KIND.get(event["kind"], 1),
+            "startTimeUnixNano": str(start_ns),
+            "endTimeUnixNano": str(start_ns + int(event["duration_ms"] * 1e6)),
+            "attributes": [{"key": k, "value": _otlp_value(v)}
+                           for k, v in attrs.items() if v is not None],
+        }
+        if event["parent_id"]:
+            span["parentSpanId"] = event["parent_id"]
+        if "error" in event:
+            span["status"] = {"code": 2, "message": event["error"]}
+        return span
+
+    def _export(self) -> None:
+        batch, self._pending = self._pending, []
+        if not batch or self._export_failed:
+            return
+        body = {"resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": {"stringValue": "gigclaw"}},
+                {"key": "gigclaw.session", "value": {"stringValue": self.session}},
+            ]},
+            "scopeSpans": [{"scope": {"name": "app.core.tracing"},
+                            "spans": [self._otlp_span(e) for e in batch]}],
+        }]}
+        try:
+            response = httpx.post(f"{self.endpoint}/v1/traces", json=body, timeout=5)
+            response.raise_for_status()
+        except Exception as e:
+            # The local JSONL trace is still complete; stop trying for this session
+            print(f"   Trace export to {self.endpoint} failed, keeping local traces only: {e}")
+            self._export_failed = True
+
+    def flush(self) -> None:
+        with self._lock:
+            self._export()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def new_session_id() -> str:
+    return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
+def start_session(session: Optional[str] = None) -> Optional[Tracer]:
+    """Make `session` (default: a timestamp) the session new spans belong to"""
+    global _tracer
+    if not settings.tracing_enabled:
+        return None
+    with _tracer_lock:
+        if _tracer is not None:
+            _tracer.flush()
+        _tracer = Tracer(session or new_session_id(), endpoint=settings.trace_otlp_endpoint)
+        return _tracer
+
+
+def current_session() -> Optional[str]:
+    return _tracer.session if _tracer is not None else None
+
+
+def end_session() -> None:
+    """Export whatever is still buffered for the OTLP endpoint"""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is not None:
+            _tracer.flush()
+            _tracer = None
+
+
+def _get_tracer() -> Optional[Tracer]:
+    # No implicit session: only code that called start_session() is traced
+    return _tracer
+
+
+@contextmanager
+def span(kind: str, name: str, **attrs: Any) -> Iterator[Span]:
+    """Time the enclosed block as a child of the current span.
+
+        with span("llm", "MatchResult", provider="openai") as s:
+            ...
+            s.set(input_tokens=812)
+    """
+    tracer = _get_tracer()
+    if tracer is None:
+        yield _NullSpan()
+        return
+    parent = _current.get()
+    current = Span(kind, name, parent.span_id if parent else None, attrs)
+    token = _current.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        tracer.record(current, time.perf_counter() - started)
+
+
+def record_span(kind: str, name: str, seconds: float, **attrs: Any) -> None:
+    """Record a span that already happened (ended now, lasted `seconds`)"""
+    tracer = _get_tracer()
+    if tracer is None:
+        return
+    parent = _current.get()
+    done = Span(kind, name, parent.span_id if parent else None, attrs)
+    done.start = time.time() - seconds
+    tracer.record(done, seconds)
+
+
+def traced(kind: str, name: Optional[str] = None) -> Callable:
+    """Decorator form of span() for sync and async functions.
+
+    A first argument with a `.job` (a fan-out JobBranch) tags the span with its job id.
+    """
+    def decorate(fn: Callable) -> Callable:
+        label = name or fn.__name__
+
+        def job_attrs(args) -> Dict[str, Any]:
+            job = getattr(args[0], "job", None) if args else None
+            return {"job_id": job.id} if job is not None else {}
+
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(kind, label, **job_attrs(args)):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(kind, label, **job_attrs(args)):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ---------- reading traces back ----------
+
+def trace_files() -> List[Path]:
+    """Trace files, most recent first"""
+    if not settings.traces_dir.exists():
+        return []
+    return sorted(settings.traces_dir.glob("*.jsonl"),
+                  key=lambda p: p.stat().st_mtime, reverse=True)
+
+
+def load_spans(path: Path) -> List[Dict[str, Any]]:
+    spans = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                spans.append(json.loads(line))
+            except json.JSONDecodeError:
+                # A crash mid-write can leave a torn last line
+                continue
+    return spans
+
+
+def latency_breakdown(spans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per (kind, name): count, total/mean/p50/p95/max milliseconds and errors.
+
+    Sorted by total time, slowest first.
+    """
+    groups: Dict[tuple, List[Dict[str, Any]]] = {}
+    for s in spans:
+        groups.setdefault((s["kind"], s["name"]), []).append(s)
+
+    rows = []
+    for (kind, name), members in groups.items():
+        durations = sorted(s["duration_ms"] for s in members)
+        n = len(durations)
+        rows.append({
+            "kind": kind,
+            "name": name,
+            "count": n,
+            "total_ms": sum(durations),
+            "mean_ms": sum(durations) / n,
+            "p50_ms": durations[(n - 1) // 2],
+            "p95_ms": durations[min(n - 1, int(round(0.95 * (n - 1))))],
+            "max_ms": durations[-1],
+            "errors": sum(1 for s in members if "error" in s),
+            "input_tokens": sum(s["attrs"].get("input_tokens") or 0 for s in members),
+            "output_tokens": sum(s["attrs"].get("output_tokens") or 0 for s in members),
+        })
+    rows.sort(key=lambda r: r["total_ms"], reverse=True)
+    return rows
@@ -5,18 +5,22 @@ Gigclaw graph nodes - The "workers" of our state machine
 Nodes read references (roles,salary,thresholds) dynamically from the state
 """
 
-from typing import Dict, Any
-from app.core.models import ApplicationRecord, ApplicationStatus,AgentState
+import os
+from typing import Dict, Any, Optional
+from app.core.models import ApplicationRecord, ApplicationStatus,AgentState,TailoredMaterials,MatchResult,Job,JobBranch
 from app.scrapers.runners import run_scraper
 from app.ai.providers import LangChainAIEngine
-from app.automation.applicator import GenericFormFiller
-from app.automation.browser  import BrowserManager
+from app.ai.cache import served_from_cache
+from app.ai.prefilter import prefilter
+from app.ai.usage import get_usage_meter
+from app.automation.engine import ApplicationEngine, ApplicationOutcome, ApplicationTask
 from app.core.config import settings
+from app.core.journal import set_status, record_transition, compact_journal
+from langgraph.types import Send
 
 #Initialize the universal AI Engine
 ai_engine = LangChainAIEngine(provider=settings.ai_provider)
-browser_manager = BrowserManager()
-form_filler= GenericFormFiller(browser_manager)
+
 def scrape_jobs(state:AgentState) -> Dict[str,Any]:
     """ Node 1: Hunter node
         Runs the scraper , guided by the user reference
@@ -30,94 +34,226 @@ def scrape_jobs(state:AgentState) -> Dict[str,Any]:
     new_jobs = run_scraper()
     if new_jobs:
         print(f" Found {len(new_jobs)} new jobs to process")
-        return {"jobs":new_jobs,"jobs_scraped_count":len(new_jobs)}
     
-    #FALLBACK: grab existing unprocessed jobs from storage
-    from app.core.storage import load_jobs
-    all_jobs = load_jobs()
-    unprocessed = [j for j in all_jobs if j.status == ApplicationStatus.DISCOVERED]
-    if unprocessed:
-        print(f"No new jobs , but found {len(unprocessed)} unprocessed jobs in storage")
-    else:
+    #BACKLOG: unprocessed jobs from storage join every run, not only empty ones
+    #DISCOVERED jobs were deferred by the pre-filter's top-K or the LLM budget,
+    #MATCHED jobs were interrupted before applying; both compete with the new ones
+    #Only matching rows are read and validated (filter runs in the store)
+    from app.core.storage import iter_jobs
+    new_ids = {job.id for job in new_jobs}
+    resumable = (ApplicationStatus.DISCOVERED, ApplicationStatus.MATCHED)
+    backlog = [job for job in iter_jobs(status=resumable) if job.id not in new_ids]
+    if backlog:
+        print(f" Found {len(backlog)} unprocessed jobs in storage")
+    elif not new_jobs:
         print("No new unprocessed jobs in the storage.Pipeline will be empty")
-    return {"jobs":unprocessed,"jobs_scraped_count":len(unprocessed)}
+    #Only what the scrapers found counts as "Jobs Found" in the report
+    return {"jobs":new_jobs + backlog,"jobs_scraped_count":len(new_jobs)}
     
 
-def filter_jobs(state:AgentState) ->Dict[str, Any]:
-    """Node 2 : The filter
-        Uses AI to analyze fit based on the user's preferences and profile
+def prefilter_jobs(state:AgentState) ->Dict[str, Any]:
+    """Node 1b: The sieve
+        Ranks the batch locally (role keywords, CV relevance, salary floor)
+        so only the most promising jobs cost an LLM call
     """
-    print("\nNODE: Filter jobs (AI matching)")
+    print("\nNODE: Pre-filter jobs")
     jobs = state.jobs
-    profile = state.user_profile
+    #MATCHED jobs from the stored backlog were already scored by the LLM: they
+    #pass straight through, only unscored (DISCOVERED) jobs are ranked
+    candidates = [job for job in jobs if job.status == ApplicationStatus.DISCOVERED]
+    if not settings.prefilter_enabled or not candidates:
+        return {"jobs":jobs}
+    
+    #CV-to-job similarity from the embedding index (jobs were embedded when stored)
+    similarity = None
+    if settings.embedding_index_enabled:
+        from app.ai.embeddings import embed, get_job_index
+        index = get_job_index()
+        index.add(candidates)
+        similarity = index.similarity([job.id for job in candidates], embed(state.user_profile.cv_text))
     
-    if not jobs:
+    result = prefilter(candidates, state.user_profile, similarity=similarity)
+    for job, reason in result.dropped:
+        job.match_reasoning = f"Pre-filter: {reason}"
+        set_status(job, ApplicationStatus.SKIPPED, node="prefilter")
+    print(f" {len(result.kept)}/{len(candidates)} jobs go on to LLM matching "
+          f"({len(result.dropped)} dropped locally, {len(result.deferred)} deferred to a later run)")
+    return {"jobs":jobs, "deferred_job_ids":[job.id for job in result.deferred]}
+
+
+def fan_out_match(state:AgentState):
+    """Edge after the pre-filter: one `match` branch per unscored job (map), or straight to the join
+        MATCHED jobs from the stored backlog keep their score and go on to tailoring
+    """
+    deferred = set(state.deferred_job_ids)
+    candidates = [job for job in state.jobs
+                  if job.status == ApplicationStatus.DISCOVERED and job.id not in deferred]
+    if not candidates:
         print("No jobs to analyze, Skipping")
-        return {"jobs":[]}
+        return "collect"
+    print(f"\nFanning out matching for {len(candidates)} jobs "
+          f"(threshold: {state.user_profile.min_match_score}%)")
+    return [Send("match", JobBranch(user_profile=state.user_profile, job=job))
+            for job in candidates]
+
+
+def match_job(branch:JobBranch) ->Dict[str, Any]:
+    """Node 2 : The filter (one branch per job)
+        Uses AI to analyze fit based on the user's preferences and profile
+    """
+    job = branch.job
+    profile = branch.user_profile
+    previous_status = job.status
     
-    threshold = profile.min_match_score
-    print(f"User threshold :{threshold}")
+    #Out of LLM budget: leave the job unscored for a later run
+    if get_usage_meter().exhausted():
+        return {"jobs":[job]}
     
-    #We use langchain engine to process the batch
-    analysis_results = ai_engine.analyze_batch(
-        jobs= jobs,
-        cv_text= profile.cv_text,
-        cover_letter_template = profile.cover_letter_template,
-        min_score = threshold
-    )
+    result = ai_engine.match_job(job, profile.cv_text)
+    if result.failed:
+        #The call failed, not the job: leave it DISCOVERED and unscored for a later run
+        return {"jobs":[job]}
+    job.match_score = result.match_score
+    job.match_reasoning = result.reasoning
     
-    #Update state with scored jobs
-    scored_jobs =[]
+    if result.match_score >= profile.min_match_score:
+        job.status = ApplicationStatus.MATCHED
+        print(f"{job.title} @ {job.company}... {result.match_score}% — MATCH!")
+    else:
+        job.status = ApplicationStatus.SKIPPED
+        print(f"{job.title} @ {job.company}... {result.match_score}% — Below threshold.")
+    if job.status != previous_status:
+        record_transition(job.id, previous_status, job.status, node="match")
     
-    for result in analysis_results:
-        job = result["job"]
-        scored_jobs.append(job)
-        
-    return {"jobs":scored_jobs}
-
-def tailor_application(state:AgentState) ->Dict[str,Any] :
-    """ Node 3: The tailor
-        Generates custom content for approved matches 
-    """
-    print("\nNODE: Tailor Application")
+    #Only this job goes back; the jobs reducer merges it by id
+    return {"jobs":[job]}
+
+
+def collect_matches(state:AgentState) ->Dict[str, Any]:
+    """Join after the match branches (reduce): persist every score in one write"""
+    matched = sum(1 for job in state.jobs if job.status == ApplicationStatus.MATCHED)
+    print(f"\n Results: {matched}/{len(state.jobs)} matched (≥{state.user_profile.min_match_score}%)")
     
-    jobs = state.jobs
-    profile = state.user_profile
+    #Persist scores (upsert of just these rows) so the score histogram stays current
+    if state.jobs:
+        from app.core.storage import save_jobs
+        save_jobs(state.jobs)
+    return {"jobs":state.jobs}
+
+
+def fan_out_tailor(state:AgentState):
+    """Edge after collect: one `tailor` branch per matched job, or straight to apply"""
+    threshold = state.user_profile.min_match_score
+    matched = [job for job in state.jobs
+               if job.status == ApplicationStatus.MATCHED
+               and job.match_score and job.match_score >= threshold]
+    if not matched:
+        return "apply"
+    return [Send("tailor", JobBranch(user_profile=state.user_profile, job=job,
+                                     tailored=state.tailored_for(job.id)))
+            for job in matched]
+
+
+def tailor_job(branch:JobBranch) ->Dict[str,Any] :
+    """ Node 3: The tailor (one branch per matched job)
+        Generates custom content for an approved match
+        Materials already in the state are reused, never regenerated
+    """
+    job = branch.job
+    profile = branch.user_profile
+    materials = branch.tailored
+    generated = 0
     
-    updated_jobs = []
-    #filter for high value targets based on the user preferences
-    threshold = profile.min_match_score
+    if materials:
+        print(f"Reusing tailored content for : {job.title} {job.company}")
+    elif get_usage_meter().exhausted():
+        #Out of LLM budget: no materials, so apply leaves this job for a later run
+        return {"jobs":[job]}
+    else:
+        print(f"Tailoring for : {job.title} {job.company}")
+        match_res = MatchResult(
+            match_score=job.match_score,
+            reasoning=job.match_reasoning or "",
+            key_requirements = [],
+            missing_skills=[]
+        )
+        #Generate custom content using user specific data
+        content= ai_engine.tailor_content(
+            job,
+            profile.cv_text,
+            profile.cover_letter_template,
+            match_res
+        )
+        materials = TailoredMaterials(
+            job_id=job.id,
+            tailored_cv=content.tailored_cv,
+            tailored_cover_letter=content.cover_letter,
+            why_good_fit=content.why_good_fit,
+        )
+        #A cached answer is reused content, not a tailoring call
+        generated = 0 if served_from_cache() else 1
+        print(f"Tailored CV and cover letter")
+    set_status(job, ApplicationStatus.MATCHED, node="tailor")
     
-    for job in jobs:
-        if job.match_score and job.match_score >= threshold:
-            print(f"Tailoring for : {job.title} {job.company}")
-            
-            from app.core.models import MatchResult
-            match_res = MatchResult(
-                match_score=job.match_score,
-                reasoning=job.match_reasoning,
-                key_requirements = [],
-                missing_skills=[]
-            )
-            #Generate custom content using user specific data
-            tailored= ai_engine.tailor_content(
-                job,
-                profile.cv_text,
-                profile.cover_letter_template,
-                match_res
-            )
-            print(f"Tailored CV and cover letter")
-            job.status = ApplicationStatus.MATCHED
-        
-        updated_jobs.append(job)
-        
-    return {"jobs":updated_jobs}
+    return {
+        "jobs":[job],
+        "tailored":[materials],
+        "tailor_calls_count":generated,
+    }
+
+
+def application_task(job: Job, materials: Optional[TailoredMaterials]) -> ApplicationTask:
+    """What the browser needs for one job: its URL plus tailored CV and cover letter"""
+    cv_path = settings.cv_file
+    cover_letter = None
+
+    # Reuse the materials tailored upstream instead of the generic CV/template
+    if materials:
+        settings.tailored_dir.mkdir(parents=True, exist_ok=True)
+        cv_path = settings.tailored_dir / f"{job.id}_cv.txt"
+        cv_path.write_text(materials.tailored_cv, encoding="utf-8")
+        cover_letter = materials.tailored_cover_letter
+
+    return ApplicationTask(job_id=job.id, url=str(job.url),
+                           cv_path=str(cv_path), cover_letter=cover_letter)
+
+
+def record_outcome(job: Job, outcome: ApplicationOutcome, draft_mode: bool) -> ApplicationRecord:
+    """Journal the job's new status and build its ApplicationRecord"""
+    if outcome.success:
+        set_status(job, ApplicationStatus.APPLIED, node="apply")
+        note = "Application was submitted" if not draft_mode else "Draft - Form filled only"
+        return ApplicationRecord(
+            id=job.id if job.id else "unknown",
+            job_id=job.id if job.id else "unknown",
+            status=ApplicationStatus.APPLIED,
+            notes=note,
+            artifacts=outcome.artifacts
+        )
+
+    print(f"   Failed to apply to {job.title}: {outcome.error}")
+    set_status(job, ApplicationStatus.FAILED, node="apply")
+    # Keep the error screenshot linked to the failed attempt
+    return ApplicationRecord(
+        id=job.id,
+        job_id=job.id,
+        status=ApplicationStatus.FAILED,
+        error_message=outcome.error,
+        artifacts=outcome.artifacts
+    )
+
+
+def applied_job_ids() -> set:
+    """Ids of jobs the store (journal included) already records as APPLIED"""
+    from app.core.storage import iter_jobs
+    compact_journal()
+    return {row.id for row in iter_jobs(status=ApplicationStatus.APPLIED, project=True)}
 
 
 def apply_to_job(state: AgentState) -> Dict[str, Any]:
     """
     Node 4: The Hand
-    Uses Playwright to fill the application form.
+    Uses Playwright to fill the application forms, several at a time.
     """
     draft_mode = not settings.auto_apply
     print("\nNODE: Apply to Job (The Hand)")
@@ -125,43 +261,48 @@ def apply_to_job(state: AgentState) -> Dict[str, Any]:
     jobs = state.jobs
     profile = state.user_profile
 
-    # We find the ONE job that is 'MATCHED' and ready to apply
-    # (In a real loop, we might process one by one)
-
     apps_log = []
     jobs_applied = 0
 
-    form_filler_instance = GenericFormFiller(browser_manager)
+    # A resumed run restarts this node from its checkpoint: skip jobs the
+    # store already shows as applied rather than submitting them twice
+    already_applied = applied_job_ids()
 
+    # Collect every MATCHED job, then let the engine fill their forms in parallel
+    tasks = []
+    jobs_by_id = {}
     for job in jobs:
         if job.status == ApplicationStatus.MATCHED:
-            print(f"   Applying to: {job.title} ({job.url})")
+            if job.id in already_applied:
+                print(f"   Already applied: {job.title} (skipping)")
+                job.status = ApplicationStatus.APPLIED
+                continue
+            materials = state.tailored_for(job.id)
+            if materials is None:
+                print(f"   Not tailored (LLM budget): {job.title} (skipping)")
+                continue
+            print(f"   Queued: {job.title} ({job.url})")
+            jobs_by_id[job.id] = job
+            tasks.append(application_task(job, materials))
 
-            cv_path = "data/user/cv.txt"
+    # Browsers are launched here, per run, not at import time
+    engine = ApplicationEngine(workers=settings.apply_workers)
+    outcomes = engine.run_processes(tasks, profile, draft_mode=draft_mode)
 
-            try:
-                form_filler_instance.fill(
-                    job.url, profile, cv_path, draft_mode=True)
+    for outcome in outcomes:
+        record = record_outcome(jobs_by_id[outcome.job_id], outcome, draft_mode)
+        apps_log.append(record)
+        if record.status == ApplicationStatus.APPLIED:
+            jobs_applied += 1
 
-                job.status = ApplicationStatus.APPLIED
-                jobs_applied += 1
-
-                # Log it
-                note = "Application was submitted" if not draft_mode else "Draft - Form filled only"
-                apps_log.append(ApplicationRecord(
-                    id=job.id if job.id else "unknown",
-                    job_id=job.id if job.id else "unknown",
-                    status=ApplicationStatus.APPLIED,
-                    notes=note
-                ))
-            except Exception as e:
-                print(f"   Failed to apply: {e}")
-                job.status = ApplicationStatus.FAILED
+    if apps_log:
+        from app.core.storage import save_applications
+        save_applications(apps_log)
 
     return {
         "jobs": jobs,
-        "jobs_applied_count": state.jobs_applied_count + jobs_applied,
-        "applications": state.applications + apps_log
+        "jobs_applied_count": jobs_applied,
+        "applications": apps_log
     }
 
 def generate_report(state: AgentState) -> Dict[str, Any]:
@@ -176,7 +317,6 @@ def generate_report(state: AgentState) -> Dict[str, Any]:
     total_applied = state.jobs_applied_count
 
     import datetime
-    import os
 
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     filename_ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -189,10 +329,34 @@ def generate_report(state: AgentState) -> Dict[str, Any]:
         f"## Summary",
         f"- **Jobs Found**: {total_found}",
         f"- **Jobs Applied**: {total_applied}",
+        f"- **Tailored Applications**: {len(state.tailored)} "
+        f"(LLM tailoring calls: {state.tailor_calls_count})",
         f"",
-        f"## Applications",
     ]
 
+    # LLM usage: run totals, per stage, and the most expensive jobs
+    meter = get_usage_meter()
+    usage = meter.summary()
+    report_lines.append("## LLM Usage")
+    report_lines.append(f"- **Run**: {meter.describe()}")
+    for stage, totals in usage["by_stage"].items():
+        report_lines.append(
+            f"- **{stage}**: {totals['calls']} calls, {totals['input_tokens']:,} in "
+            f"({totals['cached_input_tokens']:,} prompt-cached) / "
+            f"{totals['output_tokens']:,} out tokens, ${totals['cost_usd']:.4f}")
+    titles = {job.id: job.title for job in state.jobs}
+    costly = sorted(usage["by_job"].items(),
+                    key=lambda item: item[1]["input_tokens"] + item[1]["output_tokens"],
+                    reverse=True)[:5]
+    for job_id, totals in costly:
+        report_lines.append(
+            f"  - {titles.get(job_id, job_id)}: {totals['input_tokens'] + totals['output_tokens']:,} "
+            f"tokens, ${totals['cost_usd']:.4f}")
+    if meter.exhausted():
+        report_lines.append(f"- **Budget**: {meter.exhausted()}; remaining jobs were left for a later run")
+    report_lines.append("")
+    report_lines.append("## Applications")
+
     if not state.jobs:
         report_lines.append("_No jobs processed._")
     else:
@@ -200,7 +364,10 @@ def generate_report(state: AgentState) -> Dict[str, Any]:
         applied_jobs = [j for j in state.jobs if j.status ==
                         ApplicationStatus.APPLIED]
 
+        records = {app.job_id: app for app in state.applications}
         if applied_jobs:
+            from app.automation.artifacts import get_artifact_store
+            store = get_artifact_store()
             for job in applied_jobs:
                 report_lines.append(
                     f"### [APPLIED] {job.title} @ {job.company}")
@@ -208,6 +375,10 @@ def generate_report(state: AgentState) -> Dict[str, Any]:
                 report_lines.append(f"- **Salary**: {job.salary}")
                 report_lines.append(
                     f"- **Match Score**: {job.match_score}/100")
+                record = records.get(job.id)
+                if record and record.artifacts:
+                    report_lines.append(
+                        f"- **Screenshot**: {store.path_for(record.artifacts[0])}")
                 report_lines.append(f"")
         else:
             report_lines.append("_No applications sent this session._")
@@ -230,7 +401,12 @@ def generate_report(state: AgentState) -> Dict[str, Any]:
         f.write(content)
 
     print(f"   Report saved to: {report_path}")
+    print(f"   LLM usage: {meter.describe()}")
+    meter.save()
     print(f"   Summary: Found {total_found}, Applied {total_applied}")
 
+    # Fold this run's status transitions into the job store
+    compact_journal()
+
     # Node transition + final summary to Telegram
     
\ No newline at end of file
@@ -0,0 +1,175 @@
+# app/graph/pipeline.py
+
+"""
+Streaming execution of match -> tailor -> apply.
+
+The default graph runs each stage as a batch barrier: no form is filled
+until every job has been scored and tailored. With PIPELINE_MODE on, the
+graph replaces those three nodes with stream_pipeline(), which runs them as
+stages connected by a queue on one event loop. A job is tailored as soon as
+it scores above the threshold and handed to a browser worker as soon as its
+materials exist, so tailoring job k overlaps with the browser filling job
+k-1. State updates, journal entries and the report are the same as in batch
+mode.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.automation.engine import ApplicationEngine, ApplicationOutcome
+from app.automation.pool import BrowserPool
+from app.core.config import settings
+from app.core.journal import record_transition, set_status
+from app.core.models import (AgentState, ApplicationRecord, ApplicationStatus, Job, MatchResult,
+                             TailoredMaterials)
+from app.ai.cache import served_from_cache
+from app.ai.usage import get_usage_meter
+from app.graph.nodes import ai_engine, application_task, applied_job_ids, record_outcome
+
+
+async def _stream(state: AgentState) -> Dict[str, Any]:
+    profile = state.user_profile
+    jobs = state.jobs
+    threshold = profile.min_match_score
+    draft_mode = not settings.auto_apply
+    deferred = set(state.deferred_job_ids)
+
+    tailored: List[TailoredMaterials] = list(state.tailored)
+    already_tailored = {m.job_id: m for m in tailored}
+    generated = 0
+    records: List[ApplicationRecord] = []
+    outcomes: List[ApplicationOutcome] = []
+
+    # Resuming a checkpointed run re-enters this node: never submit a job twice
+    already_applied = applied_job_ids()
+
+    llm_slots = asyncio.Semaphore(settings.llm_max_concurrency)
+    ready: "asyncio.Queue[Optional[Tuple[Job, Optional[TailoredMaterials]]]]" = asyncio.Queue()
+    engine = ApplicationEngine(workers=settings.apply_workers)
+    start = time.perf_counter()
+    first_application: Optional[float] = None
+
+    print(f"\nStreaming {len(jobs)} jobs (threshold: {threshold}%, "
+          f"LLM concurrency: {settings.llm_max_concurrency}, browser workers: {engine.workers})")
+
+    async def score_and_tailor(i: int, job: Job) -> None:
+        nonlocal generated
+        if job.status == ApplicationStatus.SKIPPED or job.id in deferred:
+            # Dropped by the pre-filter, or left for a later run
+            return
+        if job.id in already_applied:
+            job.status = ApplicationStatus.APPLIED
+            print(f"[{i}/{len(jobs)}] {job.title} @ {job.company}... already applied, skipping.")
+            return
+        previous = job.status
+        meter = get_usage_meter()
+        if previous == ApplicationStatus.MATCHED and job.match_score is not None:
+            # From the stored backlog: already scored, go straight to tailoring
+            match = MatchResult(match_score=job.match_score, reasoning=job.match_reasoning or "",
+                                key_requirements=[], missing_skills=[])
+        else:
+            # gather() starts every job at once, so the budget is checked only once
+            # a slot is free: at most llm_max_concurrency calls are then in flight
+            async with llm_slots:
+                if meter.exhausted():
+                    return
+                match = await ai_engine.amatch_job(job, profile.cv_text)
+            if match.failed:
+                # The call failed, not the job: leave it DISCOVERED for a later run
+                print(f"[{i}/{len(jobs)}] {job.title} @ {job.company}... not scored (LLM error).")
+                return
+            job.match_score = match.match_score
+            job.match_reasoning = match.reasoning
+
+        if match.match_score < threshold:
+            job.status = ApplicationStatus.SKIPPED
+            if job.status != previous:
+                record_transition(job.id, previous, job.status, node="match")
+            print(f"[{i}/{len(jobs)}] {job.title} @ {job.company}... {match.match_score}% — Below threshold.")
+            return
+
+        job.status = ApplicationStatus.MATCHED
+        if job.status != previous:
+            record_transition(job.id, previous, job.status, node="match")
+
+        materials = already_tailored.get(job.id)
+        if materials is None:
+            async with llm_slots:
+                content = None if meter.exhausted() else await ai_engine.atailor_content(
+                    job, profile.cv_text, profile.cover_letter_template, match)
+            if content is None:
+                print(f"[{i}/{len(jobs)}] {job.title} @ {job.company}... {match.match_score}% — MATCH, not tailored (LLM budget).")
+                return
+            materials = TailoredMaterials(
+                job_id=job.id,
+                tailored_cv=content.tailored_cv,
+                tailored_cover_letter=content.cover_letter,
+                why_good_fit=content.why_good_fit,
+            )
+            tailored.append(materials)
+            already_tailored[job.id] = materials
+            generated += 0 if served_from_cache() else 1
+        set_status(job, ApplicationStatus.MATCHED, node="tailor")
+        print(f"[{i}/{len(jobs)}] {job.title} @ {job.company}... {match.match_score}% — MATCH! Queued to apply.")
+        await ready.put((job, materials))
+
+    async def apply_worker(pool: BrowserPool) -> None:
+        nonlocal first_application
+        while True:
+            item = await ready.get()
+            if item is None:
+                return
+            job, materials = item
+            outcome = await engine.apply(pool, application_task(job, materials), profile,
+                                         draft_mode=draft_mode)
+            if first_application is None and outcome.success:
+                first_application = time.perf_counter() - start
+            outcomes.append(outcome)
+            records.append(record_outcome(job, outcome, draft_mode))
+
+    async with BrowserPool.for_workers(engine.workers) as pool:
+        workers = [asyncio.create_task(apply_worker(pool)) for _ in range(engine.workers)]
+        try:
+            await asyncio.gather(*(score_and_tailor(i, job) for i, job in enumerate(jobs, 1)))
+        finally:
+            # Producers are done (or failed): let the workers drain the queue and stop
+            for _ in workers:
+                ready.put_nowait(None)
+            await asyncio.gather(*workers)
+
+    engine.stats.workers = engine.workers
+    engine.stats.total = len(outcomes)
+    engine.finish_stats(outcomes, start)
+    if first_application is not None:
+        print(f"   First application after {first_application:.1f}s")
+
+    applied = sum(1 for r in records if r.status == ApplicationStatus.APPLIED)
+    # Counters are increments and lists are merged by id (see AgentState)
+    return {
+        "jobs": jobs,
+        "tailored": tailored,
+        "tailor_calls_count": generated,
+        "jobs_applied_count": applied,
+        "applications": records,
+    }
+
+
+def stream_pipeline(state: AgentState) -> Dict[str, Any]:
+    """Node 2-4 (PIPELINE_MODE): match, tailor and apply as overlapping stages"""
+    print("\nNODE: Stream Pipeline (match -> tailor -> apply)")
+    if not state.jobs:
+        print("No jobs to analyze, Skipping")
+        return {"jobs": []}
+
+    update = asyncio.run(_stream(state))
+
+    # Same persistence as the batch nodes: scores, then application records
+    from app.core.storage import save_applications, save_jobs
+    save_jobs(update["jobs"])
+    if update["applications"]:
+        save_applications(update["applications"])
+
+    print(f"Tailoring calls this run: {state.tailor_calls_count + update['tailor_calls_count']} "
+          f"(engine total {ai_engine.tailor_calls})")
+    return update
@@ -1,29 +1,104 @@
-from typing import TypedDict, List, Annotated
+import sqlite3
+import uuid
+from typing import Any, Optional, Tuple
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from pydantic import BaseModel
+from langgraph.checkpoint.sqlite import SqliteSaver
 from langgraph.graph import StateGraph, END
 
+from app.core.config import settings
 from app.core.models import AgentState
-from app.graph.nodes import scrape_jobs,tailor_application,filter_jobs,apply_to_job, generate_report
+from app.core.tracing import traced
+from app.graph.nodes import (scrape_jobs, prefilter_jobs, fan_out_match, match_job, collect_matches,
+                             fan_out_tailor, tailor_job, apply_to_job, generate_report)
+from app.graph.pipeline import stream_pipeline
+
+
+class StateSerializer(JsonPlusSerializer):
+    """JsonPlus with pydantic models dumped in JSON mode, so the HttpUrl in
+    Job.url survives the round trip (msgpack and plain model_dump() choke on it)"""
+
+    def _default(self, obj: Any):
+        if isinstance(obj, BaseModel):
+            return self._encode_constructor_args(
+                obj.__class__, method="model_validate", args=(obj.model_dump(mode="json"),))
+        return super()._default(obj)
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        if isinstance(obj, (bytes, bytearray)):
+            return super().dumps_typed(obj)
+        return "json", self.dumps(obj)
+
+
+def get_checkpointer() -> Optional[SqliteSaver]:
+    """SQLite checkpointer under data/, or None when CHECKPOINT_ENABLED is off.
 
+    Every completed node and every finished fan-out branch is checkpointed,
+    so `run --resume <thread_id>` picks up after the last one that finished
+    instead of re-paying for its LLM calls.
+    """
+    if not settings.checkpoint_enabled:
+        return None
+    settings.data_dir.mkdir(parents=True, exist_ok=True)
+    # Branches run on worker threads; SqliteSaver serialises access itself
+    conn = sqlite3.connect(str(settings.checkpoint_file), check_same_thread=False)
+    saver = SqliteSaver(conn, serde=StateSerializer())
+    # Checkpoint metadata (which records each node's writes) has its own serializer
+    saver.jsonplus_serde = saver.serde
+    return saver
 
-def create_workflow():
+
+def create_workflow(pipeline_mode: bool = None, checkpointer=None):
+    if pipeline_mode is None:
+        pipeline_mode = settings.pipeline_mode
     workflow = StateGraph(AgentState)
     
     #Add the nodes
-    workflow.add_node("scrape",scrape_jobs)
-    workflow.add_node("match",filter_jobs)
-    workflow.add_node("tailor",tailor_application)
-    workflow.add_node("apply", apply_to_job)
-    workflow.add_node("report", generate_report)
-    #Define the edges
+    workflow.add_node("scrape", traced("node", "scrape")(scrape_jobs))
+    workflow.add_node("prefilter", traced("node", "prefilter")(prefilter_jobs))
+    workflow.add_node("report", traced("node", "report")(generate_report))
     workflow.set_entry_point("scrape")
-    workflow.add_edge("scrape","match")
-    workflow.add_edge("match","tailor")
-    workflow.add_edge("tailor","apply")
-    workflow.add_edge("apply","report")
+    workflow.add_edge("scrape","prefilter")
+    
+    if pipeline_mode:
+        #Match, tailor and apply overlap job by job inside one node
+        workflow.add_node("pipeline", traced("node", "pipeline")(stream_pipeline))
+        workflow.add_edge("prefilter","pipeline")
+        workflow.add_edge("pipeline","report")
+    else:
+        #Map-reduce: match and tailor run as one branch per job (Send),
+        #scheduled in parallel by LangGraph up to run_config()'s max_concurrency
+        workflow.add_node("match", traced("node", "match")(match_job))
+        workflow.add_node("collect", traced("node", "collect")(collect_matches))
+        workflow.add_node("tailor", traced("node", "tailor")(tailor_job))
+        workflow.add_node("apply", traced("node", "apply")(apply_to_job))
+        #Define the edges
+        workflow.add_conditional_edges("prefilter",fan_out_match,["match","collect"])
+        workflow.add_edge("match","collect")
+        workflow.add_conditional_edges("collect",fan_out_tailor,["tailor","apply"])
+        workflow.add_edge("tailor","apply")
+        workflow.add_edge("apply","report")
     workflow.add_edge("report",END)
     
     #Compile the workflow
-    app_workflow = workflow.compile()
+    app_workflow = workflow.compile(checkpointer=checkpointer)
     return app_workflow
 
+
+def new_thread_id() -> str:
+    """Id a run is checkpointed under"""
+    return uuid.uuid4().hex[:12]
+
+
+def run_config(thread_id: Optional[str] = None) -> dict:
+    """Config for app.stream()/invoke(): bounds how many branches run at once,
+    and names the checkpoint thread when checkpointing is on"""
+    config = {"max_concurrency": settings.graph_max_concurrency}
+    if thread_id:
+        config["configurable"] = {"thread_id": thread_id}
+    return config
+
+# No checkpointer here: importing the module must not open data/checkpoints.sqlite.
+# `run` builds its own checkpointed graph with get_checkpointer().
 app = create_workflow()
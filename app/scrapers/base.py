@@ -1,13 +1,21 @@
 #app/scrapers/base.py
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List
+from typing import AbstractSet, Dict, List, Optional, Type
+
+import httpx
 
 from app.core.models import Job
 
 
 class BaseScrapper(ABC):
     """Blueprint for all the job scrappers"""
+
+    # Per-source timeout in seconds (None -> settings.scraper_timeout)
+    timeout: Optional[float] = None
+    # IDs already in storage; set by the runner so sources can skip them early
+    known_ids: AbstractSet[str] = frozenset()
     
     @abstractmethod
     def scrape(self) -> List[Job]:
@@ -18,4 +26,22 @@ class BaseScrapper(ABC):
     def get_source_name(self) -> str:
         """Return the name of the job source"""
         pass
-    
\ No newline at end of file
+
+    async def ascrape(self, client: httpx.AsyncClient) -> List[Job]:
+        """Async variant of scrape() over the runner's shared client.
+
+        Sources that only implement scrape() still run concurrently:
+        the blocking call is moved to a worker thread.
+        """
+        return await asyncio.to_thread(self.scrape)
+
+
+# ==================== REGISTRY ====================
+
+SCRAPER_REGISTRY: Dict[str, Type[BaseScrapper]] = {}
+
+
+def register_scraper(cls: Type[BaseScrapper]) -> Type[BaseScrapper]:
+    """Class decorator: make a scrapper part of every run_scraper() fan-out"""
+    SCRAPER_REGISTRY[cls.__name__] = cls
+    return cls
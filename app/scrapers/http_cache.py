@@ -0,0 +1,112 @@
+#app/scrapers/http_cache.py
+
+"""
+Conditional HTTP fetching for scrapers.
+
+For every source we remember the ETag / Last-Modified validators of the last
+successful response and keep a gzip-compressed copy of its body. The next
+request sends If-None-Match / If-Modified-Since; a 304 means nothing changed
+since the last scrape, so the scraper reads the stored copy instead of
+downloading the payload again. Listings it already knows are dropped before
+normalization, so only jobs a previous run fetched but never saved (a crash
+before persisting, or a MAX_JOBS_PER_RUN cut since raised) come back out.
+"""
+
+import gzip
+import json
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional
+
+import httpx
+
+from app.core.config import settings
+
+
+class HttpCache:
+    """Validators + last response body for one scraper source"""
+
+    def __init__(self, source: str, directory: Optional[Path] = None):
+        directory = directory or settings.http_cache_dir
+        slug = source.lower().replace(" ", "_")
+        self.meta_path = directory / f"{slug}.json"
+        self.body_path = directory / f"{slug}.body.gz"
+
+    def _load_meta(self) -> Dict[str, str]:
+        if not self.meta_path.exists() or not self.body_path.exists():
+            return {}
+        try:
+            return json.loads(self.meta_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers that turn the next request into a conditional one"""
+        if not settings.scraper_conditional_requests:
+            return {}
+        meta = self._load_meta()
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    @contextmanager
+    def recording(self, response: httpx.Response) -> Iterator[Callable[[bytes], None]]:
+        """Stream a 200 response's body into the gzip copy while it is consumed.
+
+        Yields a write(chunk) callable. Validators are saved only once the
+        whole body has been written, so an interrupted download never leaves
+        an ETag pointing at a partial copy.
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            # Nothing to validate against next time
+            yield lambda chunk: None
+            return
+
+        self.meta_path.parent.mkdir(parents=True, exist_ok=True)
+        partial = self.body_path.with_name(self.body_path.name + ".part")
+        size = 0
+
+        def write(chunk: bytes) -> None:
+            nonlocal size
+            body.write(chunk)
+            size += len(chunk)
+
+        try:
+            with gzip.open(partial, "wb", compresslevel=6) as body:
+                yield write
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+
+        partial.replace(self.body_path)
+        self.meta_path.write_text(json.dumps({
+            "url": str(response.url),
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": datetime.now().isoformat(timespec="seconds"),
+            "size": size,
+        }), encoding="utf-8")
+
+    def store(self, response: httpx.Response) -> None:
+        """Remember an already-read 200 response's validators and body"""
+        with self.recording(response) as record:
+            record(response.content)
+
+    def load_body(self) -> Optional[bytes]:
+        """The last stored response body, decompressed"""
+        if not self.body_path.exists():
+            return None
+        with gzip.open(self.body_path, "rb") as f:
+            return f.read()
+
+    def clear(self) -> None:
+        """Forget the validators so the next request is unconditional"""
+        for path in (self.meta_path, self.body_path):
+            if path.exists():
+                path.unlink()
@@ -1,15 +1,19 @@
 #app/scrapers/remoteok.py
 
-from app.scrapers.base import BaseScrapper
+from app.scrapers.base import BaseScrapper, register_scraper
+from app.scrapers.http_cache import HttpCache
 from app.core.models import JobSource,ApplicationStatus,Job
 from app.core.config import settings
+from app.core.tracing import span
 
 import httpx
 import hashlib
+import ijson
 import re
 import time
 from typing import List,Optional
 
+@register_scraper
 class RemoteOkScrapper(BaseScrapper):
     """Scrapper for RemoteOk's public JSON API"""
     API_URL = "https://remoteok.com/api"
@@ -17,46 +21,99 @@ class RemoteOkScrapper(BaseScrapper):
     def get_source_name(self)->str:
         return "RemoteOk"
     
+    def __init__(self):
+        self.http_cache = HttpCache(self.get_source_name())
+    
     def scrape(self) ->List[Job] :
         """Fetch remote jobs from the RemoteOk API"""
         print(f"Scraping {self.get_source_name()}")
         
         try:
-            response = httpx.get(
-                self.API_URL,
-                headers={"User-Agent":"Gigclaw/1.0"},
-                timeout= 30.0
-            )
-            response.raise_for_status()
+            with span("http", self.get_source_name(), url=self.API_URL) as trace:
+                with httpx.stream(
+                    "GET",
+                    self.API_URL,
+                    headers={"User-Agent":"Gigclaw/1.0", **self.http_cache.conditional_headers()},
+                    timeout= self.timeout or settings.scraper_timeout
+                ) as response:
+                    trace.set(status=response.status_code)
+                    if self._not_modified(response):
+                        return self._replay_cached()
+                    
+                    listings = _ListingStream(self)
+                    with self.http_cache.recording(response) as record:
+                        for chunk in response.iter_bytes():
+                            record(chunk)
+                            listings.feed(chunk)
+                    jobs = listings.finish()
+                    trace.set(bytes=response.num_bytes_downloaded, jobs=len(jobs))
+                    return jobs
         except httpx.HTTPStatusError as e:
             print(f"Api returned error {e.response.status_code}")
             return []
         except httpx.NetworkError as e:
             print(f"Network error : {e}")
             return []
+    
+    async def ascrape(self, client: httpx.AsyncClient) -> List[Job]:
+        """Fetch remote jobs over the runner's shared async client"""
+        print(f"Scraping {self.get_source_name()}")
         
-        raw_jobs = response.json()
-        raw_jobs = raw_jobs[1:] if raw_jobs else []
-        
-        #Apply limit
-        raw_jobs = raw_jobs[:settings.max_jobs_per_run]
-        
-        jobs = []
-        
-        for raw in raw_jobs:
-            job= self._normalize(raw)
-            if job:
-                jobs.append(job)
-                
-        print(f"Scraped {len(jobs)} jobs from {self.get_source_name()}")
-        return jobs            
+        try:
+            with span("http", self.get_source_name(), url=self.API_URL) as trace:
+                async with client.stream(
+                    "GET",
+                    self.API_URL,
+                    headers=self.http_cache.conditional_headers(),
+                    timeout= self.timeout or settings.scraper_timeout
+                ) as response:
+                    trace.set(status=response.status_code)
+                    if self._not_modified(response):
+                        return self._replay_cached()
+                    
+                    listings = _ListingStream(self)
+                    with self.http_cache.recording(response) as record:
+                        async for chunk in response.aiter_bytes():
+                            record(chunk)
+                            listings.feed(chunk)
+                    jobs = listings.finish()
+                    trace.set(bytes=response.num_bytes_downloaded, jobs=len(jobs))
+                    return jobs
+        except httpx.HTTPStatusError as e:
+            print(f"Api returned error {e.response.status_code}")
+            return []
+        except httpx.NetworkError as e:
+            print(f"Network error : {e}")
+            return []
     
-    def _normalize(self, raw: dict) -> Optional[Job]:
+    def _not_modified(self, response: httpx.Response) -> bool:
+        """304 -> nothing changed since last scrape; other errors raise"""
+        if response.status_code == 304:
+            print(f"{self.get_source_name()} not modified since last scrape, using the stored copy")
+            return True
+        response.raise_for_status()
+        return False
+    
+    def _replay_cached(self) -> List[Job]:
+        """Listings from the stored body; known IDs are skipped before normalization"""
+        body = self.http_cache.load_body()
+        if body is None:
+            return []
+        listings = _ListingStream(self)
+        listings.feed(body)
+        return listings.finish()
+    
+    def _job_id(self, raw: dict) -> str:
+        """Stable ID from the listing's slug (cheap -- no HTML or validation)"""
+        slug = raw.get("slug", "")
+        return hashlib.md5(f"remoteok-{slug}".encode()).hexdigest()[:12]
+    
+    def _normalize(self, raw: dict, job_id: Optional[str] = None) -> Optional[Job]:
         """Convert raw API data into a validated Job model"""
         try:
             # Generate unique ID from slug
             slug = raw.get("slug", "")
-            job_id = hashlib.md5(f"remoteok-{slug}".encode()).hexdigest()[:12]
+            job_id = job_id or self._job_id(raw)
 
             # Build the URL
             url = f"https://remoteok.com/remote-jobs/{slug}"
@@ -107,4 +164,58 @@ class RemoteOkScrapper(BaseScrapper):
                 return f"Up to ${int(max_sal):,}"
         except (ValueError, TypeError):
             pass
-        return None
\ No newline at end of file
+        return None
+
+
+class _ListingStream:
+    """Incremental parser for the RemoteOk API array.
+
+    Byte chunks go in as they arrive; each listing is handled as soon as it
+    is complete. Known IDs are dropped before any HTML stripping or Pydantic
+    validation, and once max_jobs_per_run listings have been seen the rest
+    of the payload is no longer parsed at all.
+    """
+
+    def __init__(self, scraper: RemoteOkScrapper):
+        self.scraper = scraper
+        self.limit = settings.max_jobs_per_run
+        self.items = ijson.sendable_list()
+        self.parser = ijson.items_coro(self.items, "item", use_float=True)
+        self.seen = 0
+        self.known = 0
+        self.done = False
+        self.jobs: List[Job] = []
+
+    def feed(self, chunk: bytes) -> None:
+        if self.done:
+            return
+        self.parser.send(chunk)
+        for raw in self.items:
+            self._handle(raw)
+        del self.items[:]
+
+    def _handle(self, raw: dict) -> None:
+        self.seen += 1
+        # The first element is the API's legal notice, not a job
+        if self.seen == 1 or self.done:
+            return
+        #Apply limit
+        if self.seen - 1 > self.limit:
+            self.done = True
+            return
+        
+        job_id = self.scraper._job_id(raw)
+        if job_id in self.scraper.known_ids:
+            self.known += 1
+            return
+        
+        job = self.scraper._normalize(raw, job_id)
+        if job:
+            self.jobs.append(job)
+
+    def finish(self) -> List[Job]:
+        if not self.done:
+            self.parser.close()
+        print(f"Scraped {len(self.jobs)} new jobs from {self.scraper.get_source_name()} "
+              f"(skipped {self.known} already known)")
+        return self.jobs
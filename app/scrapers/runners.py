@@ -1,30 +1,99 @@
 #app/scrapers/runners.py
 
-from app.scrapers.remoteok import RemoteOkScrapper
-from app.core.storage import save_jobs,load_jobs
+import asyncio
+import time
+from typing import AbstractSet, List, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.models import Job
+from app.scrapers.base import BaseScrapper, SCRAPER_REGISTRY
+# Importing a source module registers its scrapper
+import app.scrapers.remoteok  # noqa: F401
+from app.core.storage import save_jobs,load_job_ids,record_scrape
+
+
+async def _scrape_source(scraper: BaseScrapper, client: httpx.AsyncClient) -> List[Job]:
+    """Run one source with its own timeout; a failing source never sinks the others"""
+    timeout = scraper.timeout or settings.scraper_timeout
+    start = time.perf_counter()
+    try:
+        jobs = await asyncio.wait_for(scraper.ascrape(client), timeout=timeout)
+    except asyncio.TimeoutError:
+        print(f"{scraper.get_source_name()} timed out after {timeout:g}s, skipping")
+        return []
+    except Exception as e:
+        print(f"{scraper.get_source_name()} failed: {e}")
+        return []
+    print(f"{scraper.get_source_name()}: {len(jobs)} jobs in {time.perf_counter() - start:.1f}s")
+    return jobs
+
+
+async def scrape_all_sources(scrapers: Optional[List[BaseScrapper]] = None,
+                             known_ids: AbstractSet[str] = frozenset(),
+                             transport: Optional[httpx.AsyncBaseTransport] = None) -> List[Job]:
+    """Fan out to every registered source at once over one pooled AsyncClient
+
+    Args:
+        scrapers: Sources to run (default: one of each registered scrapper)
+        known_ids: Stored job ids, so sources can skip them early
+        transport: Transport for the shared client (tests pass a MockTransport)
+    """
+    scrapers = scrapers if scrapers is not None else [cls() for cls in SCRAPER_REGISTRY.values()]
+    for scraper in scrapers:
+        scraper.known_ids = known_ids
+    limits = httpx.Limits(
+        max_connections=settings.scraper_max_connections,
+        max_keepalive_connections=settings.scraper_max_connections,
+    )
+    async with httpx.AsyncClient(
+        limits=limits,
+        headers={"User-Agent":"Gigclaw/1.0"},
+        follow_redirects=True,
+        transport=transport,
+    ) as client:
+        results = await asyncio.gather(
+            *(_scrape_source(scraper, client) for scraper in scrapers))
+
+    return [job for jobs in results for job in jobs]
 
 
 def run_scraper():
-    """Scrape jobs , deduplicate , and save"""
-    #Load existing jobs
+    """Scrape every source concurrently, deduplicate , and save"""
+    #Load existing job ids (no need to materialize every job just to dedupe)
     
-    existing_jobs = load_jobs()
-    existing_ids = {job.id for job in existing_jobs}
+    existing_ids = load_job_ids()
     
-    print(f"{len(existing_jobs)} existing jobs in storage")
+    print(f"{len(existing_ids)} existing jobs in storage")
     
-    #Scrape new jobs
-    scraper = RemoteOkScrapper()
-    new_jobs = scraper.scrape()
+    #Scrape new jobs (total time ~ slowest source, not the sum)
+    #loop.close() doesn't wait on worker threads of sources that timed out
+    loop = asyncio.new_event_loop()
+    try:
+        new_jobs = loop.run_until_complete(scrape_all_sources(known_ids=existing_ids))
+    finally:
+        loop.close()
     
-    #Filter out the duplicates
-    unique_new = [job for job in new_jobs if job.id not in existing_ids]
+    #Filter out the duplicates (sources already skip known IDs; this catches cross-source ones)
+    existing_ids = set(existing_ids)
+    unique_new = []
+    for job in new_jobs:
+        if job.id not in existing_ids:
+            existing_ids.add(job.id)
+            unique_new.append(job)
     print (f"{len(unique_new)} new unique jobs (filtered {len(new_jobs) - len(unique_new)})")
     
     
-    #Merge and save 
-    all_jobs= existing_jobs + unique_new
-    save_jobs(all_jobs)
+    #Save only the new rows (upsert)
+    save_jobs(unique_new)
+    record_scrape(len(unique_new))
+    
+    #Embed each job once, as it enters the store
+    if settings.embedding_index_enabled and unique_new:
+        from app.ai.embeddings import get_job_index
+        added = get_job_index().add(unique_new)
+        print(f"Indexed {added} new jobs for CV similarity")
     
     return unique_new
 
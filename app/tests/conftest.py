@@ -0,0 +1,115 @@
+# app/tests/conftest.py
+
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+# Settings are read at import time: give the tests a throwaway data dir and
+# the two required values before anything under app/ is imported.
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("MODEL", "gpt-5-nano")
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="gigclaw-tests-"))
+
+from app.automation.pool import BrowserPool  # noqa: E402
+from app.core import journal, storage  # noqa: E402
+from app.core.config import settings  # noqa: E402
+
+
+@pytest.fixture
+def fresh_store(monkeypatch, tmp_path):
+    """An empty data dir with its own jobs database and journal"""
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    monkeypatch.setattr(storage, "_conn", None)
+    monkeypatch.setattr(journal, "_handle", None)
+    monkeypatch.setattr(journal, "_pending", 0)
+    yield tmp_path
+    if storage._conn is not None:
+        storage._conn.close()
+    if journal._handle is not None:
+        journal._handle.close()
+
+
+# ---------- in-memory stand-ins for Playwright ----------
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+        self.cookies_cleared = 0
+        self.pages = 0
+        self.routes = []
+
+    async def new_page(self):
+        if self.closed or not self.browser.connected:
+            raise RuntimeError("Target closed")
+        self.pages += 1
+        return FakePage(self)
+
+    async def clear_cookies(self):
+        self.cookies_cleared += 1
+
+    async def route(self, pattern, handler):
+        self.routes.append((pattern, handler))
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.contexts = []
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **options):
+        context = FakeContext(self)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.connected = False
+
+
+class FakeChromium:
+    def __init__(self):
+        self.launched = []
+
+    async def launch(self, **options):
+        browser = FakeBrowser()
+        self.launched.append(browser)
+        return browser
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = FakeChromium()
+        self.stopped = False
+
+    async def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def make_pool():
+    """BrowserPool factory whose Playwright is FakePlaywright (no driver, no Chromium)"""
+    def make(**kwargs) -> BrowserPool:
+        pool = BrowserPool(headless=True, lean=False, **kwargs)
+        # What start() sets up, minus launching the Playwright driver
+        pool.playwright = FakePlaywright()
+        pool._slots = asyncio.Semaphore(pool.capacity)
+        pool._lock = asyncio.Lock()
+        return pool
+    return make
@@ -0,0 +1,146 @@
+# app/tests/test_applicator.py
+
+"""GenericFormFiller.afill() on a scripted page that answers like mock_job.html."""
+
+import asyncio
+import json
+import struct
+import zlib
+from pathlib import Path
+
+from app.automation.applicator import (
+    ANALYZE_JS, FORM_FIELD_SELECTOR, MARK_FORM_JS, PROBE_JS, GenericFormFiller,
+)
+from app.core.models import UserProfile
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+SNAPSHOT = json.loads((FIXTURES / "mock_job_snapshot.json").read_text(encoding="utf-8"))
+
+PROFILE = UserProfile(name="Test User", email="test@example.com", target_roles=[],
+                      cv_text="cv", cover_letter_template="Test Letter")
+
+
+def _png() -> bytes:
+    """A valid 1x1 PNG, so the artifact store can decode it with or without Pillow"""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    header = struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(b"\x00\xff\xff\xff")) + chunk(b"IEND", b""))
+
+
+class _Handle:
+    def __init__(self, value):
+        self.value = value
+
+    async def json_value(self):
+        return self.value
+
+
+class ScriptedPage:
+    """Records every Playwright call afill() makes; evaluate() answers from SNAPSHOT"""
+
+    def __init__(self, confirmation="form-hidden"):
+        self.url = "about:blank"
+        self.calls = []
+        self.filled = {}
+        self.confirmation = confirmation
+
+    async def goto(self, url, **kwargs):
+        self.calls.append("goto")
+        self.url = url
+
+    async def wait_for_selector(self, selector, **kwargs):
+        self.calls.append(("wait_for_selector", selector, kwargs.get("state")))
+
+    async def evaluate(self, script, arg=None):
+        if script == ANALYZE_JS:
+            self.calls.append("analyze")
+            return SNAPSHOT
+        if script == PROBE_JS:
+            self.calls.append("probe")
+            return {"signature": SNAPSHOT["signature"], "found": list(arg)}
+        if script == MARK_FORM_JS:
+            self.calls.append("mark_form")
+            return None
+        raise AssertionError(f"unexpected evaluate: {script[:40]}")
+
+    async def fill(self, selector, value):
+        self.filled[selector] = value
+
+    async def set_input_files(self, selector, path):
+        self.calls.append(("upload", selector))
+
+    async def click(self, selector):
+        self.calls.append(("click", selector))
+
+    async def wait_for_function(self, script, arg=None, timeout=None):
+        self.calls.append("wait_for_function")
+        if isinstance(self.confirmation, Exception):
+            raise self.confirmation
+        return _Handle(self.confirmation)
+
+    async def wait_for_load_state(self, state):
+        self.calls.append(("load_state", state))
+
+    async def wait_for_timeout(self, ms):
+        self.calls.append(("sleep", ms))
+
+    async def screenshot(self, **options):
+        return _png()
+
+
+def _fill(page, url, tmp_path, draft_mode=False):
+    cv = tmp_path / "cv.txt"
+    cv.write_text("dummy cv", encoding="utf-8")
+    artifacts = []
+    timings = asyncio.run(GenericFormFiller().afill(
+        page, url, PROFILE, str(cv), draft_mode=draft_mode, artifacts=artifacts))
+    return timings, artifacts
+
+
+def test_live_fill_submits_and_waits_for_confirmation(tmp_path):
+    page = ScriptedPage()
+    timings, artifacts = _fill(page, "https://ats-live.example/jobs/1", tmp_path)
+
+    assert page.filled == {
+        "#full-name": "Test User",
+        "#email": "test@example.com",
+        "#cover-letter": "Test Letter",
+    }
+    assert ("upload", "#cv-upload") in page.calls
+    assert ("click", 'button[type="submit"]') in page.calls
+    # Readiness and confirmation are events, never fixed sleeps
+    assert ("wait_for_selector", FORM_FIELD_SELECTOR, "visible") in page.calls
+    assert page.calls.index("mark_form") < page.calls.index(("click", 'button[type="submit"]'))
+    assert "wait_for_function" in page.calls
+    assert not any(call[0] == "sleep" for call in page.calls if isinstance(call, tuple))
+    assert set(timings) == {"navigate", "ready", "fill", "submit", "screenshot", "total"}
+    assert len(artifacts) >= 1
+
+
+def test_draft_fill_does_not_submit(tmp_path):
+    page = ScriptedPage()
+    _fill(page, "https://ats-draft.example/jobs/1", tmp_path, draft_mode=True)
+
+    assert page.filled
+    assert not any(isinstance(c, tuple) and c[0] == "click" for c in page.calls)
+    assert "wait_for_function" not in page.calls
+
+
+def test_navigation_counts_as_confirmation(tmp_path):
+    page = ScriptedPage(confirmation=RuntimeError("Execution context was destroyed"))
+    _fill(page, "https://ats-nav.example/jobs/1", tmp_path)
+
+    assert ("load_state", "domcontentloaded") in page.calls
+
+
+def test_second_visit_uses_cached_mapping(tmp_path):
+    first = ScriptedPage()
+    _fill(first, "https://ats-cache.example/jobs/1", tmp_path)
+    second = ScriptedPage()
+    _fill(second, "https://ats-cache.example/jobs/2", tmp_path)
+
+    assert "analyze" in first.calls
+    assert "probe" in second.calls and "analyze" not in second.calls
+    assert second.filled == first.filled
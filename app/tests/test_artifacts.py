@@ -0,0 +1,130 @@
+# app/tests/test_artifacts.py
+
+import asyncio
+import struct
+import threading
+import zlib
+from types import SimpleNamespace
+
+import pytest
+
+from app.automation import artifacts
+from app.automation.artifacts import ArtifactStore
+from app.core.config import settings
+
+
+class _Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(artifacts, "time", SimpleNamespace(time=clock.time))
+    return clock
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path, clock):
+    # Full-size PNGs are stored byte for byte, with or without Pillow
+    monkeypatch.setattr(settings, "screenshot_format", "png")
+    monkeypatch.setattr(settings, "artifacts_prune_every", 1)
+    return ArtifactStore(tmp_path / "artifacts")
+
+
+def _png(width: int, shade: int) -> bytes:
+    """A valid grey PNG, so the thumbnail path can decode it when Pillow is installed"""
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+    rows = b"".join(b"\x00" + bytes([shade]) * width for _ in range(2))
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, 2, 8, 0, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b""))
+
+
+def _files(store):
+    return sorted(p.name for p in store.directory.rglob("*.png"))
+
+
+def test_identical_screenshots_are_stored_once(store, clock):
+    first = store.save(b"same pixels", "success", full=True)
+    clock.now += 60
+    again = store.save(b"same pixels", "success", full=True)
+    other = store.save(b"other pixels", "success", full=True)
+
+    assert first == again != other
+    assert _files(store) == sorted([first, other])
+    assert store.path_for(first).read_bytes() == b"same pixels"
+    assert store.stats() == {"artifacts": 2, "size_bytes": 2 * len(b"same pixels") + 1}
+
+
+def test_retention_drops_artifacts_not_used_recently(store, clock):
+    store.retention_seconds = 3600
+    old = store.save(b"old", "success", full=True)
+    clock.now += 1800
+    kept = store.save(b"kept", "success", full=True)
+    clock.now += 1800
+    # Saving the same bytes again counts as a use
+    store.save(b"kept", "success", full=True)
+    clock.now += 1
+
+    store.save(b"new", "success", full=True)
+
+    assert not store.path_for(old).exists()
+    assert store.path_for(kept).exists()
+    assert store.stats()["artifacts"] == 2
+
+
+def test_size_cap_removes_least_recently_used_first(store, clock):
+    store.max_bytes = 25
+    names = []
+    for i in range(3):
+        clock.now += 1
+        names.append(store.save(bytes([i]) * 10, "success", full=True))
+
+    assert not store.path_for(names[0]).exists()
+    assert _files(store) == sorted(names[1:])
+    clock.now += 1
+    store.save(bytes([1]) * 10, "success", full=True)  # touch the second one
+    clock.now += 1
+    fourth = store.save(bytes([3]) * 10, "success", full=True)
+
+    assert _files(store) == sorted([names[1], fourth])
+    assert store.stats()["size_bytes"] <= store.max_bytes
+
+
+def test_prune_runs_every_n_saves(store, monkeypatch):
+    store.prune_every = 3
+    store.max_bytes = 1
+    store.save(b"one", "success", full=True)
+    store.save(b"two", "success", full=True)
+    assert store.stats()["artifacts"] == 2
+
+    store.save(b"three", "success", full=True)
+    assert store.stats()["artifacts"] == 0
+
+
+def test_acapture_saves_off_the_event_loop(store, monkeypatch):
+    save = store.save
+    threads = []
+
+    def recording_save(data, kind, full):
+        threads.append(threading.get_ident())
+        return save(data, kind, full)
+
+    monkeypatch.setattr(store, "save", recording_save)
+
+    class Page:
+        async def screenshot(self, **options):
+            return _png(8, 200 if options["full_page"] else 100)
+
+    async def scenario():
+        return threading.get_ident(), await store.acapture(Page(), "error")
+
+    loop_thread, names = asyncio.run(scenario())
+
+    assert len(names) == 2  # errors keep a thumbnail and a full-page image
+    assert threads and loop_thread not in threads
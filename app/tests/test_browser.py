@@ -0,0 +1,76 @@
+# app/tests/test_browser.py
+
+import asyncio
+
+import pytest
+
+from app.automation.browser import _alean_route, is_blocked_request
+
+
+@pytest.mark.parametrize("resource_type, url, blocked", [
+    ("document", "https://boards.greenhouse.io/acme/jobs/1", False),
+    ("script", "https://boards.greenhouse.io/app.js", False),
+    ("xhr", "https://boards.greenhouse.io/api/form", False),
+    ("stylesheet", "https://boards.greenhouse.io/app.css", False),
+    ("image", "https://boards.greenhouse.io/logo.png", True),
+    ("font", "https://fonts.gstatic.com/inter.woff2", True),
+    ("media", "https://cdn.example.com/intro.mp4", True),
+    ("script", "https://www.googletagmanager.com/gtm.js", True),
+    ("script", "https://static.hotjar.com/c/hotjar.js", True),
+    ("script", "https://px.ads.linkedin.com/collect", True),
+    # Suffix match on a dot boundary only
+    ("script", "https://nothotjar.com/app.js", False),
+])
+def test_is_blocked_request(resource_type, url, blocked):
+    assert is_blocked_request(resource_type, url) is blocked
+
+
+class _Request:
+    def __init__(self, resource_type, url):
+        self.resource_type = resource_type
+        self.url = url
+
+
+class _Route:
+    def __init__(self, resource_type, url):
+        self.request = _Request(resource_type, url)
+        self.result = None
+
+    async def abort(self):
+        self.result = "abort"
+
+    async def continue_(self):
+        self.result = "continue"
+
+
+def test_lean_route_aborts_only_blocked_requests():
+    image = _Route("image", "https://acme.example/hero.jpg")
+    form = _Route("document", "https://acme.example/apply")
+    asyncio.run(_alean_route(image))
+    asyncio.run(_alean_route(form))
+
+    assert image.result == "abort"
+    assert form.result == "continue"
+
+
+def test_lean_pool_routes_every_context(make_pool):
+    async def scenario():
+        pool = make_pool(browsers=1, contexts_per_browser=1, max_pages=0)
+        pool.lean = True
+        async with pool.page() as page:
+            pass
+        return page
+
+    page = asyncio.run(scenario())
+    assert page.context.routes == [("**/*", _alean_route)]
+
+
+def test_default_pool_does_not_route(make_pool):
+    async def scenario():
+        pool = make_pool(browsers=1, contexts_per_browser=1, max_pages=0)
+        async with pool.page() as page:
+            pass
+        return page
+
+    page = asyncio.run(scenario())
+    assert page.context.routes == []
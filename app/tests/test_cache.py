@@ -0,0 +1,137 @@
+# app/tests/test_cache.py
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.ai import cache as cache_module
+from app.ai.cache import LLMCache, served_from_cache
+from app.core.models import ApplicationStatus, Job, JobBranch, MatchResult, TailoredContent, UserProfile
+from app.graph import nodes
+
+
+class _Clock:
+    def __init__(self, now=1_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(time=clock.time))
+    return clock
+
+
+def _result(text="x" * 200) -> MatchResult:
+    return MatchResult(match_score=80, reasoning=text, key_requirements=[], missing_skills=[])
+
+
+def test_entries_expire_after_the_ttl(tmp_path, clock):
+    cache = LLMCache(tmp_path / "llm_cache.sqlite", ttl_seconds=60, max_bytes=10**6)
+    cache.put("a", _result())
+
+    clock.now += 30
+    assert cache.get("a", MatchResult) == _result()
+    assert served_from_cache()
+
+    clock.now += 31
+    assert cache.get("a", MatchResult) is None
+    assert not served_from_cache()
+    assert cache.stats()["entries"] == 0
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_put_evicts_least_recently_used_past_the_size_cap(tmp_path, clock):
+    size = len(_result().model_dump_json())
+    cache = LLMCache(tmp_path / "llm_cache.sqlite", ttl_seconds=3600,
+                     max_bytes=int(size * 2.5))
+    for key in ("a", "b"):
+        clock.now += 1
+        cache.put(key, _result())
+    clock.now += 1
+    cache.get("a", MatchResult)  # "b" is now the least recently used
+
+    clock.now += 1
+    cache.put("c", _result())
+
+    assert cache.get("b", MatchResult) is None
+    assert cache.get("a", MatchResult) is not None
+    assert cache.get("c", MatchResult) is not None
+    assert cache.stats()["size_bytes"] <= cache.max_bytes
+
+
+def test_put_drops_expired_entries(tmp_path, clock):
+    cache = LLMCache(tmp_path / "llm_cache.sqlite", ttl_seconds=60, max_bytes=10**6)
+    cache.put("old", _result())
+    clock.now += 120
+    cache.put("new", _result())
+
+    assert cache.stats()["entries"] == 1
+
+
+class _FakeLLM:
+    """Stands in for the chat model behind with_structured_output(include_raw=True)"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def with_structured_output(self, schema, include_raw=False):
+        return self
+
+    def invoke(self, messages):
+        self.calls += 1
+        content = TailoredContent(tailored_cv="cv", cover_letter="letter", why_good_fit=["fit"])
+        return {"raw": None, "parsed": content, "parsing_error": None}
+
+
+def test_tailor_counts_only_provider_calls(tmp_path, monkeypatch):
+    llm = _FakeLLM()
+    engine = nodes.ai_engine
+    monkeypatch.setattr(engine, "llm", llm)
+    monkeypatch.setattr(engine, "cache", LLMCache(tmp_path / "llm_cache.sqlite",
+                                                  ttl_seconds=3600, max_bytes=10**6))
+    monkeypatch.setattr(engine, "tailor_calls", 0)
+    job = Job(id="tailor-cache", source="remoteok", url="https://ats.example/apply",
+              title="Python Developer", company="Acme", description="python",
+              posted_date="2026-10-01", match_score=90, status=ApplicationStatus.MATCHED)
+    branch = JobBranch(job=job, user_profile=UserProfile(
+        name="Test User", email="test@example.com", target_roles=[], cv_text="cv",
+        cover_letter_template="letter"))
+
+    first = nodes.tailor_job(branch)
+    again = nodes.tailor_job(branch)
+
+    assert llm.calls == 1
+    assert (first["tailor_calls_count"], again["tailor_calls_count"]) == (1, 0)
+    assert engine.tailor_calls == 1
+    assert again["tailored"][0] == first["tailored"][0]
+
+
+def test_openai_engine_counts_only_provider_calls(tmp_path, monkeypatch):
+    from app.ai.engine import AIEngine
+
+    calls = []
+
+    def parse(**request):
+        calls.append(request)
+        content = TailoredContent(tailored_cv="cv", cover_letter="letter", why_good_fit=["fit"])
+        return SimpleNamespace(usage=None, choices=[
+            SimpleNamespace(message=SimpleNamespace(parsed=content, refusal=None))])
+
+    engine = AIEngine()
+    engine.client = SimpleNamespace(
+        beta=SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(parse=parse))))
+    engine.cache = LLMCache(tmp_path / "llm_cache.sqlite", ttl_seconds=3600, max_bytes=10**6)
+    job = Job(id="tailor-openai", source="remoteok", url="https://ats.example/apply",
+              title="Python Developer", company="Acme", description="python",
+              posted_date="2026-10-01", match_score=90)
+
+    first = engine.tailor_content(job, "cv", "letter", _result())
+    again = engine.tailor_content(job, "cv", "letter", _result())
+
+    assert len(calls) == 1
+    assert engine.tailor_calls == 1
+    assert again == first
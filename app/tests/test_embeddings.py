@@ -0,0 +1,81 @@
+# app/tests/test_embeddings.py
+
+import numpy as np
+
+from app.ai import embeddings
+from app.ai.embeddings import JobIndex, embed
+from app.ai.prefilter import prefilter
+from app.core.models import Job, UserProfile
+
+DIM = 256
+
+
+def _job(job_id, title, description, tags=()):
+    return Job(id=job_id, source="remoteok", url=f"https://ats.example/{job_id}",
+               title=title, company="Acme", description=description, tags=list(tags),
+               posted_date="2026-10-01")
+
+
+JOBS = [
+    _job("python", "Python Developer", "Build Django APIs on Postgres with Celery workers",
+         tags=["python", "django"]),
+    _job("golang", "Go Engineer", "Write Go microservices and gRPC APIs", tags=["go"]),
+    _job("chef", "Line Cook", "Prepare pasta, sauces and desserts for dinner service"),
+]
+
+
+def test_embed_is_stable_and_unit_length():
+    vector = embed("Python developer with Django experience", DIM)
+
+    assert vector.dtype == np.float32 and vector.shape == (DIM,)
+    assert np.isclose(np.linalg.norm(vector), 1.0)
+    assert np.array_equal(vector, embed("Python developer with Django experience", DIM))
+    assert not embed("", DIM).any()
+
+
+def test_add_reopen_and_search(tmp_path, monkeypatch):
+    # A tiny initial file, so adding jobs has to grow (remap) it
+    monkeypatch.setattr(embeddings, "INITIAL_CAPACITY", 2)
+    index = JobIndex(tmp_path, dim=DIM)
+    assert index.add(JOBS) == 3
+    assert index.add(JOBS[:1] + [JOBS[0]]) == 0
+
+    reopened = JobIndex(tmp_path, dim=DIM)
+    query = embed("Senior Python Django developer, Postgres and Celery", DIM)
+
+    assert len(reopened) == 3 and "golang" in reopened
+    ranked = reopened.search(query, k=3)
+    assert [job_id for job_id, _ in ranked][0] == "python"
+    assert [score for _, score in ranked] == sorted((s for _, s in ranked), reverse=True)
+    assert reopened.search(query, k=1) == ranked[:1]
+    scores = reopened.similarity(["chef", "unknown", "python"], query)
+    assert scores[1] == 0.0
+    assert np.isclose(scores[2], ranked[0][1])
+
+
+def test_changed_dimension_rebuilds_the_index(tmp_path):
+    JobIndex(tmp_path, dim=DIM).add(JOBS)
+
+    assert len(JobIndex(tmp_path, dim=DIM // 2)) == 0
+
+
+def test_negative_index_similarity_does_not_sink_a_job(tmp_path):
+    """Signed hashing gives unrelated texts small negative cosines; the
+    pre-filter treats them as 0 instead of a penalty"""
+    profile = UserProfile(name="Test User", email="test@example.com",
+                          target_roles=["Python Developer"], cv_text="django postgres celery",
+                          cover_letter_template="letter")
+    index = JobIndex(tmp_path, dim=16)
+    query = embed(profile.cv_text, 16)
+    candidates = [_job(f"job-{i}", "Python Developer", f"alpha{i} beta{i} gamma{i}")
+                  for i in range(50)]
+    index.add(candidates)
+    similarity = index.similarity([job.id for job in candidates], query)
+    unrelated = [job for job, score in zip(candidates, similarity) if score < 0][:3]
+    assert unrelated, "expected hash collisions to give some negative cosines"
+
+    # Full role match and no CV overlap: exactly the 0.6 keyword share
+    result = prefilter(unrelated, profile, top_k=0, min_score=0.6,
+                       similarity=index.similarity([job.id for job in unrelated], query))
+
+    assert result.kept == unrelated and not result.dropped
@@ -0,0 +1,74 @@
+# app/tests/test_engine.py
+
+import asyncio
+
+from app.automation.engine import ApplicationEngine, ApplicationTask
+from app.core.models import UserProfile
+
+PROFILE = UserProfile(name="Test User", email="test@example.com", target_roles=[],
+                      cv_text="cv", cover_letter_template="letter")
+
+
+class FakeFiller:
+    """Stands in for GenericFormFiller.afill(): waits, or raises for URLs containing 'broken'"""
+
+    def __init__(self, seconds: float = 0.02):
+        self.seconds = seconds
+        self.in_flight = 0
+        self.peak = 0
+        self.draft_modes = []
+
+    async def afill(self, page, url, profile, cv_path, draft_mode=True,
+                    cover_letter=None, artifacts=None):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        self.draft_modes.append(draft_mode)
+        try:
+            await asyncio.sleep(self.seconds)
+            if "broken" in url:
+                raise RuntimeError("page crashed")
+            return {"fill": self.seconds}
+        finally:
+            self.in_flight -= 1
+
+
+def _tasks(count: int, broken=()):
+    return [ApplicationTask(job_id=f"job-{i}",
+                            url=f"file:///{'broken' if i in broken else 'form'}/{i}.html")
+            for i in range(count)]
+
+
+def test_failures_stay_isolated_and_outcomes_keep_order(make_pool):
+    filler = FakeFiller()
+    engine = ApplicationEngine(pool=make_pool(browsers=1, contexts_per_browser=3, max_pages=0),
+                               workers=3, filler=filler)
+    tasks = _tasks(7, broken={2, 5})
+
+    outcomes = engine.run_sync(tasks, PROFILE, draft_mode=False)
+
+    assert [o.job_id for o in outcomes] == [t.job_id for t in tasks]
+    assert [o.success for o in outcomes] == [True, True, False, True, True, False, True]
+    assert "page crashed" in outcomes[2].error
+    assert filler.peak == 3
+    assert set(filler.draft_modes) == {False}
+    assert engine.stats.succeeded == 5 and engine.stats.failed == 2
+
+
+def test_workers_bound_concurrency_below_pool_capacity(make_pool):
+    filler = FakeFiller()
+    engine = ApplicationEngine(pool=make_pool(browsers=2, contexts_per_browser=4, max_pages=0),
+                               workers=2, filler=filler)
+
+    engine.run_sync(_tasks(6), PROFILE)
+
+    assert filler.peak == 2
+
+
+def test_throughput_counts_only_completed_applications(make_pool):
+    engine = ApplicationEngine(pool=make_pool(browsers=1, contexts_per_browser=2, max_pages=0),
+                               workers=2, filler=FakeFiller(seconds=0.0))
+
+    engine.run_sync(_tasks(4, broken={0, 1, 2, 3}), PROFILE)
+
+    assert engine.stats.failed == 4
+    assert engine.stats.jobs_per_minute == 0.0
@@ -0,0 +1,78 @@
+# app/tests/test_form_analyzer.py
+
+import json
+from pathlib import Path
+
+from app.automation.applicator import GenericFormFiller
+from app.automation.form_analyzer import FIELD_HINTS, plan_form
+from app.core.models import UserProfile
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def _field(selector, label, name="", type="text", tag="input", **extra):
+    return {"selector": selector, "tag": tag, "type": type, "label": label,
+            "name": name, "id": selector.lstrip("#"), **extra}
+
+
+def _profile(name="Ada Byron Lovelace"):
+    return UserProfile(name=name, email="ada@example.com", target_roles=[],
+                       cv_text="cv", cover_letter_template="letter")
+
+
+def test_plan_mock_job_fixture():
+    """ANALYZE_JS snapshot of app/tests/fixtures/mock_job.html"""
+    snapshot = json.loads((FIXTURES / "mock_job_snapshot.json").read_text(encoding="utf-8"))
+    plan = plan_form(snapshot, list(FIELD_HINTS))
+
+    assert plan.fields == {
+        "name": "#full-name",
+        "email": "#email",
+        "cover_letter": "#cover-letter",
+    }
+    assert plan.upload == "#cv-upload"
+    assert plan.submit == 'button[type="submit"]'
+    assert plan.submit_text == "Submit Application"
+    assert plan.signature == snapshot["signature"]
+    assert plan.is_stable()
+
+
+def test_split_name_fields_take_precedence():
+    """Greenhouse/Lever style: First Name + Last Name, plus an unrelated name field"""
+    snapshot = {"fields": [
+        _field("#first_name", "First Name", "job_application[first_name]"),
+        _field("#last_name", "Last Name", "job_application[last_name]"),
+        _field("#preferred", "Preferred name", "preferred_name"),
+        _field("#email", "Email", "email", type="email"),
+    ], "buttons": []}
+    plan = plan_form(snapshot, list(FIELD_HINTS))
+
+    assert plan.fields["first_name"] == "#first_name"
+    assert plan.fields["last_name"] == "#last_name"
+    assert "name" not in plan.fields
+    assert plan.fields["email"] == "#email"
+
+
+def test_split_name_from_autocomplete_attributes():
+    snapshot = {"fields": [
+        _field("#f", "", "fname", autocomplete="given-name"),
+        _field("#l", "", "lname", autocomplete="family-name"),
+    ], "buttons": []}
+    plan = plan_form(snapshot, list(FIELD_HINTS))
+
+    assert plan.fields == {"first_name": "#f", "last_name": "#l"}
+
+
+def test_profile_values_split_name():
+    values = GenericFormFiller()._profile_values(_profile(), None)
+
+    assert values["first_name"] == "Ada"
+    assert values["last_name"] == "Byron Lovelace"
+    assert values["name"] == "Ada Byron Lovelace"
+
+
+def test_profile_values_single_word_name():
+    values = GenericFormFiller()._profile_values(_profile("Madonna"), None)
+
+    assert values["first_name"] == "Madonna"
+    assert "last_name" not in values
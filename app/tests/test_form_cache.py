@@ -0,0 +1,40 @@
+# app/tests/test_form_cache.py
+
+from app.automation.form_analyzer import FormPlan
+from app.automation.form_cache import FormMappingCache, signature_key
+
+
+def _plan(signature: str) -> FormPlan:
+    return FormPlan(fields={"email": "#email"}, submit='button[type="submit"]',
+                    signature=signature)
+
+
+def _probe(plan: FormPlan) -> dict:
+    return {"signature": plan.signature, "found": plan.selectors()}
+
+
+def test_workers_sharing_the_file_keep_each_others_plans(tmp_path):
+    # Two instances on one file stand in for two APPLY_PROCESSES workers
+    path = tmp_path / "form_cache.sqlite"
+    first, second = FormMappingCache(path), FormMappingCache(path)
+    plan_a, plan_b = _plan("form-a"), _plan("form-b")
+
+    first.store("https://ats.example/jobs/1", plan_a)
+    second.store("https://ats.example/jobs/2", plan_b)
+    assert first.lookup("https://ats.example/jobs/3", _probe(plan_a)) == plan_a
+    assert second.lookup("https://ats.example/jobs/4", _probe(plan_a)) == plan_a
+    first.lookup("https://ats.example/jobs/5", _probe(plan_b))
+
+    hits = dict(FormMappingCache(path)._conn.execute(
+        "SELECT signature_key, hits FROM form_plans").fetchall())
+    assert hits == {signature_key("form-a"): 2, signature_key("form-b"): 1}
+
+
+def test_stale_selector_invalidates_the_plan(tmp_path):
+    cache = FormMappingCache(tmp_path / "form_cache.sqlite")
+    plan = _plan("form-a")
+    cache.store("https://ats.example/jobs/1", plan)
+
+    probe = {"signature": "form-a", "found": ["#email"]}  # submit button gone
+    assert cache.lookup("https://ats.example/jobs/2", probe) is None
+    assert cache.candidates("https://ats.example/jobs/3") == []
@@ -0,0 +1,99 @@
+# app/tests/test_journal.py
+
+import os
+import subprocess
+import sys
+import time
+
+from app.core import journal, storage
+from app.core.config import settings
+from app.core.models import ApplicationStatus, Job
+
+
+def _job(job_id):
+    return Job(id=job_id, source="remoteok", url=f"https://ats.example/{job_id}",
+               title="Python Developer", company="Acme", description="python",
+               posted_date="2026-10-01")
+
+
+def _stored_statuses():
+    return {job.id: job.status for job in storage.iter_jobs()}
+
+
+def test_replay_and_compact_after_a_crash(fresh_store):
+    storage.save_jobs([_job("a"), _job("b"), _job("c")])
+    journal.record_transition("a", "discovered", "matched", node="match")
+    journal.record_transition("a", "matched", "applied", node="apply")
+    journal.record_transition("b", "discovered", "skipped", node="prefilter")
+    # The process died halfway through writing the next event...
+    journal._handle.write('{"job_id": "c", "old_status": "discov')
+    journal._handle.close()
+    journal._handle = None
+    # ...and the next one appends before anything compacts the journal
+    journal.record_transition("c", "discovered", "skipped", node="prefilter")
+
+    # The store never saw those transitions
+    assert set(_stored_statuses().values()) == {ApplicationStatus.DISCOVERED}
+    assert journal.replay_journal() == {"a": "applied", "b": "skipped", "c": "skipped"}
+
+    assert journal.compact_journal() == 3
+    assert _stored_statuses() == {
+        "a": ApplicationStatus.APPLIED,
+        "b": ApplicationStatus.SKIPPED,
+        "c": ApplicationStatus.SKIPPED,
+    }
+    # The JSON copy of each row follows the status column
+    assert storage.load_jobs_by_id(["a"])[0].status == ApplicationStatus.APPLIED
+    assert settings.journal_file.read_text(encoding="utf-8") == ""
+    assert storage.load_job_summary().by_status == {"applied": 1, "skipped": 2}
+
+    # Appends resume on the truncated file
+    job = storage.load_jobs_by_id(["c"])[0]
+    journal.set_status(job, ApplicationStatus.MATCHED, node="match")
+    assert journal.replay_journal() == {"c": "matched"}
+
+
+def test_compacts_every_n_transitions(fresh_store, monkeypatch):
+    monkeypatch.setattr(settings, "journal_compact_every", 2)
+    storage.save_jobs([_job("a")])
+    journal.record_transition("a", "discovered", "matched", node="match")
+    journal.record_transition("a", "matched", "skipped", node="match")
+
+    assert journal.replay_journal() == {}
+    assert _stored_statuses() == {"a": ApplicationStatus.SKIPPED}
+
+
+def test_appends_from_another_process_wait_for_compaction(fresh_store, monkeypatch):
+    storage.save_jobs([_job("a"), _job("b")])
+    journal.record_transition("a", "discovered", "matched", node="match")
+    update_job_statuses = storage.update_job_statuses
+    children = []
+
+    def fold_while_another_process_appends(statuses):
+        # Between the replay and the truncate, a second process journals "b"
+        env = dict(os.environ, DATA_DIR=str(fresh_store))
+        children.append(subprocess.Popen(
+            [sys.executable, "-c", "from app.core import journal; "
+             "journal.record_transition('b', 'discovered', 'skipped', node='other')"],
+            env=env))
+        time.sleep(1.0)
+        assert children[0].poll() is None  # blocked on the journal lock
+        update_job_statuses(statuses)
+
+    monkeypatch.setattr(storage, "update_job_statuses", fold_while_another_process_appends)
+
+    assert journal.compact_journal() == 1
+    assert children[0].wait(timeout=30) == 0
+    # The append landed in the truncated journal instead of being wiped
+    assert journal.replay_journal() == {"b": "skipped"}
+
+
+def test_summary_shows_journaled_statuses_without_compacting(fresh_store):
+    storage.save_jobs([_job("a"), _job("b")])
+    journal.record_transition("a", "discovered", "applied", node="apply")
+
+    summary = storage.load_job_summary(pending=journal.replay_journal())
+
+    assert summary.by_status == {"applied": 1, "discovered": 1}
+    assert storage.load_job_summary().by_status == {"discovered": 2}
+    assert journal.replay_journal() == {"a": "applied"}
@@ -0,0 +1,89 @@
+# app/tests/test_nodes.py
+
+import pytest
+
+from app.automation.engine import ApplicationEngine, ApplicationOutcome
+from app.core.config import settings
+from app.core.models import AgentState, ApplicationStatus, Job, TailoredMaterials, UserProfile
+from app.graph import nodes
+
+
+def _state(job_id: str) -> AgentState:
+    job = Job(id=job_id, source="remoteok", url="https://ats.example/apply",
+              title="Python Developer", company="Acme", description="python",
+              posted_date="2026-10-01", status=ApplicationStatus.MATCHED)
+    return AgentState(
+        user_profile=UserProfile(name="Test User", email="test@example.com", target_roles=[],
+                                 cv_text="cv", cover_letter_template="letter"),
+        jobs=[job],
+        tailored=[TailoredMaterials(job_id=job_id, tailored_cv="cv",
+                                    tailored_cover_letter="letter")],
+    )
+
+
+@pytest.mark.parametrize("auto_apply, note", [
+    (True, "Application was submitted"),
+    (False, "Draft - Form filled only"),
+])
+def test_apply_passes_auto_apply_to_the_browser(monkeypatch, auto_apply, note):
+    seen = []
+
+    def run_processes(self, tasks, profile, draft_mode=True, processes=None):
+        seen.append(draft_mode)
+        return [ApplicationOutcome(job_id=t.job_id, success=True, seconds=0.1) for t in tasks]
+
+    monkeypatch.setattr(settings, "auto_apply", auto_apply)
+    monkeypatch.setattr(ApplicationEngine, "run_processes", run_processes)
+
+    update = nodes.apply_to_job(_state(f"apply-{auto_apply}"))
+
+    assert seen == [not auto_apply]
+    assert update["applications"][0].notes == note
+
+
+def test_stored_backlog_joins_a_run_with_new_jobs(monkeypatch):
+    from app.core.storage import save_jobs
+
+    deferred = _state("backlog-deferred").jobs[0]
+    deferred.status = ApplicationStatus.DISCOVERED
+    done = _state("backlog-skipped").jobs[0]
+    done.status = ApplicationStatus.SKIPPED
+    save_jobs([deferred, done])
+    fresh = _state("backlog-fresh").jobs[0]
+    fresh.status = ApplicationStatus.DISCOVERED
+
+    def run_scraper():
+        save_jobs([fresh])  # the runner stores new jobs before returning them
+        return [fresh]
+
+    monkeypatch.setattr(nodes, "run_scraper", run_scraper)
+
+    ids = [job.id for job in nodes.scrape_jobs(_state("unused"))["jobs"]]
+
+    assert ids[0] == "backlog-fresh" and ids.count("backlog-fresh") == 1
+    assert "backlog-deferred" in ids
+    assert "backlog-skipped" not in ids
+    # The backlog is processed but was not found by this run's scrapers
+    assert nodes.scrape_jobs(_state("unused"))["jobs_scraped_count"] == 1
+
+
+def test_prefilter_passes_matched_backlog_through(monkeypatch):
+    monkeypatch.setattr(settings, "prefilter_enabled", True)
+    monkeypatch.setattr(settings, "embedding_index_enabled", False)
+    state = _state("backlog-matched")
+    matched = state.jobs[0]
+    matched.match_score = 88
+    matched.match_reasoning = "Strong Python fit"
+    # Unrelated to the CV and the target roles: the pre-filter would drop it
+    matched.title, matched.description = "Line Cook", "prepare pasta and sauces"
+    state.user_profile.target_roles = ["Python Developer"]
+    fresh = _state("prefilter-fresh").jobs[0]
+    fresh.status = ApplicationStatus.DISCOVERED
+    state.jobs.append(fresh)
+
+    nodes.prefilter_jobs(state)
+
+    assert matched.status == ApplicationStatus.MATCHED
+    assert matched.match_reasoning == "Strong Python fit"
+    sends = nodes.fan_out_match(state)
+    assert [send.arg.job.id for send in sends] == ["prefilter-fresh"]
@@ -0,0 +1,133 @@
+# app/tests/test_pool.py
+
+"""BrowserPool leasing and recycling, against in-memory stand-ins for Playwright."""
+
+import asyncio
+
+import pytest
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_context_is_reused_with_cookies_cleared(make_pool):
+    async def scenario():
+        pool = make_pool(browsers=1, contexts_per_browser=1, max_pages=0)
+        async with pool.page() as first:
+            pass
+        async with pool.page() as second:
+            pass
+        return pool, first, second
+
+    pool, first, second = run(scenario())
+    assert first.context is second.context
+    assert first.closed and second.closed
+    assert first.context.cookies_cleared == 2
+    assert pool.launched == 1
+
+
+def test_failed_lease_discards_its_context(make_pool):
+    async def scenario():
+        pool = make_pool(browsers=1, contexts_per_browser=1, max_pages=0)
+        with pytest.raises(ValueError):
+            async with pool.page() as page:
+                raise ValueError("form broke")
+        async with pool.page() as again:
+            pass
+        return page, again
+
+    page, again = run(scenario())
+    assert page.context.closed
+    assert again.context is not page.context
+
+
+def test_dead_idle_context_fails_health_check(make_pool):
+    async def scenario():
+        pool = make_pool(browsers=1, contexts_per_browser=1, max_pages=0)
+        async with pool.page() as first:
+            pass
+        first.context.closed = True
+        async with pool.page() as second:
+            pass
+        return first, second
+
+    first, second = run(scenario())
+    assert second.context is not first.context
+
+
+def test_browser_recycled_after_max_pages(make_pool):
+    async def scenario():
+        pool = make_pool(browsers=1, contexts_per_browser=1, max_pages=2)
+        contexts = []
+        for _ in range(5):
+            async with pool.page() as page:
+                contexts.append(page.context)
+        return pool, contexts
+
+    pool, contexts = run(scenario())
+    browsers = pool.playwright.chromium.launched
+    # Pages 1-2 on browser 0, 3-4 on browser 1, 5 on browser 2
+    assert pool.launched == 3
+    assert pool.recycled == 2
+    assert not browsers[0].connected and not browsers[1].connected
+    assert browsers[2].connected
+    assert [c.browser for c in contexts] == [browsers[0]] * 2 + [browsers[1]] * 2 + [browsers[2]]
+
+
+def test_retiring_browser_waits_for_its_leases(make_pool):
+    async def scenario():
+        pool = make_pool(browsers=1, contexts_per_browser=2, max_pages=2)
+        async with pool.page() as a:
+            async with pool.page() as b:
+                # Retiring after its second page, but `a` is still open on it
+                assert pool.recycled == 0
+                assert a.context.browser.connected
+            assert pool.recycled == 0
+        return pool, a, b
+
+    pool, a, b = run(scenario())
+    assert a.context.browser is b.context.browser
+    assert pool.recycled == 1
+    assert not a.context.browser.connected
+
+
+def test_leases_spread_across_browsers_and_respect_capacity(make_pool):
+    async def scenario():
+        pool = make_pool(browsers=2, contexts_per_browser=2, max_pages=0)
+        open_now = 0
+        peak = 0
+        used = set()
+
+        async def job():
+            nonlocal open_now, peak
+            async with pool.page() as page:
+                open_now += 1
+                peak = max(peak, open_now)
+                used.add(page.context.browser)
+                await asyncio.sleep(0.01)
+                open_now -= 1
+
+        await asyncio.gather(*(job() for _ in range(10)))
+        await pool.close()
+        return pool, peak, used
+
+    pool, peak, used = run(scenario())
+    assert peak == pool.capacity == 4
+    assert len(used) == 2
+    assert pool.playwright is None
+
+
+def test_disconnected_browser_is_replaced(make_pool):
+    async def scenario():
+        pool = make_pool(browsers=1, contexts_per_browser=1, max_pages=0)
+        async with pool.page() as first:
+            pass
+        first.context.browser.connected = False
+        async with pool.page() as second:
+            pass
+        return pool, first, second
+
+    pool, first, second = run(scenario())
+    assert pool.launched == 2
+    assert second.context.browser is not first.context.browser
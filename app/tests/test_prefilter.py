@@ -0,0 +1,58 @@
+# app/tests/test_prefilter.py
+
+import numpy as np
+
+from app.ai.prefilter import parse_salary, prefilter
+from app.core.models import Job, UserProfile
+
+PROFILE = UserProfile(name="Test User", email="test@example.com",
+                      target_roles=["Senior Python Developer"], min_salary=80_000,
+                      cv_text="python django postgres celery aws",
+                      cover_letter_template="letter")
+
+
+def _job(job_id, title, description, salary=None):
+    return Job(id=job_id, source="remoteok", url=f"https://ats.example/{job_id}",
+               title=title, company="Acme", description=description,
+               salary=salary, posted_date="2026-10-01")
+
+
+def test_parse_salary():
+    assert parse_salary("$80,000 - $120,000") == (80_000, 120_000)
+    assert parse_salary("$90k+") == (90_000, float("inf"))
+    assert parse_salary("Up to $150,000") == (0.0, 150_000)
+    assert parse_salary("Competitive") is None
+
+
+def test_salary_floor_min_score_and_top_k():
+    best = _job("best", "Python Developer", "python django postgres celery aws")
+    good = _job("good", "Python Developer", "python django", salary="$90,000 - $120,000")
+    fair = _job("fair", "Python Engineer", "python scripts")
+    underpaid = _job("underpaid", "Python Developer", "python django postgres",
+                     salary="$40,000 - $50,000")
+    unrelated = _job("unrelated", "Line Cook", "prepare pasta and sauces")
+
+    result = prefilter([fair, unrelated, good, underpaid, best], PROFILE, top_k=2, min_score=0.3)
+
+    assert [job.id for job in result.kept] == ["best", "good"]
+    # Over the minimum score but past the cap: deferred, not dropped
+    assert [job.id for job in result.deferred] == ["fair"]
+    reasons = {job.id: reason for job, reason in result.dropped}
+    assert set(reasons) == {"underpaid", "unrelated"}
+    assert reasons["underpaid"].startswith("salary")
+    assert reasons["unrelated"].startswith("pre-filter score")
+
+
+def test_no_cap_keeps_every_candidate():
+    jobs = [_job(f"py-{i}", "Python Developer", "python django") for i in range(5)]
+    result = prefilter(jobs, PROFILE, top_k=0, min_score=0.3)
+
+    assert len(result.kept) == 5 and not result.deferred and not result.dropped
+
+
+def test_negative_similarity_counts_as_unrelated():
+    jobs = [_job(f"py-{i}", "Python Developer", "python django") for i in range(3)]
+    result = prefilter(jobs, PROFILE, top_k=0, min_score=0.3,
+                       similarity=np.array([-0.2, -0.1, -0.3]))
+
+    assert len(result.kept) == 3
@@ -0,0 +1,156 @@
+# app/tests/test_providers.py
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.ai import cache, providers
+from app.ai.ratelimit import RateLimiter
+from app.core.config import settings
+from app.core.models import ApplicationStatus, Job, MatchResult, TailoredContent
+from app.graph import nodes
+
+
+class _RateLimited(Exception):
+    status_code = 429
+
+
+class _ScriptedLLM:
+    """Chat model stand-in: raises the scripted errors, then answers"""
+
+    def __init__(self, errors=(), delay=0.0):
+        self.errors = list(errors)
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    def with_structured_output(self, schema, include_raw=False):
+        return SimpleNamespace(invoke=lambda messages: self.invoke(schema, messages),
+                               ainvoke=lambda messages: self.ainvoke(schema, messages))
+
+    def _answer(self, schema, messages):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        if schema is MatchResult:
+            # The job description carries the score the test wants back
+            score = float(messages[1][1].split("score=")[1].split()[0])
+            parsed = MatchResult(match_score=score, reasoning="fake",
+                                 key_requirements=[], missing_skills=[])
+        else:
+            parsed = TailoredContent(tailored_cv="cv", cover_letter="letter", why_good_fit=[])
+        return {"raw": None, "parsed": parsed, "parsing_error": None}
+
+    def invoke(self, schema, messages):
+        return self._answer(schema, messages)
+
+    async def ainvoke(self, schema, messages):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return self._answer(schema, messages)
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    """The shared engine with no cache and an unconstrained limiter"""
+    engine = nodes.ai_engine
+    monkeypatch.setattr(engine, "cache", None)
+    monkeypatch.setattr(engine, "rate_limiter", RateLimiter(10**6, 10**9))
+    monkeypatch.setattr(engine, "tailor_calls", 0)
+    # A cache hit left by an earlier test would make tailoring calls look cached
+    token = cache._last_hit.set(False)
+    yield engine
+    cache._last_hit.reset(token)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff delays the sync retry loop asked for (nothing actually sleeps)"""
+    sleeps = []
+    monkeypatch.setattr(providers, "time", SimpleNamespace(sleep=sleeps.append))
+    return sleeps
+
+
+def _job(job_id, score=80):
+    return Job(id=job_id, source="remoteok", url=f"https://ats.example/{job_id}",
+               title="Python Developer", company="Acme", description=f"score={score} python",
+               posted_date="2026-10-01")
+
+
+def test_retries_429s_with_jittered_backoff(engine, sleeps, monkeypatch):
+    monkeypatch.setattr(settings, "llm_max_retries", 5)
+    llm = _ScriptedLLM(errors=[_RateLimited("429"), _RateLimited("429")])
+    monkeypatch.setattr(engine, "llm", llm)
+
+    result = engine.match_job(_job("retry-429", score=91), "cv")
+
+    assert result.match_score == 91
+    assert llm.calls == 3
+    assert len(sleeps) == 2
+    assert 0 <= sleeps[0] <= 1 and 0 <= sleeps[1] <= 2
+
+
+def test_gives_up_after_max_retries(engine, sleeps, monkeypatch):
+    monkeypatch.setattr(settings, "llm_max_retries", 2)
+    llm = _ScriptedLLM(errors=[_RateLimited("429")] * 10)
+    monkeypatch.setattr(engine, "llm", llm)
+
+    result = engine.match_job(_job("retry-exhausted"), "cv")
+
+    assert llm.calls == 3
+    assert len(sleeps) == 2
+    assert result.match_score == 0 and result.reasoning.startswith("Analysis failed")
+    assert result.failed
+
+
+def test_other_errors_are_not_retried(engine, sleeps, monkeypatch):
+    monkeypatch.setattr(settings, "llm_max_retries", 5)
+    llm = _ScriptedLLM(errors=[ValueError("invalid schema")])
+    monkeypatch.setattr(engine, "llm", llm)
+
+    result = engine.match_job(_job("no-retry"), "cv")
+
+    assert llm.calls == 1
+    assert sleeps == []
+    assert "invalid schema" in result.reasoning
+
+
+def test_async_path_retries_429s_and_reraises_other_errors(engine, monkeypatch):
+    monkeypatch.setattr(settings, "llm_max_retries", 5)
+    monkeypatch.setattr(providers, "backoff_delay", lambda attempt: 0.0)
+    llm = _ScriptedLLM(errors=[_RateLimited("429"), ValueError("invalid schema")])
+    monkeypatch.setattr(engine, "llm", llm)
+
+    result = asyncio.run(engine.amatch_job(_job("async-retry"), "cv"))
+
+    # One retry for the 429, then the ValueError ends it
+    assert llm.calls == 2
+    assert "invalid schema" in result.reasoning
+
+
+def test_analyze_batch_runs_concurrently_and_keeps_input_order(engine, monkeypatch):
+    llm = _ScriptedLLM(delay=0.05)
+    monkeypatch.setattr(engine, "llm", llm)
+    scores = [90, 40, 85, 10, 95, 60, 80, 20]
+    jobs = [_job(f"batch-{i}", score=score) for i, score in enumerate(scores)]
+
+    start = time.perf_counter()
+    results = engine.analyze_batch(jobs, "cv", "letter", min_score=75, max_concurrency=4)
+    elapsed = time.perf_counter() - start
+
+    assert [r["job"].id for r in results] == [job.id for job in jobs]
+    assert [r["match_result"].match_score for r in results] == scores
+    tailored = [r["job"].id for r in results if r["tailored_content"] is not None]
+    assert tailored == ["batch-0", "batch-2", "batch-4", "batch-6"]
+    assert [job.status for job in jobs[:2]] == [ApplicationStatus.MATCHED, ApplicationStatus.SKIPPED]
+    # 12 calls of 50ms, four at a time: well under the 0.6s they take in a row
+    assert llm.peak == 4
+    assert elapsed < 0.45
+    assert engine.tailor_calls == 4
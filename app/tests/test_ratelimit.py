@@ -0,0 +1,83 @@
+# app/tests/test_ratelimit.py
+
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from app.ai import ratelimit
+from app.ai.ratelimit import RateLimiter, backoff_delay, is_rate_limit_error
+
+
+class _Clock:
+    """monotonic() and sleep() on a fake timeline: sleeping only advances it"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(ratelimit, "time", SimpleNamespace(monotonic=clock.monotonic,
+                                                           sleep=clock.sleep))
+    return clock
+
+
+def test_requests_are_paced_to_the_per_minute_budget(clock):
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=10**9)
+
+    for _ in range(60):
+        limiter.acquire()
+    assert clock.sleeps == []
+
+    # The bucket is empty: one more request waits for one refill (60/min = 1/s)
+    limiter.acquire()
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_tokens_are_paced_to_the_per_minute_budget(clock):
+    limiter = RateLimiter(requests_per_minute=10**6, tokens_per_minute=600)
+
+    limiter.acquire(tokens=600)
+    limiter.acquire(tokens=300)
+
+    # 300 tokens at 600 tokens/min take 30s to refill
+    assert clock.now == pytest.approx(30.0)
+
+
+def test_a_request_larger_than_the_bucket_still_goes_through(clock):
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=100)
+
+    limiter.acquire(tokens=10_000)
+
+    assert clock.sleeps == []
+
+
+def test_backoff_is_jittered_and_capped():
+    random.seed(7)
+    delays = [backoff_delay(3) for _ in range(200)]
+
+    assert all(0 <= d <= 8 for d in delays)
+    assert len(set(delays)) > 1
+    assert all(0 <= backoff_delay(20, cap=60.0) <= 60 for _ in range(50))
+
+
+@pytest.mark.parametrize("error, limited", [
+    (SimpleNamespace(status_code=429), True),
+    (SimpleNamespace(response=SimpleNamespace(status_code=429)), True),
+    (Exception("Error code: 429 - Too Many Requests"), True),
+    (Exception("Rate limit reached for requests"), True),
+    (SimpleNamespace(status_code=500), False),
+    (ValueError("bad schema"), False),
+])
+def test_is_rate_limit_error(error, limited):
+    assert is_rate_limit_error(error) is limited
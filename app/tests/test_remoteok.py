@@ -0,0 +1,58 @@
+# app/tests/test_remoteok.py
+
+import asyncio
+import json
+
+import httpx
+
+from app.scrapers.http_cache import HttpCache
+from app.scrapers.remoteok import RemoteOkScrapper
+
+PAYLOAD = json.dumps([
+    {"legal": "notice"},
+    {"slug": "python-dev-1", "position": "Python Developer", "company": "Acme",
+     "description": "<p>python</p>", "date": "2026-10-01"},
+    {"slug": "go-dev-2", "position": "Go Developer", "company": "Initech",
+     "description": "go", "date": "2026-10-02"},
+]).encode()
+
+
+def _scraper(tmp_path) -> RemoteOkScrapper:
+    scraper = RemoteOkScrapper()
+    scraper.http_cache = HttpCache(scraper.get_source_name(), directory=tmp_path)
+    return scraper
+
+
+def _scrape(scraper, seen):
+    def handler(request):
+        seen.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=PAYLOAD, headers={"ETag": '"v1"'})
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await scraper.ascrape(client)
+    return asyncio.run(scenario())
+
+
+def test_not_modified_replays_unsaved_listings_from_the_stored_body(tmp_path):
+    scraper = _scraper(tmp_path)
+    seen = []
+    first = _scrape(scraper, seen)
+    # The previous run never persisted its jobs: a 304 must not lose them
+    again = _scrape(scraper, seen)
+
+    assert seen == [None, '"v1"']
+    assert [job.title for job in first] == ["Python Developer", "Go Developer"]
+    assert [job.id for job in again] == [job.id for job in first]
+
+
+def test_not_modified_skips_listings_already_known(tmp_path):
+    scraper = _scraper(tmp_path)
+    seen = []
+    first = _scrape(scraper, seen)
+    scraper.known_ids = frozenset(job.id for job in first)
+
+    assert _scrape(scraper, seen) == []
+    assert seen[-1] == '"v1"'
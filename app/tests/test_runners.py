@@ -0,0 +1,72 @@
+# app/tests/test_runners.py
+
+import asyncio
+import time
+from typing import List
+
+import httpx
+
+from app.core.models import Job
+from app.scrapers import base, runners
+from app.scrapers.base import BaseScrapper, register_scraper
+
+
+def _handler(request):
+    source = request.url.path.strip("/")
+    return httpx.Response(200, json=[{"id": f"{source}-{i}", "title": f"{source} job {i}"}
+                                     for i in range(2)])
+
+
+class _FakeSource(BaseScrapper):
+    """Fetches its listings over the runner's client, then 'parses' for `delay` seconds"""
+    delay = 0.0
+
+    def scrape(self) -> List[Job]:
+        raise NotImplementedError
+
+    def get_source_name(self) -> str:
+        return type(self).__name__
+
+    async def ascrape(self, client: httpx.AsyncClient) -> List[Job]:
+        response = await client.get(f"https://jobs.example/{self.get_source_name()}")
+        await asyncio.sleep(self.delay)
+        return [Job(id=item["id"], source="remoteok", url=f"https://jobs.example/{item['id']}",
+                    title=item["title"], company="Acme", description="python",
+                    posted_date="2026-10-01")
+                for item in response.json() if item["id"] not in self.known_ids]
+
+
+def test_sources_run_concurrently_and_failures_stay_isolated(monkeypatch, capsys):
+    registry = {}
+    monkeypatch.setattr(base, "SCRAPER_REGISTRY", registry)
+    monkeypatch.setattr(runners, "SCRAPER_REGISTRY", registry)
+
+    @register_scraper
+    class Fast(_FakeSource):
+        delay = 0.3
+
+    @register_scraper
+    class AlsoFast(_FakeSource):
+        delay = 0.3
+
+    @register_scraper
+    class Hanging(_FakeSource):
+        timeout = 0.4
+        delay = 30.0
+
+    @register_scraper
+    class Broken(_FakeSource):
+        async def ascrape(self, client):
+            raise RuntimeError("listing page changed")
+
+    start = time.perf_counter()
+    jobs = asyncio.run(runners.scrape_all_sources(
+        known_ids=frozenset({"AlsoFast-0"}), transport=httpx.MockTransport(_handler)))
+    elapsed = time.perf_counter() - start
+
+    assert sorted(job.id for job in jobs) == ["AlsoFast-1", "Fast-0", "Fast-1"]
+    out = capsys.readouterr().out
+    assert "Hanging timed out after 0.4s" in out
+    assert "Broken failed: listing page changed" in out
+    # Bounded by the slowest allowed source (0.4s), not the 1.0s sum
+    assert elapsed < 0.8
@@ -0,0 +1,118 @@
+# app/tests/test_storage.py
+
+import shutil
+from pathlib import Path
+
+from app.core import storage
+from app.core.config import settings
+from app.core.models import ApplicationStatus, Job
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def _job(job_id, status=ApplicationStatus.DISCOVERED, score=None):
+    return Job(id=job_id, source="remoteok", url=f"https://ats.example/{job_id}",
+               title="Python Developer", company="Acme", description="python",
+               posted_date="2026-10-01", status=status, match_score=score)
+
+
+def _reopen():
+    """Drop the connection, as a new process would start without one"""
+    storage._conn.close()
+    storage._conn = None
+
+
+def test_save_jobs_upserts_only_the_given_rows(fresh_store):
+    first, second = _job("job-1"), _job("job-2")
+    storage.save_jobs([first, second])
+
+    first.status = ApplicationStatus.MATCHED
+    first.match_score = 81.5
+    first.match_reasoning = "Good fit"
+    storage.save_jobs([first])
+    _reopen()
+
+    loaded = storage.load_jobs_by_id(["job-2", "job-1", "missing"])
+    assert [job.id for job in loaded] == ["job-2", "job-1"]
+    assert loaded[1] == first
+    assert loaded[0] == second
+    assert storage.load_job_ids() == {"job-1", "job-2"}
+    assert [job.id for job in storage.iter_jobs(status=ApplicationStatus.MATCHED)] == ["job-1"]
+    assert list(storage.iter_jobs(min_score=80, project=True)) == [
+        storage.JobSummary("job-1", "remoteok", "matched", 81.5)]
+
+
+def test_migrates_legacy_json_once(fresh_store):
+    shutil.copy(FIXTURES / "legacy_jobs.json", settings.jobs_file)
+    shutil.copy(FIXTURES / "legacy_applications.json", settings.applications_file)
+
+    jobs = storage.load_jobs()
+
+    assert [(job.id, job.status, job.match_score) for job in jobs] == [
+        ("legacy-1", ApplicationStatus.APPLIED, 82.0),
+        ("legacy-2", ApplicationStatus.DISCOVERED, None),
+    ]
+    assert str(jobs[0].url) == "https://remoteok.com/remote-jobs/python-dev-1"
+    assert jobs[0].tags == ["python", "django"]
+    assert [app.job_id for app in storage.load_applications()] == ["legacy-1"]
+    assert not settings.jobs_file.exists() and not settings.applications_file.exists()
+    assert settings.jobs_file.with_name("jobs.json.migrated").exists()
+    assert settings.applications_file.with_name("applications.json.migrated").exists()
+    assert storage.load_job_summary().by_status == {"applied": 1, "discovered": 1}
+
+    # A later process finds nothing to import and sees the same rows
+    storage.save_jobs([_job("new-1")])
+    _reopen()
+    assert [job.id for job in storage.load_jobs()] == ["legacy-1", "legacy-2", "new-1"]
+    assert len(storage.load_applications()) == 1
+    assert storage.load_job_summary().total == 3
+
+
+def test_unreadable_legacy_file_is_left_in_place(fresh_store):
+    settings.jobs_file.write_text("[{not json", encoding="utf-8")
+
+    assert storage.load_jobs() == []
+    assert settings.jobs_file.exists()
+    assert not settings.jobs_file.with_name("jobs.json.migrated").exists()
+
+
+def _counted_from_table():
+    """What the summary index should say, recomputed straight from `jobs`"""
+    conn = storage._db()
+    by_status = dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+    by_source = dict(conn.execute("SELECT source, COUNT(*) FROM jobs GROUP BY source"))
+    buckets = {}
+    for (score,) in conn.execute("SELECT match_score FROM jobs"):
+        key = "unscored" if score is None else str(min(int(score // 10) * 10, 90))
+        buckets[key] = buckets.get(key, 0) + 1
+    total = conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+    return total, by_status, by_source, buckets
+
+
+def test_summary_index_follows_every_write(fresh_store):
+    jobs = [_job(f"job-{i}") for i in range(6)]
+    storage.save_jobs(jobs)
+
+    # Upserts that move status and score buckets, including the 100 -> "90" edge
+    jobs[0].status, jobs[0].match_score = ApplicationStatus.MATCHED, 81.0
+    jobs[1].status, jobs[1].match_score = ApplicationStatus.SKIPPED, 12.5
+    jobs[2].match_score = 100.0
+    storage.save_jobs(jobs[:3])
+    jobs[0].match_score = 79.9
+    storage.save_jobs([jobs[0], _job("job-6", ApplicationStatus.MATCHED, 95.0)])
+    # Journal compaction path: status column only
+    storage.update_job_statuses({"job-0": "applied", "job-3": "failed"})
+    with storage._db_lock:
+        conn = storage._db()
+        conn.execute("DELETE FROM jobs WHERE id IN ('job-4', 'job-6')")
+        conn.commit()
+
+    summary = storage.load_job_summary()
+    expected = _counted_from_table()
+    assert (summary.total, summary.by_status, summary.by_source, summary.score_buckets) == expected
+    assert expected == (5, {"applied": 1, "skipped": 1, "discovered": 2, "failed": 1},
+                        {"remoteok": 5}, {"70": 1, "10": 1, "90": 1, "unscored": 2})
+
+    storage.rebuild_job_summary()
+    summary = storage.load_job_summary()
+    assert (summary.total, summary.by_status, summary.by_source, summary.score_buckets) == expected
@@ -0,0 +1,132 @@
+# app/tests/test_tracing.py
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import tracing
+from app.core.config import settings
+from app.core.tracing import latency_breakdown, load_spans, span, traced
+
+
+@pytest.fixture
+def session(monkeypatch, tmp_path):
+    """Tracing switched on, with a session writing under a throwaway data dir"""
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    monkeypatch.setattr(settings, "tracing_enabled", True)
+    monkeypatch.setattr(tracing, "_tracer", None)
+    tracer = tracing.start_session("trace-test")
+    yield tracer
+    tracing.end_session()
+
+
+def test_no_session_records_nothing(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    monkeypatch.setattr(settings, "tracing_enabled", True)
+    monkeypatch.setattr(tracing, "_tracer", None)
+
+    with span("node", "scrape") as s:
+        s.set(jobs=3)
+
+    assert tracing.current_session() is None
+    assert not settings.traces_dir.exists()
+
+
+def test_session_is_opt_in(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    monkeypatch.setattr(settings, "tracing_enabled", False)
+
+    assert tracing.start_session("off") is None
+
+
+def test_nested_spans_are_written_as_jsonl_with_parent_ids(session):
+    # Nothing is written until the first span ends
+    assert not session.path.exists()
+
+    with span("node", "match", job_id="j1") as outer:
+        with span("llm", "MatchResult") as inner:
+            inner.set(input_tokens=812)
+        with pytest.raises(ValueError):
+            with span("http", "remoteok"):
+                raise ValueError("boom")
+    with span("node", "report"):
+        pass
+
+    events = [json.loads(line) for line in session.path.read_text().splitlines()]
+    assert [e["name"] for e in events] == ["MatchResult", "remoteok", "match", "report"]
+    by_name = {e["name"]: e for e in events}
+    assert by_name["match"]["parent_id"] is None
+    assert by_name["MatchResult"]["parent_id"] == outer.span_id
+    assert by_name["remoteok"]["parent_id"] == outer.span_id
+    assert by_name["report"]["parent_id"] is None
+    assert by_name["MatchResult"]["attrs"] == {"input_tokens": 812}
+    assert by_name["remoteok"]["error"] == "ValueError: boom"
+    assert all(e["session"] == "trace-test" and e["duration_ms"] >= 0 for e in events)
+    assert load_spans(session.path) == events
+
+
+def test_traced_tags_sync_and_async_calls_with_their_job(session):
+    @traced("node", "tailor")
+    def tailor(branch):
+        return "done"
+
+    @traced("browser")
+    async def fill(branch):
+        return "filled"
+
+    branch = SimpleNamespace(job=SimpleNamespace(id="job-7"))
+    assert tailor(branch) == "done"
+    assert asyncio.run(fill(branch)) == "filled"
+
+    events = load_spans(session.path)
+    assert [(e["kind"], e["name"], e["attrs"]) for e in events] == [
+        ("node", "tailor", {"job_id": "job-7"}),
+        ("browser", "fill", {"job_id": "job-7"}),
+    ]
+
+
+def test_spans_are_exported_as_otlp(monkeypatch, tmp_path):
+    posted = []
+
+    def post(url, json, timeout):
+        posted.append((url, json))
+        return SimpleNamespace(raise_for_status=lambda: None)
+
+    monkeypatch.setattr(tracing, "httpx", SimpleNamespace(post=post))
+    tracer = tracing.Tracer("otlp-test", directory=tmp_path, endpoint="http://collector:4318/")
+    with monkeypatch.context() as m:
+        m.setattr(tracing, "_tracer", tracer)
+        with span("node", "apply"):
+            with span("llm", "TailoredContent", input_tokens=5):
+                pass
+    tracer.flush()
+
+    assert len(posted) == 1
+    url, body = posted[0]
+    assert url == "http://collector:4318/v1/traces"
+    spans = body["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert [s["name"] for s in spans] == ["llm.TailoredContent", "node.apply"]
+    assert spans[0]["parentSpanId"] == spans[1]["spanId"]
+    assert "parentSpanId" not in spans[1]
+    assert {s["traceId"] for s in spans} == {tracer.trace_id}
+    assert {"key": "input_tokens", "value": {"intValue": "5"}} in spans[0]["attributes"]
+
+
+def test_latency_breakdown_percentiles_per_stage():
+    spans = [{"kind": "llm", "name": "MatchResult", "duration_ms": float(ms),
+              "attrs": {"input_tokens": 10, "output_tokens": 2}} for ms in range(1, 101)]
+    spans += [{"kind": "node", "name": "scrape", "duration_ms": 6000.0, "attrs": {},
+               "error": "TimeoutError"}]
+
+    rows = latency_breakdown(spans)
+
+    assert [(r["kind"], r["name"]) for r in rows] == [("node", "scrape"), ("llm", "MatchResult")]
+    match = rows[1]
+    assert match["count"] == 100
+    assert match["total_ms"] == 5050
+    assert match["mean_ms"] == 50.5
+    assert (match["p50_ms"], match["p95_ms"], match["max_ms"]) == (50, 95, 100)
+    assert (match["input_tokens"], match["output_tokens"]) == (1000, 200)
+    assert rows[0]["errors"] == 1 and rows[0]["p95_ms"] == 6000
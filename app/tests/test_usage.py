@@ -0,0 +1,100 @@
+# app/tests/test_usage.py
+
+import asyncio
+
+import pytest
+
+from app.ai.usage import UsageMeter, get_usage_meter
+from app.core.config import settings
+from app.core.models import AgentState, ApplicationStatus, Job, MatchResult, UserProfile
+from app.graph import pipeline
+
+
+@pytest.mark.parametrize("model, price, warned", [
+    ("some-local-model", None, True),
+    ("some-local-model", 1.0, False),
+    ("gpt-5-nano", None, False),
+])
+def test_begin_warns_when_usd_budget_cannot_be_priced(monkeypatch, capsys, model, price, warned):
+    monkeypatch.setattr(settings, "model", model)
+    monkeypatch.setattr(settings, "llm_budget_usd", 1.0)
+    monkeypatch.setattr(settings, "llm_price_input_per_mtok", price)
+
+    UsageMeter().begin("usage-test")
+
+    assert ("LLM_BUDGET_USD will not be enforced" in capsys.readouterr().out) is warned
+
+
+class _CountingEngine:
+    """Match calls that each cost 600 tokens and overlap like real requests"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def amatch_job(self, job, cv_text):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        get_usage_meter().record(settings.model, "match", job.id, 500, 100)
+        return MatchResult(match_score=10, reasoning="fake", key_requirements=[], missing_skills=[])
+
+
+class _NoBrowsers:
+    @classmethod
+    def for_workers(cls, workers):
+        return cls()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def test_pipeline_stops_calling_once_the_budget_is_spent(monkeypatch):
+    engine = _CountingEngine()
+    monkeypatch.setattr(pipeline, "ai_engine", engine)
+    monkeypatch.setattr(pipeline, "BrowserPool", _NoBrowsers)
+    monkeypatch.setattr(settings, "llm_budget_tokens", 1000)
+    monkeypatch.setattr(settings, "llm_max_concurrency", 2)
+    get_usage_meter().begin("pipeline-budget-test")
+    jobs = [Job(id=f"budget-{i}", source="remoteok", url="https://ats.example/apply",
+                title="Python Developer", company="Acme", description="python",
+                posted_date="2026-10-01") for i in range(20)]
+    state = AgentState(user_profile=UserProfile(name="Test User", email="test@example.com",
+                                                target_roles=[], cv_text="cv",
+                                                cover_letter_template="letter"),
+                       jobs=jobs)
+
+    asyncio.run(pipeline._stream(state))
+
+    # The first two calls share the slots and spend the budget; nothing else starts
+    assert engine.calls == 2
+    untouched = [job for job in jobs if job.match_score is None]
+    assert len(untouched) == 18
+    assert all(job.status == ApplicationStatus.DISCOVERED for job in untouched)
+
+
+class _FailingEngine:
+    async def amatch_job(self, job, cv_text):
+        return MatchResult(match_score=0, reasoning="Analysis failed: 401", key_requirements=[],
+                           missing_skills=[], failed=True)
+
+
+def test_pipeline_leaves_jobs_whose_match_call_failed_unscored(monkeypatch):
+    from app.core.journal import replay_journal
+
+    monkeypatch.setattr(pipeline, "ai_engine", _FailingEngine())
+    monkeypatch.setattr(pipeline, "BrowserPool", _NoBrowsers)
+    get_usage_meter().begin("pipeline-failure-test")
+    job = Job(id="pipeline-outage", source="remoteok", url="https://ats.example/apply",
+              title="Python Developer", company="Acme", description="python",
+              posted_date="2026-10-01")
+    state = AgentState(user_profile=UserProfile(name="Test User", email="test@example.com",
+                                                target_roles=[], cv_text="cv",
+                                                cover_letter_template="letter"),
+                       jobs=[job])
+
+    asyncio.run(pipeline._stream(state))
+
+    assert (job.status, job.match_score) == (ApplicationStatus.DISCOVERED, None)
+    assert "pipeline-outage" not in replay_journal()
@@ -0,0 +1,154 @@
+# app/tests/test_workflow.py
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.ai.ratelimit import RateLimiter
+from app.automation.engine import ApplicationEngine, ApplicationOutcome
+from app.core.config import settings
+from app.core.models import (ApplicationStatus, Job, MatchResult, TailoredContent,
+                             UserProfile)
+from app.graph import nodes
+
+
+def test_import_does_not_open_the_checkpoint_store():
+    from app.graph import workflow
+
+    assert workflow.app.checkpointer is None
+    assert not settings.checkpoint_file.exists()
+
+
+class _CountingEngine:
+    def __init__(self):
+        self.matched = []
+        self.tailored = []
+
+    def match_job(self, job, cv_text):
+        self.matched.append(job.id)
+        return MatchResult(match_score=90, reasoning="fit", key_requirements=[], missing_skills=[])
+
+    def tailor_content(self, job, cv_text, cover_letter_template, match_result):
+        self.tailored.append(job.id)
+        return TailoredContent(tailored_cv="cv", cover_letter="letter", why_good_fit=[])
+
+
+def test_resume_continues_after_the_last_checkpoint(fresh_store, monkeypatch):
+    from app.core.storage import iter_jobs, save_jobs
+    from app.graph.workflow import create_workflow, get_checkpointer, run_config
+
+    monkeypatch.chdir(fresh_store)  # the report is written under ./data/reports
+    monkeypatch.setattr(settings, "checkpoint_enabled", True)
+    monkeypatch.setattr(settings, "prefilter_enabled", False)
+    monkeypatch.setattr(settings, "embedding_index_enabled", False)
+    jobs = [Job(id=f"resume-{i}", source="remoteok", url=f"https://ats.example/{i}",
+                title="Python Developer", company="Acme", description="python",
+                posted_date="2026-10-01") for i in range(3)]
+
+    def run_scraper():
+        save_jobs(jobs)
+        return [job.model_copy() for job in jobs]
+
+    engine = _CountingEngine()
+    attempts = []
+
+    def run_processes(self, tasks, profile, draft_mode=True, processes=None):
+        attempts.append([task.job_id for task in tasks])
+        if len(attempts) == 1:
+            raise RuntimeError("browser crashed")
+        return [ApplicationOutcome(job_id=t.job_id, success=True, seconds=0.1) for t in tasks]
+
+    monkeypatch.setattr(nodes, "run_scraper", run_scraper)
+    monkeypatch.setattr(nodes, "ai_engine", engine)
+    monkeypatch.setattr(ApplicationEngine, "run_processes", run_processes)
+
+    checkpointer = get_checkpointer()
+    assert settings.checkpoint_file.parent == fresh_store
+    app = create_workflow(pipeline_mode=False, checkpointer=checkpointer)
+    config = run_config("resume-test")
+    inputs = {"user_profile": UserProfile(name="Test User", email="test@example.com",
+                                          target_roles=[], cv_text="cv",
+                                          cover_letter_template="letter")}
+
+    with pytest.raises(RuntimeError, match="browser crashed"):
+        for _ in app.stream(inputs, config):
+            pass
+    assert app.get_state(config).next == ("apply",)
+    assert sorted(engine.matched) == sorted(engine.tailored) == [job.id for job in jobs]
+
+    # A fresh graph over the same checkpoint file, as `run --resume` builds it
+    resumed = create_workflow(pipeline_mode=False, checkpointer=get_checkpointer())
+    nodes_run = [name for update in resumed.stream(None, config) for name in update]
+
+    assert nodes_run == ["apply", "report"]
+    assert len(engine.matched) == len(engine.tailored) == 3
+    assert sorted(attempts[1]) == [job.id for job in jobs]
+    final = resumed.get_state(config).values
+    assert {job.status for job in final["jobs"]} == {ApplicationStatus.APPLIED}
+    assert {job.status for job in iter_jobs()} == {ApplicationStatus.APPLIED}
+
+
+class _OutageLLM:
+    """Chat model whose first `failures` calls raise, then answers with a 90% match"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def with_structured_output(self, schema, include_raw=False):
+        def invoke(messages):
+            self.calls += 1
+            if self.calls <= self.failures:
+                raise RuntimeError("Error code: 401 - invalid api key")
+            if schema is MatchResult:
+                parsed = MatchResult(match_score=90, reasoning="fit",
+                                     key_requirements=[], missing_skills=[])
+            else:
+                parsed = TailoredContent(tailored_cv="cv", cover_letter="letter", why_good_fit=[])
+            return {"raw": None, "parsed": parsed, "parsing_error": None}
+        return SimpleNamespace(invoke=invoke)
+
+
+def test_a_failed_match_leaves_the_job_for_the_next_run(fresh_store, monkeypatch):
+    from app.core.storage import iter_jobs, save_jobs
+    from app.graph.workflow import create_workflow, run_config
+
+    monkeypatch.chdir(fresh_store)  # the report is written under ./data/reports
+    monkeypatch.setattr(settings, "prefilter_enabled", False)
+    monkeypatch.setattr(settings, "embedding_index_enabled", False)
+    job = Job(id="outage-1", source="remoteok", url="https://ats.example/outage",
+              title="Python Developer", company="Acme", description="python",
+              posted_date="2026-10-01")
+    scraped = [[job.model_copy()], []]
+
+    def run_scraper():
+        new = scraped.pop(0)
+        save_jobs(new)
+        return new
+
+    engine = nodes.ai_engine
+    llm = _OutageLLM(failures=1)
+    monkeypatch.setattr(nodes, "run_scraper", run_scraper)
+    monkeypatch.setattr(engine, "llm", llm)
+    monkeypatch.setattr(engine, "cache", None)
+    monkeypatch.setattr(engine, "rate_limiter", RateLimiter(10**6, 10**9))
+    monkeypatch.setattr(ApplicationEngine, "run_processes",
+                        lambda self, tasks, profile, draft_mode=True, processes=None:
+                        [ApplicationOutcome(job_id=t.job_id, success=True, seconds=0.1)
+                         for t in tasks])
+    app = create_workflow(pipeline_mode=False)
+    inputs = {"user_profile": UserProfile(name="Test User", email="test@example.com",
+                                          target_roles=[], cv_text="cv",
+                                          cover_letter_template="letter")}
+
+    app.invoke(inputs, run_config())
+    stored = next(iter_jobs())
+    assert (stored.status, stored.match_score) == (ApplicationStatus.DISCOVERED, None)
+
+    # The provider is back: the stored job joins the next run and is scored
+    final = app.invoke(inputs, run_config())
+
+    assert llm.calls == 3  # failed match, then match and tailor
+    assert final["jobs"][0].match_score == 90
+    stored = next(iter_jobs())
+    assert (stored.status, stored.match_score) == (ApplicationStatus.APPLIED, 90)